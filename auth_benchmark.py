@@ -0,0 +1,109 @@
+"""
+Event-loop latency benchmark for password hashing.
+
+Measures the latency of concurrent GET /api/ requests against a running
+backend, first on an idle server and then while a burst of logins (each
+doing a bcrypt verification) is in flight. With hashing on the dedicated
+thread pool the two distributions should be close; with bcrypt on the
+event loop every /api/ request waits behind the logins.
+
+Usage: python auth_benchmark.py [--logins 50] [--requests 200] [--concurrency 20]
+
+Login throttling applies to the benchmark too; start the backend with
+LOGIN_ACCOUNT_BURST and LOGIN_IP_BURST above --logins to measure hashing.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv('/app/frontend/.env')
+
+BACKEND_URL = os.getenv('REACT_APP_BACKEND_URL', 'http://localhost:8001')
+API_BASE_URL = f"{BACKEND_URL}/api"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(f"{label}: n={len(samples)} "
+          f"p50={percentile(samples, 50):.1f}ms "
+          f"p95={percentile(samples, 95):.1f}ms "
+          f"p99={percentile(samples, 99):.1f}ms "
+          f"max={max(samples):.1f}ms "
+          f"mean={statistics.mean(samples):.1f}ms")
+
+
+async def probe(client, total, concurrency):
+    """Fire `total` GET /api/ requests, `concurrency` at a time, returning latencies in ms"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(f"{API_BASE_URL}/")
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+async def login_burst(client, email, password, count):
+    async def one():
+        response = await client.post(
+            f"{API_BASE_URL}/auth/login",
+            data={"username": email, "password": password}
+        )
+        return response.status_code
+
+    return await asyncio.gather(*(one() for _ in range(count)))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50, help="concurrent logins in the burst")
+    parser.add_argument("--requests", type=int, default=200, help="GET /api/ requests per measurement")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent GET /api/ requests")
+    args = parser.parse_args()
+
+    email = f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    password = "BenchmarkPassword123!"
+
+    limits = httpx.Limits(max_connections=args.logins + args.concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        response = await client.post(
+            f"{API_BASE_URL}/auth/register",
+            json={"email": email, "password": password, "name": "Benchmark User"}
+        )
+        response.raise_for_status()
+
+        # Warm up connections before measuring
+        await probe(client, args.concurrency, args.concurrency)
+
+        idle = await probe(client, args.requests, args.concurrency)
+        report("GET /api/ idle          ", idle)
+
+        started = time.perf_counter()
+        logins = asyncio.create_task(login_burst(client, email, password, args.logins))
+        busy = await probe(client, args.requests, args.concurrency)
+        statuses = await logins
+        elapsed = time.perf_counter() - started
+        report("GET /api/ during logins ", busy)
+        print(f"{args.logins} logins finished in {elapsed:.2f}s "
+              f"({statuses.count(200)} ok, {statuses.count(503)} rejected as busy, "
+              f"{statuses.count(429)} throttled)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from pymongo import ASCENDING, ReplaceOne
+from database import (
+    calculations_collection,
+    calculations_analytics,
+    calculation_rollups_collection,
+    calculation_rollups_analytics,
+    job_checkpoints_collection,
+)
+
+BACKFILL_JOB_ID = "calculation_rollups_backfill"
+BACKFILL_BATCH_DAYS = 7
+
+
+def _day_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, value.day)
+
+
+def _bucket_id(day: datetime, location: str, quality_level: str) -> str:
+    return f"{day.strftime('%Y-%m-%d')}|{location}|{quality_level}"
+
+
+async def ensure_rollup_indexes():
+    """Create indexes used by the trend queries"""
+    await calculation_rollups_collection.create_index(
+        [("location", ASCENDING), ("quality_level", ASCENDING), ("day", ASCENDING)]
+    )
+    await calculation_rollups_collection.create_index([("day", ASCENDING)])
+    await calculations_analytics.create_index([("created_at", ASCENDING)])
+
+
+async def record_calculation(calculation: dict):
+    """Fold a newly saved calculation into its daily bucket"""
+    created_at = calculation.get("created_at") or datetime.now()
+    breakdown = calculation.get("breakdown", {})
+    day = _day_start(created_at)
+    location = calculation.get("location", "unknown")
+    quality_level = breakdown.get("quality_level", "standard")
+    cost_per_sqft = breakdown.get("cost_per_sqft", 0)
+
+    await calculation_rollups_collection.update_one(
+        {"_id": _bucket_id(day, location, quality_level)},
+        {
+            "$setOnInsert": {
+                "day": day,
+                "location": location,
+                "quality_level": quality_level,
+            },
+            "$inc": {
+                "count": 1,
+                "total_cost": calculation.get("total_cost", 0),
+                "total_area": breakdown.get("area", 0),
+            },
+            "$min": {"min_cost_per_sqft": cost_per_sqft},
+            "$max": {"max_cost_per_sqft": cost_per_sqft},
+            "$set": {"updated_at": datetime.now()},
+        },
+        upsert=True,
+    )
+
+
+async def _rebuild_days(start: datetime, end: datetime, source=calculations_analytics) -> list:
+    """Recompute every bucket in [start, end) from the raw calculations, returning their ids"""
+    pipeline = [
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {
+                "day": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
+                "location": "$location",
+                "quality_level": {"$ifNull": ["$breakdown.quality_level", "standard"]},
+            },
+            "count": {"$sum": 1},
+            "total_cost": {"$sum": "$total_cost"},
+            "total_area": {"$sum": {"$ifNull": ["$breakdown.area", 0]}},
+            "min_cost_per_sqft": {"$min": "$breakdown.cost_per_sqft"},
+            "max_cost_per_sqft": {"$max": "$breakdown.cost_per_sqft"},
+        }},
+    ]
+    operations = []
+    bucket_ids = []
+    async for group in source.aggregate(pipeline, allowDiskUse=True):
+        key = group.pop("_id")
+        bucket_id = _bucket_id(key["day"], key["location"], key["quality_level"])
+        bucket_ids.append(bucket_id)
+        operations.append(ReplaceOne(
+            {"_id": bucket_id},
+            {**key, **group, "updated_at": datetime.now()},
+            upsert=True,
+        ))
+    if operations:
+        await calculation_rollups_collection.bulk_write(operations, ordered=False)
+    return bucket_ids
+
+
+async def rebuild_rollup_days(days: Iterable[datetime]):
+    """Re-aggregate the buckets of `days` after calculations were deleted or changed in place.
+
+    Reads the primary so the writes that prompted the rebuild are visible,
+    and drops buckets whose calculations are all gone.
+    """
+    for day in sorted({_day_start(day) for day in days}):
+        bucket_ids = await _rebuild_days(day, day + timedelta(days=1), source=calculations_collection)
+        await calculation_rollups_collection.delete_many({"day": day, "_id": {"$nin": bucket_ids}})
+
+
+async def backfill_rollups(start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Rebuild daily buckets from raw calculations, a few days per batch.
+
+    Progress is checkpointed so an interrupted backfill resumes from the last
+    completed batch. By default the current day is left to the live updates.
+    """
+    end = _day_start(end or datetime.now())
+    checkpoint = await job_checkpoints_collection.find_one({"_id": BACKFILL_JOB_ID})
+    if start is None:
+        if checkpoint and checkpoint.get("status") == "running":
+            start = checkpoint["next_day"]
+        else:
+            first = await calculations_analytics.find_one({}, sort=[("created_at", ASCENDING)])
+            if first is None:
+                return {"days_processed": 0, "buckets_written": 0}
+            start = first["created_at"]
+    start = _day_start(start)
+
+    days_processed = 0
+    buckets_written = 0
+    batch_start = start
+    while batch_start < end:
+        batch_end = min(batch_start + timedelta(days=BACKFILL_BATCH_DAYS), end)
+        buckets_written += len(await _rebuild_days(batch_start, batch_end))
+        days_processed += (batch_end - batch_start).days
+        batch_start = batch_end
+        await job_checkpoints_collection.update_one(
+            {"_id": BACKFILL_JOB_ID},
+            {"$set": {
+                "status": "running",
+                "next_day": batch_start,
+                "end_day": end,
+                "updated_at": datetime.now(),
+            }},
+            upsert=True,
+        )
+
+    await job_checkpoints_collection.update_one(
+        {"_id": BACKFILL_JOB_ID},
+        {"$set": {"status": "completed", "next_day": end, "updated_at": datetime.now()}},
+        upsert=True,
+    )
+    return {"days_processed": days_processed, "buckets_written": buckets_written}
+
+
+async def get_backfill_status():
+    """Get the checkpoint of the last rollup backfill"""
+    checkpoint = await job_checkpoints_collection.find_one({"_id": BACKFILL_JOB_ID})
+    if checkpoint is None:
+        return {"status": "never_run"}
+    checkpoint.pop("_id")
+    return checkpoint
+
+
+def _summarize(group: dict) -> dict:
+    count = group["count"]
+    total_area = group["total_area"]
+    return {
+        "count": count,
+        "total_cost": round(group["total_cost"], 2),
+        "average_cost": round(group["total_cost"] / count, 2) if count else 0,
+        "average_cost_per_sqft": round(group["total_cost"] / total_area, 2) if total_area else 0,
+        "min_cost_per_sqft": group.get("min_cost_per_sqft"),
+        "max_cost_per_sqft": group.get("max_cost_per_sqft"),
+    }
+
+
+def _rollup_filter(days: int, location: Optional[str], quality_level: Optional[str]) -> dict:
+    query = {"day": {"$gte": _day_start(datetime.now()) - timedelta(days=days - 1)}}
+    if location:
+        query["location"] = location
+    if quality_level:
+        query["quality_level"] = quality_level
+    return query
+
+
+async def get_calculation_trends(days: int = 30, location: Optional[str] = None,
+                                 quality_level: Optional[str] = None):
+    """Daily estimate volume and cost per sq ft, read from the rollup buckets"""
+    pipeline = [
+        {"$match": _rollup_filter(days, location, quality_level)},
+        {"$group": {
+            "_id": {"day": "$day", "location": "$location", "quality_level": "$quality_level"},
+            "count": {"$sum": "$count"},
+            "total_cost": {"$sum": "$total_cost"},
+            "total_area": {"$sum": "$total_area"},
+            "min_cost_per_sqft": {"$min": "$min_cost_per_sqft"},
+            "max_cost_per_sqft": {"$max": "$max_cost_per_sqft"},
+        }},
+        {"$sort": {"_id.day": 1, "_id.location": 1, "_id.quality_level": 1}},
+    ]
+    trends = []
+    async for group in calculation_rollups_analytics.aggregate(pipeline):
+        key = group["_id"]
+        trends.append({
+            "day": key["day"].strftime("%Y-%m-%d"),
+            "location": key["location"],
+            "quality_level": key["quality_level"],
+            **_summarize(group),
+        })
+    return trends
+
+
+async def get_location_summary(days: int = 30, quality_level: Optional[str] = None):
+    """Totals per location and quality level over the last `days` days"""
+    pipeline = [
+        {"$match": _rollup_filter(days, None, quality_level)},
+        {"$group": {
+            "_id": {"location": "$location", "quality_level": "$quality_level"},
+            "count": {"$sum": "$count"},
+            "total_cost": {"$sum": "$total_cost"},
+            "total_area": {"$sum": "$total_area"},
+            "min_cost_per_sqft": {"$min": "$min_cost_per_sqft"},
+            "max_cost_per_sqft": {"$max": "$max_cost_per_sqft"},
+        }},
+        {"$sort": {"count": -1}},
+    ]
+    summary = []
+    async for group in calculation_rollups_analytics.aggregate(pipeline):
+        summary.append({**group["_id"], **_summarize(group)})
+    return summary
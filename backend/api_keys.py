@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from fastapi import Header, HTTPException, status
+from pymongo import ASCENDING, UpdateOne
+from database import api_keys_collection, api_key_usage_collection
+from config import (
+    API_KEY_SECRET,
+    API_KEY_REFRESH_SECONDS,
+    API_KEY_USAGE_FLUSH_SECONDS,
+    API_KEY_DEFAULT_DAILY_QUOTA,
+)
+
+KEY_PREFIX = "cp"
+
+# key_id -> {"digest", "partner", "daily_quota"}, reloaded from MongoDB periodically
+_key_index: Dict[str, dict] = {}
+# Today's request count per key: flushed usage from all instances plus local increments
+_usage_today: Dict[str, int] = defaultdict(int)
+# Local increments not yet written to MongoDB, by (key_id, day)
+_pending_usage: Dict[Tuple[str, str], int] = defaultdict(int)
+_usage_day = datetime.utcnow().strftime("%Y-%m-%d")
+_tasks = []
+
+_metrics = {
+    "authenticated": 0,
+    "rejected_invalid": 0,
+    "rejected_quota": 0,
+    "refreshes": 0,
+    "flushes": 0,
+}
+
+
+def _digest(secret: str) -> str:
+    return hmac.new(API_KEY_SECRET.encode(), secret.encode(), hashlib.sha256).hexdigest()
+
+
+def _today() -> str:
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+def _roll_day() -> str:
+    """Reset today's counters when the UTC day changes"""
+    global _usage_day
+    today = _today()
+    if today != _usage_day:
+        _usage_today.clear()
+        _usage_day = today
+    return today
+
+
+async def ensure_api_key_indexes():
+    await api_keys_collection.create_index([("key_id", ASCENDING)], unique=True)
+    await api_key_usage_collection.create_index([("day", ASCENDING)])
+
+
+async def refresh_key_index():
+    """Reload active keys and today's flushed usage from MongoDB"""
+    global _key_index
+    index = {}
+    async for key in api_keys_collection.find({"is_active": True}):
+        index[key["key_id"]] = {
+            "digest": key["digest"],
+            "partner": key["partner"],
+            "daily_quota": key.get("daily_quota", API_KEY_DEFAULT_DAILY_QUOTA),
+        }
+    _key_index = index
+
+    today = _roll_day()
+    async for usage in api_key_usage_collection.find({"day": today}):
+        # Flushed totals include this instance's earlier flushes; add what is still pending
+        _usage_today[usage["key_id"]] = usage["count"] + _pending_usage.get((usage["key_id"], today), 0)
+    _metrics["refreshes"] += 1
+
+
+async def flush_usage():
+    """Write pending usage counters with a single bulk_write"""
+    if not _pending_usage:
+        return
+    pending = dict(_pending_usage)
+    _pending_usage.clear()
+    operations = [
+        UpdateOne(
+            {"_id": f"{key_id}|{day}"},
+            {"$inc": {"count": count}, "$setOnInsert": {"key_id": key_id, "day": day}},
+            upsert=True,
+        )
+        for (key_id, day), count in pending.items()
+    ]
+    try:
+        await api_key_usage_collection.bulk_write(operations, ordered=False)
+        _metrics["flushes"] += 1
+    except Exception as e:
+        # Put the counts back so the next flush retries them
+        for usage_key, count in pending.items():
+            _pending_usage[usage_key] += count
+        print(f"Error flushing API key usage: {str(e)}")
+
+
+async def _every(seconds: float, func):
+    while True:
+        await asyncio.sleep(seconds)
+        try:
+            await func()
+        except Exception as e:
+            print(f"Error in API key background task: {str(e)}")
+
+
+async def start_api_key_tasks():
+    await refresh_key_index()
+    loop = asyncio.get_running_loop()
+    _tasks.append(loop.create_task(_every(API_KEY_REFRESH_SECONDS, refresh_key_index)))
+    _tasks.append(loop.create_task(_every(API_KEY_USAGE_FLUSH_SECONDS, flush_usage)))
+
+
+async def stop_api_key_tasks():
+    for task in _tasks:
+        task.cancel()
+    _tasks.clear()
+    await flush_usage()
+
+
+def authenticate_api_key(api_key: str) -> dict:
+    """Verify a key against the in-memory index and count it against its quota"""
+    try:
+        prefix, key_id, secret = api_key.split("_", 2)
+    except ValueError:
+        prefix, key_id, secret = "", "", ""
+    key = _key_index.get(key_id) if prefix == KEY_PREFIX else None
+    # Always compare a digest so unknown and wrong keys take the same time
+    expected = key["digest"] if key else _digest("")
+    if not hmac.compare_digest(_digest(secret), expected) or key is None:
+        _metrics["rejected_invalid"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+
+    today = _roll_day()
+    if _usage_today[key_id] >= key["daily_quota"]:
+        _metrics["rejected_quota"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Daily API quota exceeded",
+        )
+    _usage_today[key_id] += 1
+    _pending_usage[(key_id, today)] += 1
+    _metrics["authenticated"] += 1
+    return {"key_id": key_id, "partner": key["partner"]}
+
+
+async def get_optional_partner(x_api_key: Optional[str] = Header(None)) -> Optional[dict]:
+    """Partner identity for requests carrying X-API-Key; anonymous requests pass through"""
+    if x_api_key is None:
+        return None
+    return authenticate_api_key(x_api_key)
+
+
+async def create_api_key(partner: str, daily_quota: Optional[int] = None) -> dict:
+    """Create a key; the plaintext is returned once and only its digest is stored"""
+    key_id = secrets.token_hex(6)
+    secret = secrets.token_urlsafe(32)
+    key_doc = {
+        "key_id": key_id,
+        "digest": _digest(secret),
+        "partner": partner,
+        "daily_quota": daily_quota or API_KEY_DEFAULT_DAILY_QUOTA,
+        "is_active": True,
+        "created_at": datetime.now(),
+    }
+    await api_keys_collection.insert_one(key_doc)
+    _key_index[key_id] = {
+        "digest": key_doc["digest"],
+        "partner": partner,
+        "daily_quota": key_doc["daily_quota"],
+    }
+    return {
+        "key_id": key_id,
+        "partner": partner,
+        "daily_quota": key_doc["daily_quota"],
+        "api_key": f"{KEY_PREFIX}_{key_id}_{secret}",
+    }
+
+
+async def revoke_api_key(key_id: str) -> bool:
+    result = await api_keys_collection.update_one(
+        {"key_id": key_id, "is_active": True},
+        {"$set": {"is_active": False, "revoked_at": datetime.now()}},
+    )
+    # Other instances drop the key on their next refresh
+    _key_index.pop(key_id, None)
+    return result.modified_count == 1
+
+
+async def list_api_keys():
+    keys = []
+    async for key in api_keys_collection.find({}, {"digest": 0}):
+        key["_id"] = str(key["_id"])
+        key["usage_today"] = _usage_today.get(key["key_id"], 0)
+        keys.append(key)
+    return keys
+
+
+def get_api_key_metrics():
+    return {
+        "active_keys": len(_key_index),
+        "pending_usage": sum(_pending_usage.values()),
+        **_metrics,
+    }
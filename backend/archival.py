@@ -0,0 +1,158 @@
+import asyncio
+import gzip
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import json_util
+from pymongo import ASCENDING, ReplaceOne
+from database import calculations_collection, job_checkpoints_collection
+from migrations import upgrade_document
+from config import ARCHIVE_DIR, ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_SIZE
+
+ARCHIVE_JOB_ID = "calculations_archive"
+
+
+def _stub(calculation: dict, archive_path: str) -> dict:
+    """Summary kept in Mongo once the full calculation is archived"""
+    breakdown = calculation.get("breakdown", {})
+    return upgrade_document("calculations", {
+        "_id": calculation["_id"],
+        "project_id": calculation.get("project_id"),
+        "total_cost": calculation.get("total_cost"),
+        "location": calculation.get("location"),
+        "created_at": calculation.get("created_at"),
+        "breakdown": {
+            "quality_level": breakdown.get("quality_level"),
+            "area": breakdown.get("area"),
+            "cost_per_sqft": breakdown.get("cost_per_sqft"),
+        },
+        "archived": True,
+        "archive_path": archive_path,
+        "archived_at": datetime.now(),
+    })
+
+
+def _write_partition(relative_path: str, calculations: list):
+    """Atomically write one gzip-compressed JSONL partition file"""
+    path = os.path.join(ARCHIVE_DIR, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as archive_file:
+        for calculation in calculations:
+            archive_file.write(json_util.dumps(calculation) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _read_from_partition(relative_path: str, calculation_id):
+    path = os.path.join(ARCHIVE_DIR, relative_path)
+    with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+        for line in archive_file:
+            calculation = json_util.loads(line)
+            if calculation["_id"] == calculation_id:
+                return calculation
+    return None
+
+
+async def ensure_archive_indexes():
+    """Create indexes used to look up calculations and their stubs"""
+    await calculations_collection.create_index([("project_id", ASCENDING)])
+
+
+async def _archive_batch(calculations: list) -> int:
+    # Partition by creation date; the file name is the batch's first _id so a
+    # retried batch overwrites its own files instead of duplicating them
+    batch_name = str(calculations[0]["_id"])
+    partitions = {}
+    for calculation in calculations:
+        created_at = calculation.get("created_at") or datetime.now()
+        relative_path = os.path.join(
+            "calculations",
+            created_at.strftime("%Y"),
+            created_at.strftime("%m"),
+            created_at.strftime("%d"),
+            f"{batch_name}.jsonl.gz",
+        )
+        partitions.setdefault(relative_path, []).append(calculation)
+
+    for relative_path, partition in partitions.items():
+        await asyncio.to_thread(_write_partition, relative_path, partition)
+
+    operations = []
+    for relative_path, partition in partitions.items():
+        for calculation in partition:
+            operations.append(ReplaceOne(
+                {"_id": calculation["_id"], "archived": {"$ne": True}},
+                _stub(calculation, relative_path),
+            ))
+    result = await calculations_collection.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def archive_old_calculations(max_age_days: Optional[int] = None,
+                                   batch_size: int = ARCHIVE_BATCH_SIZE):
+    """Move calculations older than `max_age_days` into compressed archive files.
+
+    Runs in `_id` order with the last archived `_id` checkpointed after every
+    batch, so an interrupted run resumes where it stopped.
+    """
+    max_age_days = max_age_days or ARCHIVE_AFTER_DAYS
+    cutoff = datetime.now() - timedelta(days=max_age_days)
+
+    checkpoint = await job_checkpoints_collection.find_one({"_id": ARCHIVE_JOB_ID})
+    last_id = checkpoint.get("last_id") if checkpoint and checkpoint.get("status") == "running" else None
+    archived = checkpoint.get("archived", 0) if last_id else 0
+
+    while True:
+        query = {"created_at": {"$lt": cutoff}, "archived": {"$ne": True}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await calculations_collection.find(query).sort("_id", ASCENDING).to_list(batch_size)
+        if not batch:
+            break
+        archived += await _archive_batch(batch)
+        last_id = batch[-1]["_id"]
+        await job_checkpoints_collection.update_one(
+            {"_id": ARCHIVE_JOB_ID},
+            {"$set": {
+                "status": "running",
+                "last_id": last_id,
+                "archived": archived,
+                "cutoff": cutoff,
+                "updated_at": datetime.now(),
+            }},
+            upsert=True,
+        )
+
+    await job_checkpoints_collection.update_one(
+        {"_id": ARCHIVE_JOB_ID},
+        {"$set": {"status": "completed", "archived": archived, "cutoff": cutoff, "updated_at": datetime.now()},
+         "$unset": {"last_id": ""}},
+        upsert=True,
+    )
+    return {"archived": archived, "cutoff": cutoff}
+
+
+async def get_archive_status():
+    """Get the checkpoint of the last archival run"""
+    checkpoint = await job_checkpoints_collection.find_one({"_id": ARCHIVE_JOB_ID})
+    if checkpoint is None:
+        return {"status": "never_run"}
+    checkpoint.pop("_id")
+    if "last_id" in checkpoint:
+        checkpoint["last_id"] = str(checkpoint["last_id"])
+    return checkpoint
+
+
+async def get_calculation(project_id: str) -> Optional[dict]:
+    """Get a calculation, reading its full detail back from the archive if needed"""
+    calculation = await calculations_collection.find_one({"project_id": project_id})
+    if calculation is None or not calculation.get("archived"):
+        return upgrade_document("calculations", calculation)
+    archived = await asyncio.to_thread(
+        _read_from_partition, calculation["archive_path"], calculation["_id"]
+    )
+    if archived is None:
+        return upgrade_document("calculations", calculation)
+    archived["archived"] = True
+    archived["archive_path"] = calculation["archive_path"]
+    return upgrade_document("calculations", archived)
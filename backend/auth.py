@@ -1,20 +1,38 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+import time
+import uuid
 from database import users_collection, admins_collection
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from lru_cache import LRUCache
+from token_revocation import is_token_revoked, revoke_token
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+from config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_SIZE,
+    TOKEN_CLAIMS_CACHE_SIZE
+)
+from password_hasher import (
+    verify_password,
+    verify_and_update_password,
+    get_password_hash,
+    schedule_rehash
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# Decoded JWT claims by raw token, so identical tokens are verified once
+_claims_cache = LRUCache(TOKEN_CLAIMS_CACHE_SIZE)
+# Slim principal documents by (kind, subject, token expiry); never holds password hashes
+_principal_cache = LRUCache(PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+PRINCIPAL_PROJECTION = {"hashed_password": 0}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -22,10 +40,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+async def ensure_auth_indexes():
+    """Unique email indexes keep concurrent registrations from creating duplicate accounts.
+
+    Startup fails if existing duplicates block an index: registering without
+    it would allow duplicates again under concurrency.
+    """
+    for collection in (users_collection, admins_collection):
+        try:
+            await collection.create_index([("email", ASCENDING)], unique=True)
+        except OperationFailure as e:
+            raise RuntimeError(
+                f"Could not create unique email index on {collection.name}; "
+                f"remove duplicate emails and restart: {str(e)}"
+            ) from e
+
+def decode_token(token: str) -> dict:
+    """Verify and decode a JWT, reusing the result for tokens seen before"""
+    payload = _claims_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        _claims_cache.set(token, payload, ttl=max(0, payload.get("exp", 0) - time.time()))
+    elif payload.get("exp", 0) <= time.time():
+        _claims_cache.pop(token)
+        raise JWTError("Signature has expired.")
+    return payload
+
+async def _load_principal(kind: str, collection, email: str, exp: int) -> Optional[dict]:
+    key = (kind, email, exp)
+    principal = _principal_cache.get(key)
+    if principal is None:
+        principal = await collection.find_one({"email": email}, PRINCIPAL_PROJECTION)
+        if principal is None or not principal.get("is_active", True):
+            return None
+        _principal_cache.set(key, principal, ttl=min(PRINCIPAL_CACHE_TTL_SECONDS, max(0, exp - time.time())))
+    # Routes may mutate the returned document, so hand out a copy
+    return dict(principal)
+
+def invalidate_principal(email: str, kind: Optional[str] = None):
+    """Drop cached principals for `email` after it is modified or deactivated"""
+    _principal_cache.discard_where(lambda key: key[1] == email and (kind is None or key[0] == kind))
+
+async def revoke_access_token(token: str, reason: str = "revoked") -> bool:
+    """Revoke a still-valid access token by its jti"""
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        return False
+    if "jti" not in payload:
+        return False
+    await revoke_token(payload["jti"], datetime.utcfromtimestamp(payload["exp"]), reason)
+    return True
+
+def get_auth_cache_metrics():
+    return {
+        "token_claims": _claims_cache.stats(),
+        "principals": _principal_cache.stats()
+    }
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,13 +109,15 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = await users_collection.find_one({"email": email})
+    if "jti" in payload and await is_token_revoked(payload["jti"]):
+        raise credentials_exception
+    user = await _load_principal("user", users_collection, email, payload.get("exp", 0))
     if user is None:
         raise credentials_exception
     return user
@@ -51,14 +129,16 @@ async def get_current_admin(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         email: str = payload.get("sub")
         admin_type: str = payload.get("type")
         if email is None or admin_type != "admin":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    admin = await admins_collection.find_one({"email": email})
+    if "jti" in payload and await is_token_revoked(payload["jti"]):
+        raise credentials_exception
+    admin = await _load_principal("admin", admins_collection, email, payload.get("exp", 0))
     if admin is None:
         raise credentials_exception
     return admin
\ No newline at end of file
@@ -15,4 +15,108 @@ MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/constructpune_db")
 ALLOWED_ORIGINS = ["*"]
 ALLOWED_METHODS = ["*"]
 ALLOWED_HEADERS = ["*"]
-ALLOW_CREDENTIALS = True
\ No newline at end of file
+ALLOW_CREDENTIALS = True
+
+# MongoDB connection pool
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "constructpune_db")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 10))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 20000))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000))
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", 10))
+
+# MongoDB read routing (primary, primaryPreferred, secondary, secondaryPreferred, nearest)
+MONGO_CATALOG_READ_PREFERENCE = os.getenv("MONGO_CATALOG_READ_PREFERENCE", "secondaryPreferred")
+MONGO_ANALYTICS_READ_PREFERENCE = os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", "secondaryPreferred")
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", -1))
+
+# Calculation archival
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 365))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+
+# Maintenance operations
+INSTANCE_ID = os.getenv("INSTANCE_ID", "local")
+MAINTENANCE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", 500))
+MAINTENANCE_BATCH_DELAY_SECONDS = float(os.getenv("MAINTENANCE_BATCH_DELAY_SECONDS", 0.1))
+MAINTENANCE_TARGET_LAG_SECONDS = float(os.getenv("MAINTENANCE_TARGET_LAG_SECONDS", 2))
+MAINTENANCE_MAX_LAG_SECONDS = float(os.getenv("MAINTENANCE_MAX_LAG_SECONDS", 10))
+# Assumed lag when replSetGetStatus is not authorized; keep below MAINTENANCE_MAX_LAG_SECONDS
+REPLICATION_LAG_UNKNOWN_SECONDS = float(os.getenv("REPLICATION_LAG_UNKNOWN_SECONDS", MAINTENANCE_TARGET_LAG_SECONDS))
+
+# Password hashing thread pool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+# bcrypt work factor; run `python -m password_hasher --target-ms 250` on the host to calibrate
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_REHASH_BATCH_SIZE = int(os.getenv("PASSWORD_REHASH_BATCH_SIZE", 100))
+PASSWORD_REHASH_FLUSH_SECONDS = float(os.getenv("PASSWORD_REHASH_FLUSH_SECONDS", 5))
+
+# Authenticated-principal caching
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 30))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+TOKEN_CLAIMS_CACHE_SIZE = int(os.getenv("TOKEN_CLAIMS_CACHE_SIZE", 10000))
+
+# Refresh tokens
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+REFRESH_TOKEN_SECRET = os.getenv("REFRESH_TOKEN_SECRET", SECRET_KEY)
+
+# Login throttling (token buckets checked before any password hashing)
+LOGIN_THROTTLE_BACKEND = os.getenv("LOGIN_THROTTLE_BACKEND", "memory")  # memory or mongo
+LOGIN_IP_BURST = int(os.getenv("LOGIN_IP_BURST", 20))
+LOGIN_IP_PER_MINUTE = float(os.getenv("LOGIN_IP_PER_MINUTE", 10))
+LOGIN_ACCOUNT_BURST = int(os.getenv("LOGIN_ACCOUNT_BURST", 5))
+LOGIN_ACCOUNT_PER_MINUTE = float(os.getenv("LOGIN_ACCOUNT_PER_MINUTE", 5))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 100000))
+# Number of reverse proxies in front of the app that append to X-Forwarded-For
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 1))
+
+# Partner API keys
+API_KEY_SECRET = os.getenv("API_KEY_SECRET", SECRET_KEY)
+API_KEY_REFRESH_SECONDS = float(os.getenv("API_KEY_REFRESH_SECONDS", 30))
+API_KEY_USAGE_FLUSH_SECONDS = float(os.getenv("API_KEY_USAGE_FLUSH_SECONDS", 10))
+API_KEY_DEFAULT_DAILY_QUOTA = int(os.getenv("API_KEY_DEFAULT_DAILY_QUOTA", 10000))
+
+# Access token revocation
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", 15))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", 0.001))
+
+# SEO optimization
+SEO_BULK_CONCURRENCY = int(os.getenv("SEO_BULK_CONCURRENCY", 8))
+SEO_BULK_WRITE_SIZE = int(os.getenv("SEO_BULK_WRITE_SIZE", 50))
+SEO_PROVIDER_TIMEOUT_SECONDS = float(os.getenv("SEO_PROVIDER_TIMEOUT_SECONDS", 10))
+
+# LLM provider for SEO suggestions ("mock" keeps the built-in simulated responses)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "mock")  # mock, groq or stub
+GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+LLM_STUB_URL = os.getenv("LLM_STUB_URL", "http://localhost:8090/v1")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 16))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_RETRY_BASE_SECONDS = float(os.getenv("LLM_RETRY_BASE_SECONDS", 0.5))
+LLM_RETRY_MAX_SECONDS = float(os.getenv("LLM_RETRY_MAX_SECONDS", 8))
+SEO_CACHE_SIZE = int(os.getenv("SEO_CACHE_SIZE", 1000))
+SEO_CACHE_TTL_DAYS = int(os.getenv("SEO_CACHE_TTL_DAYS", 30))
+
+# Nightly site-wide SEO audit
+SEO_AUDIT_SCHEDULE_ENABLED = os.getenv("SEO_AUDIT_SCHEDULE_ENABLED", "true").lower() == "true"
+SEO_AUDIT_HOUR_UTC = int(os.getenv("SEO_AUDIT_HOUR_UTC", 2))
+SEO_AUDIT_BATCH_SIZE = int(os.getenv("SEO_AUDIT_BATCH_SIZE", 50))
+SEO_AUDIT_WORKERS = int(os.getenv("SEO_AUDIT_WORKERS", 2))
+
+# Sitemap and robots.txt
+SITE_URL = os.getenv("SITE_URL", "https://constructpune.in").rstrip("/")
+SITEMAP_MAX_URLS = int(os.getenv("SITEMAP_MAX_URLS", 50000))
+SITEMAP_REFRESH_SECONDS = float(os.getenv("SITEMAP_REFRESH_SECONDS", 60))
+SITEMAP_REBUILD_HOURS = float(os.getenv("SITEMAP_REBUILD_HOURS", 24))
+READABILITY_CACHE_SIZE = int(os.getenv("READABILITY_CACHE_SIZE", 5000))
+
+# In-memory content indexes over service pages (near-duplicates, keywords, links)
+PAGE_INDEX_REFRESH_SECONDS = float(os.getenv("PAGE_INDEX_REFRESH_SECONDS", 60))
+PAGE_INDEX_REBUILD_HOURS = float(os.getenv("PAGE_INDEX_REBUILD_HOURS", 24))
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.7))
@@ -1,19 +1,194 @@
+import asyncio
+from typing import Dict, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+)
+from config import (
+    MONGO_URL,
+    MONGO_DB_NAME,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_WARMUP_CONNECTIONS,
+    MONGO_CATALOG_READ_PREFERENCE,
+    MONGO_ANALYTICS_READ_PREFERENCE,
+    MONGO_MAX_STALENESS_SECONDS,
+    REPLICATION_LAG_UNKNOWN_SECONDS,
+)
 
-load_dotenv()
 
-# MongoDB connection
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/constructpune_db")
-client = AsyncIOMotorClient(MONGO_URL)
-db = client.constructpune_db
+def _read_preference(mode: str):
+    """Build a pymongo read preference from its connection-string name"""
+    if mode == "primary":
+        return Primary()
+    modes = {
+        "primaryPreferred": PrimaryPreferred,
+        "secondary": Secondary,
+        "secondaryPreferred": SecondaryPreferred,
+        "nearest": Nearest,
+    }
+    if mode not in modes:
+        raise ValueError(f"Unknown read preference: {mode}")
+    return modes[mode](max_staleness=MONGO_MAX_STALENESS_SECONDS)
+
+
+# Read routing: writes and admin reads stay on the primary (read-your-writes),
+# public catalog and analytics reads may be served by any replica set member.
+PRIMARY_READS = Primary()
+CATALOG_READS = _read_preference(MONGO_CATALOG_READ_PREFERENCE)
+ANALYTICS_READS = _read_preference(MONGO_ANALYTICS_READ_PREFERENCE)
+
+# MongoDB connection, created in the application lifespan
+client: Optional[AsyncIOMotorClient] = None
+_collections: Dict[Tuple[str, int, int], object] = {}
+
+
+async def connect_to_mongo():
+    """Create the shared Motor client and warm its connection pool"""
+    global client
+    if client is not None:
+        return client
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    )
+    _collections.clear()
+    await warm_connection_pool()
+    return client
+
+
+async def warm_connection_pool():
+    """Open connections up front so the first requests don't pay the handshake"""
+    if MONGO_WARMUP_CONNECTIONS <= 0:
+        return
+    # Concurrent pings force the pool to open that many sockets per member
+    pings = []
+    for read_preference in (PRIMARY_READS, CATALOG_READS):
+        for _ in range(MONGO_WARMUP_CONNECTIONS):
+            pings.append(client.admin.command("ping", read_preference=read_preference))
+    await asyncio.gather(*pings)
+
+
+async def close_mongo_connection():
+    """Close the shared Motor client"""
+    global client
+    if client is not None:
+        client.close()
+        client = None
+        _collections.clear()
+
+
+# replSetGetStatus error code on a standalone server
+NO_REPLICATION_ENABLED = 76
+_lag_warning_printed = False
+
+
+async def get_replication_lag() -> float:
+    """Seconds the slowest secondary is behind the primary (0 on a standalone).
+
+    When the replica set status cannot be read, e.g. without the
+    clusterMonitor role, REPLICATION_LAG_UNKNOWN_SECONDS is returned so
+    callers keep throttling instead of assuming no lag.
+    """
+    global _lag_warning_printed
+    try:
+        status = await client.admin.command("replSetGetStatus")
+    except OperationFailure as e:
+        if e.code == NO_REPLICATION_ENABLED:
+            return 0.0
+        if not _lag_warning_printed:
+            print(f"Could not read replication lag, assuming {REPLICATION_LAG_UNKNOWN_SECONDS}s: {str(e)}")
+            _lag_warning_printed = True
+        return REPLICATION_LAG_UNKNOWN_SECONDS
+    members = status.get("members", [])
+    primary = next((m for m in members if m.get("stateStr") == "PRIMARY"), None)
+    if primary is None:
+        return 0.0
+    lags = [
+        (primary["optimeDate"] - m["optimeDate"]).total_seconds()
+        for m in members
+        if m.get("stateStr") == "SECONDARY" and m.get("optimeDate")
+    ]
+    return max(lags, default=0.0)
+
+
+def get_database():
+    """Get the application database from the shared client"""
+    if client is None:
+        raise RuntimeError("MongoDB client is not connected; call connect_to_mongo() first")
+    return client[MONGO_DB_NAME]
+
+
+def get_collection(name: str, read_preference=PRIMARY_READS):
+    """Get a collection bound to the given read preference"""
+    key = (name, read_preference.mode, read_preference.max_staleness)
+    collection = _collections.get(key)
+    if collection is None:
+        collection = get_database().get_collection(name, read_preference=read_preference)
+        _collections[key] = collection
+    return collection
+
+
+class CollectionHandle:
+    """Module-level handle that resolves to the live collection on each use.
+
+    Lets routes import collections at module load while the client itself is
+    only created inside the application lifespan.
+    """
+
+    def __init__(self, name: str, read_preference=PRIMARY_READS):
+        self.name = name
+        self.read_preference = read_preference
+
+    def with_reads(self, read_preference):
+        """Return a handle to the same collection with another read preference"""
+        return CollectionHandle(self.name, read_preference)
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self.name, self.read_preference), attr)
+
+    def __getitem__(self, key):
+        return get_collection(self.name, self.read_preference)[key]
+
 
 # Database collections
-contacts_collection = db.contacts
-projects_collection = db.projects
-calculations_collection = db.calculations
-users_collection = db.users
-admins_collection = db.admins
-seo_data_collection = db.seo_data
-service_pages_collection = db.service_pages
\ No newline at end of file
+contacts_collection = CollectionHandle("contacts")
+projects_collection = CollectionHandle("projects")
+calculations_collection = CollectionHandle("calculations")
+users_collection = CollectionHandle("users")
+admins_collection = CollectionHandle("admins")
+seo_data_collection = CollectionHandle("seo_data")
+service_pages_collection = CollectionHandle("service_pages")
+calculation_rollups_collection = CollectionHandle("calculation_rollups")
+job_checkpoints_collection = CollectionHandle("job_checkpoints")
+maintenance_operations_collection = CollectionHandle("maintenance_operations")
+migrations_collection = CollectionHandle("migrations")
+sessions_collection = CollectionHandle("sessions")
+rate_limits_collection = CollectionHandle("rate_limits")
+api_keys_collection = CollectionHandle("api_keys")
+api_key_usage_collection = CollectionHandle("api_key_usage")
+revoked_tokens_collection = CollectionHandle("revoked_tokens")
+seo_cache_collection = CollectionHandle("seo_cache")
+seo_audits_collection = CollectionHandle("seo_audits")
+
+# Secondary-eligible handles for public catalog and analytics reads
+projects_catalog = projects_collection.with_reads(CATALOG_READS)
+service_pages_catalog = service_pages_collection.with_reads(CATALOG_READS)
+calculations_analytics = calculations_collection.with_reads(ANALYTICS_READS)
+calculation_rollups_analytics = calculation_rollups_collection.with_reads(ANALYTICS_READS)
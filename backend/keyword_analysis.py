@@ -0,0 +1,106 @@
+import html
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['’][a-z]+)?")
+TAG_PATTERN = re.compile(r"<[^>]*>")
+DEFAULT_MAX_POSITIONS = 100
+# Bump when tokenization or matching changes so cached SEO results are recomputed
+ANALYZER_VERSION = 1
+
+
+def tokenize(content: str) -> List[str]:
+    """Lowercase word tokens, with HTML tags and entities removed"""
+    text = html.unescape(TAG_PATTERN.sub(" ", content)).lower()
+    return TOKEN_PATTERN.findall(text)
+
+
+class KeywordAutomaton:
+    """Word-level Aho-Corasick automaton over a fixed keyword list"""
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.keywords = keywords
+        self.lengths = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(keywords):
+            tokens = tokenize(keyword)
+            self.lengths.append(len(tokens))
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                next_state = self._goto[state].get(token)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][token] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(index)
+
+        # Breadth-first failure links; outputs of the fallback state are inherited
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, tokens: List[str]):
+        """Yield (keyword_index, start_token_index) for every match"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in output[state]:
+                yield index, position - self.lengths[index] + 1
+
+
+@lru_cache(maxsize=128)
+def build_automaton(keywords: Tuple[str, ...]) -> KeywordAutomaton:
+    return KeywordAutomaton(keywords)
+
+
+def analyze_keywords(content: str, keywords: List[str], max_positions: int = DEFAULT_MAX_POSITIONS,
+                     tokens: List[str] = None) -> dict:
+    """Count, density and word positions of every keyword in one pass.
+
+    The content is tokenized once and all keywords and phrases are matched on
+    whole-word boundaries in a single scan, however many there are. Density
+    is occurrences per 100 words. Positions are word offsets of each match,
+    capped at `max_positions` per keyword. Pass `tokens` to reuse an existing
+    tokenization of `content`.
+    """
+    if tokens is None:
+        tokens = tokenize(content)
+    word_count = len(tokens)
+    automaton = build_automaton(tuple(keywords))
+    counts = [0] * len(keywords)
+    positions: List[List[int]] = [[] for _ in keywords]
+    for index, start in automaton.scan(tokens):
+        counts[index] += 1
+        if len(positions[index]) < max_positions:
+            positions[index].append(start)
+
+    analysis = {}
+    for index, keyword in enumerate(keywords):
+        density = (counts[index] / word_count) * 100 if word_count > 0 else 0
+        analysis[keyword] = {
+            "count": counts[index],
+            "density": round(density, 2),
+            "positions": positions[index],
+        }
+    return {"word_count": word_count, "keywords": analysis}
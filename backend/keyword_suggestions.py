@@ -0,0 +1,215 @@
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from keyword_analysis import tokenize
+
+MAX_NGRAM = 3
+TOP_TERMS = 25
+# A competing page must weight a term at least this fraction of the page's own weight
+CANNIBALIZATION_RATIO = 0.5
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how
+i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out over own
+same she should so some such than that the their theirs them then there these they this those through to too under
+until up very was we were what when where which while who whom why will with you your yours us get got
+""".split())
+
+
+def extract_terms(document: dict) -> Counter:
+    """Unigram, bigram and trigram counts; titles count twice, stopwords never start or end a phrase"""
+    counts = Counter()
+    for field, weight in (("title", 2), ("description", 1), ("content", 1)):
+        tokens = tokenize(str(document.get(field) or ""))
+        for n in range(1, MAX_NGRAM + 1):
+            for i in range(len(tokens) - n + 1):
+                gram = tokens[i:i + n]
+                if gram[0] in STOPWORDS or gram[-1] in STOPWORDS or gram[0].isdigit():
+                    continue
+                counts[" ".join(gram)] += weight
+    return counts
+
+
+class TfidfIndex:
+    """Sparse TF-IDF rows over the service page and project corpus.
+
+    Term counts per document and corpus document frequencies are updated one
+    document at a time. Weights and each service page's top terms are
+    recomputed lazily after writes, so queries only read precomputed rows.
+    """
+
+    def __init__(self):
+        self.term_counts: Dict[str, Counter] = {}
+        self.document_frequency: Counter = Counter()
+        self.target_keywords: Dict[str, List[str]] = {}
+        self._weights: Dict[str, Dict[str, float]] = {}
+        self._top_terms: Dict[str, Dict[str, float]] = {}
+        self._top_term_pages: Dict[str, set] = defaultdict(set)
+        self._stale = True
+
+    def update(self, path: str, document: Optional[dict]):
+        old = self.term_counts.pop(path, None)
+        if old is not None:
+            self.document_frequency.subtract(old.keys())
+            for term in old:
+                if self.document_frequency[term] <= 0:
+                    del self.document_frequency[term]
+        self.target_keywords.pop(path, None)
+        if document is not None:
+            counts = extract_terms(document)
+            self.term_counts[path] = counts
+            self.document_frequency.update(counts.keys())
+            keywords = (document.get("seo_data") or {}).get("keywords") or []
+            if keywords:
+                self.target_keywords[path] = [keyword.lower() for keyword in keywords]
+        self._stale = True
+
+    def idf(self, term: str) -> float:
+        return math.log((1 + len(self.term_counts)) / (1 + self.document_frequency.get(term, 0))) + 1
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        """L2-normalized sublinear TF-IDF weights"""
+        weights = {term: (1 + math.log(count)) * self.idf(term) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def _refresh(self):
+        if not self._stale:
+            return
+        self._weights = {path: self._vector(counts) for path, counts in self.term_counts.items()}
+        self._top_terms = {}
+        self._top_term_pages = defaultdict(set)
+        for path, weights in self._weights.items():
+            if not path.startswith("/services/"):
+                continue
+            top = dict(sorted(weights.items(), key=lambda item: -item[1])[:TOP_TERMS])
+            self._top_terms[path] = top
+            for term in top:
+                self._top_term_pages[term].add(path)
+        self._stale = False
+
+    def _ranked(self, weights: Dict[str, float], limit: int) -> dict:
+        ranked = sorted(weights.items(), key=lambda item: -item[1])
+        terms = [{"term": term, "score": round(score, 4)} for term, score in ranked if " " not in term][:limit]
+        phrases = [{"term": term, "score": round(score, 4)} for term, score in ranked if " " in term][:limit]
+        return {"terms": terms, "phrases": phrases}
+
+    def _competitors(self, path: str, term: str, own_weight: float) -> List[dict]:
+        competitors = []
+        for other in self._top_term_pages.get(term, ()):
+            other_weight = self._weights[other].get(term, 0)
+            if other != path and other_weight >= own_weight * CANNIBALIZATION_RATIO:
+                competitors.append({"page_path": other, "score": round(other_weight, 4)})
+        for other, keywords in self.target_keywords.items():
+            if other != path and term in keywords and not any(c["page_path"] == other for c in competitors):
+                competitors.append({"page_path": other, "score": round(self._weights.get(other, {}).get(term, 0), 4), "target_keyword": True})
+        return sorted(competitors, key=lambda competitor: -competitor["score"])
+
+    def suggest_for_page(self, path: str, limit: int = 15) -> Optional[dict]:
+        self._refresh()
+        weights = self._weights.get(path)
+        if weights is None:
+            return None
+        suggestions = self._ranked(weights, limit)
+        cannibalization = []
+        checked = list(self._top_terms.get(path, {})) + self.target_keywords.get(path, [])
+        for term in dict.fromkeys(checked):
+            competitors = self._competitors(path, term, weights.get(term, 0))
+            if competitors:
+                cannibalization.append({"term": term, "score": round(weights.get(term, 0), 4), "competing_pages": competitors})
+        return {
+            "page_path": path,
+            "target_keywords": self.target_keywords.get(path, []),
+            **suggestions,
+            "cannibalization": cannibalization,
+        }
+
+    def similar_documents(self, path: str, limit: int = 5, prefix: str = "") -> List[dict]:
+        """Documents closest to `path` by cosine similarity of their TF-IDF rows"""
+        self._refresh()
+        weights = self._weights.get(path)
+        if weights is None:
+            return []
+        matches = []
+        for other, other_weights in self._weights.items():
+            if other == path or not other.startswith(prefix):
+                continue
+            # Iterate the shorter row of the two sparse vectors
+            short, long = (weights, other_weights) if len(weights) <= len(other_weights) else (other_weights, weights)
+            similarity = sum(weight * long.get(term, 0) for term, weight in short.items())
+            if similarity > 0:
+                matches.append({"page_path": other, "similarity": round(similarity, 4)})
+        return sorted(matches, key=lambda match: -match["similarity"])[:limit]
+
+    def top_phrase(self, path: str) -> Optional[str]:
+        self._refresh()
+        for term in self._top_terms.get(path, {}):
+            if " " in term:
+                return term
+        return next(iter(self._top_terms.get(path, {})), None)
+
+    def suggest_for_text(self, document: dict, limit: int = 15) -> dict:
+        """Distinguishing terms of unsaved content against the indexed corpus"""
+        self._refresh()
+        weights = self._vector(extract_terms(document))
+        suggestions = self._ranked(weights, limit)
+        for suggestion in suggestions["terms"] + suggestions["phrases"]:
+            suggestion["already_targeted_by"] = sorted(self._top_term_pages.get(suggestion["term"], ()))
+        return suggestions
+
+    def cannibalization_report(self, limit: int = 50) -> List[dict]:
+        """Terms that several service pages compete for, strongest overlaps first"""
+        self._refresh()
+        report = []
+        for term, pages in self._top_term_pages.items():
+            if len(pages) < 2:
+                continue
+            scored = sorted(
+                ({"page_path": path, "score": round(self._weights[path][term], 4)} for path in pages),
+                key=lambda page: -page["score"]
+            )
+            report.append({"term": term, "pages": scored, "overlap": round(sum(page["score"] for page in scored[1:]), 4)})
+        target_pages = defaultdict(list)
+        for path, keywords in self.target_keywords.items():
+            for keyword in keywords:
+                target_pages[keyword].append(path)
+        for keyword, pages in target_pages.items():
+            if len(pages) > 1 and keyword not in self._top_term_pages:
+                report.append({"term": keyword, "pages": [{"page_path": path, "target_keyword": True} for path in sorted(pages)], "overlap": 0})
+        return sorted(report, key=lambda item: -item["overlap"])[:limit]
+
+
+_index = TfidfIndex()
+
+
+def index_document(path: str, document: Optional[dict]):
+    """page_indexes handler"""
+    _index.update(path, document)
+
+
+def suggest_keywords(page_path: str, limit: int = 15) -> Optional[dict]:
+    return _index.suggest_for_page(page_path, limit)
+
+
+def similar_documents(path: str, limit: int = 5, prefix: str = "") -> List[dict]:
+    return _index.similar_documents(path, limit, prefix)
+
+
+def top_phrase(path: str) -> Optional[str]:
+    return _index.top_phrase(path)
+
+
+def suggest_keywords_for_content(content: str, title: str = "", limit: int = 15) -> dict:
+    return _index.suggest_for_text({"title": title, "content": content}, limit)
+
+
+def get_cannibalization_report(limit: int = 50) -> List[dict]:
+    return _index.cannibalization_report(limit)
+
+
+def get_keyword_index_metrics():
+    return {
+        "documents": len(_index.term_counts),
+        "terms": len(_index.document_frequency),
+        "nonzeros": sum(len(counts) for counts in _index.term_counts.values()),
+    }
@@ -0,0 +1,182 @@
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set
+from urllib.parse import urljoin, urlparse
+from seo_audit import SITE_HOSTS
+from sitemap import STATIC_PAGES
+from keyword_suggestions import similar_documents, top_phrase
+
+DAMPING = 0.85
+TOLERANCE = 1e-8
+MAX_ITERATIONS = 100
+MIN_INBOUND_LINKS = 2
+
+
+class LinkParser(HTMLParser):
+    """Collects normalized internal link targets from the HTML of the page at `page_path`"""
+
+    def __init__(self, page_path: str):
+        super().__init__(convert_charrefs=True)
+        self.page_path = page_path
+        self.targets: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = (dict(attrs).get("href") or "").strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            return
+        # Relative hrefs resolve against the page, as a browser would
+        url = urlparse(urljoin(self.page_path, href))
+        if url.netloc and url.netloc.lower() not in SITE_HOSTS:
+            return
+        self.targets.append("/" + url.path.strip("/"))
+
+
+def internal_links(content: str, page_path: str) -> Set[str]:
+    parser = LinkParser(page_path)
+    parser.feed(content or "")
+    parser.close()
+    return set(parser.targets)
+
+
+class LinkGraph:
+    """Internal links between service pages, with PageRank recomputed lazily after changes"""
+
+    def __init__(self):
+        self.out_links: Dict[str, Set[str]] = {}
+        self.ranks: Dict[str, float] = {}
+        self.iterations = 0
+        self._stale = True
+
+    def update(self, page_path: str, content: Optional[str]):
+        if content is None:
+            self.out_links.pop(page_path, None)
+        else:
+            self.out_links[page_path] = internal_links(content, page_path) - {page_path}
+        self._stale = True
+
+    def in_links(self) -> Dict[str, Set[str]]:
+        inbound = defaultdict(set)
+        for source, targets in self.out_links.items():
+            for target in targets:
+                if target in self.out_links:
+                    inbound[target].add(source)
+        return inbound
+
+    def _pagerank(self):
+        """Sparse power iteration, warm-started from the previous ranks"""
+        if not self._stale:
+            return
+        pages = list(self.out_links)
+        count = len(pages)
+        if not count:
+            self.ranks, self.iterations, self._stale = {}, 0, False
+            return
+        edges = {page: [target for target in self.out_links[page] if target in self.out_links] for page in pages}
+        previous = {page: self.ranks.get(page, 1 / count) for page in pages}
+        total = sum(previous.values())
+        ranks = {page: rank / total for page, rank in previous.items()}
+
+        for iteration in range(1, MAX_ITERATIONS + 1):
+            # Pages without outgoing links spread their rank evenly over all pages
+            dangling = sum(ranks[page] for page in pages if not edges[page])
+            base = (1 - DAMPING) / count + DAMPING * dangling / count
+            updated = dict.fromkeys(pages, base)
+            for page in pages:
+                targets = edges[page]
+                if targets:
+                    share = DAMPING * ranks[page] / len(targets)
+                    for target in targets:
+                        updated[target] += share
+            delta = sum(abs(updated[page] - ranks[page]) for page in pages)
+            ranks = updated
+            if delta < TOLERANCE:
+                break
+        self.ranks, self.iterations, self._stale = ranks, iteration, False
+
+    def report(self, suggestions_per_page: int = 3) -> dict:
+        self._pagerank()
+        inbound = self.in_links()
+        known_paths = set(self.out_links) | set(STATIC_PAGES)
+        pages = []
+        broken = []
+        for page_path in self.out_links:
+            pages.append({
+                "page_path": page_path,
+                "pagerank": round(self.ranks.get(page_path, 0), 6),
+                "in_links": len(inbound.get(page_path, ())),
+                "out_links": len(self.out_links[page_path]),
+            })
+            for target in sorted(self.out_links[page_path] - known_paths):
+                if target.startswith("/services/"):
+                    broken.append({"source": page_path, "target": target})
+        pages.sort(key=lambda page: page["pagerank"])
+
+        orphans = [page["page_path"] for page in pages if page["in_links"] == 0]
+        under_linked = [page["page_path"] for page in pages if 0 < page["in_links"] < MIN_INBOUND_LINKS]
+        return {
+            "pages": pages,
+            "orphans": orphans,
+            "under_linked": under_linked,
+            "broken_links": broken,
+            "suggestions": self.suggest_links(orphans + under_linked, suggestions_per_page, inbound),
+            "iterations": self.iterations,
+        }
+
+    def suggest_links(self, targets: List[str], per_page: int, inbound: Dict[str, Set[str]]) -> List[dict]:
+        """Topically closest pages that could link to each under-linked page"""
+        suggestions = []
+        for target in targets:
+            anchor = top_phrase(target)
+            for match in similar_documents(target, limit=per_page + len(inbound.get(target, ())), prefix="/services/"):
+                source = match["page_path"]
+                if source == target or source in inbound.get(target, ()) or source not in self.out_links:
+                    continue
+                suggestions.append({
+                    "source": source,
+                    "target": target,
+                    "anchor_text": anchor,
+                    "similarity": match["similarity"],
+                })
+                if sum(1 for suggestion in suggestions if suggestion["target"] == target) >= per_page:
+                    break
+        return suggestions
+
+    def page_detail(self, page_path: str) -> Optional[dict]:
+        if page_path not in self.out_links:
+            return None
+        self._pagerank()
+        inbound = self.in_links()
+        return {
+            "page_path": page_path,
+            "pagerank": round(self.ranks.get(page_path, 0), 6),
+            "links_to": sorted(self.out_links[page_path]),
+            "linked_from": sorted(inbound.get(page_path, ())),
+            "suggestions": self.suggest_links([page_path], 5, inbound),
+        }
+
+
+_graph = LinkGraph()
+
+
+def index_page(page_path: str, page: Optional[dict]):
+    """page_indexes handler"""
+    _graph.update(page_path, page.get("content") or "" if page is not None else None)
+
+
+def get_link_report(suggestions_per_page: int = 3) -> dict:
+    return _graph.report(suggestions_per_page)
+
+
+def get_page_links(page_path: str) -> Optional[dict]:
+    return _graph.page_detail(page_path)
+
+
+def get_link_graph_metrics():
+    return {
+        "pages": len(_graph.out_links),
+        "links": sum(len(targets) for targets in _graph.out_links.values()),
+        "pagerank_iterations": _graph.iterations,
+        "stale": _graph._stale,
+    }
@@ -0,0 +1,295 @@
+import asyncio
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from config import (
+    LLM_PROVIDER,
+    GROQ_API_KEY,
+    GROQ_BASE_URL,
+    GROQ_MODEL,
+    LLM_STUB_URL,
+    LLM_MAX_CONCURRENCY,
+    LLM_TIMEOUT_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_RETRY_MAX_SECONDS,
+)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """A provider call that failed permanently or ran out of retries"""
+
+
+class LLMProvider(ABC):
+    """How to talk to one provider.
+
+    Subclasses build the HTTP request for a list of chat messages and pull
+    the completion text out of the response. Connection pooling, retries,
+    concurrency limits and coalescing are handled by LLMClient.
+    """
+
+    def __init__(self, name: str, base_url: str, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout: float = LLM_TIMEOUT_SECONDS):
+        self.name = name
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def headers(self) -> dict:
+        return {}
+
+    @abstractmethod
+    def build_request(self, messages: List[dict], **options) -> Tuple[str, dict]:
+        """Return (path, JSON body) for a completion request"""
+
+    @abstractmethod
+    def parse_response(self, data: dict) -> str:
+        """Completion text of a provider response"""
+
+    @abstractmethod
+    def parse_stream_chunk(self, data: dict) -> str:
+        """Text delta carried by one server-sent event of a streamed completion"""
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """Providers exposing an OpenAI-style /chat/completions endpoint (Groq, the local stub)"""
+
+    def __init__(self, name: str, base_url: str, model: str, api_key: str = "", **kwargs):
+        super().__init__(name, base_url, **kwargs)
+        self.model = model
+        self.api_key = api_key
+
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def build_request(self, messages: List[dict], **options) -> Tuple[str, dict]:
+        return "/chat/completions", {"model": self.model, "messages": messages, **options}
+
+    def parse_response(self, data: dict) -> str:
+        return data["choices"][0]["message"]["content"]
+
+    def parse_stream_chunk(self, data: dict) -> str:
+        if not data.get("choices"):
+            return ""
+        return data["choices"][0].get("delta", {}).get("content") or ""
+
+
+class LLMClient:
+    """Pooled async client shared by all provider calls in this process.
+
+    Each provider gets its own keep-alive connection pool and a semaphore
+    capping concurrent requests. Identical requests already in flight are
+    coalesced onto a single provider call. Transport errors, timeouts, 429s
+    and 5xx responses are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(self, max_retries: int = LLM_MAX_RETRIES):
+        self.max_retries = max_retries
+        self._providers: Dict[str, LLMProvider] = {}
+        self._http: Dict[str, httpx.AsyncClient] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._latencies = deque(maxlen=1000)
+        self._first_token_latencies = deque(maxlen=1000)
+        self._metrics = {
+            "requests": 0,
+            "streams": 0,
+            "provider_calls": 0,
+            "coalesced": 0,
+            "retries": 0,
+            "failures": 0,
+        }
+
+    def register(self, provider: LLMProvider):
+        self._providers[provider.name] = provider
+
+    def _client_for(self, provider: LLMProvider) -> httpx.AsyncClient:
+        client = self._http.get(provider.name)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=provider.base_url,
+                headers=provider.headers(),
+                timeout=provider.timeout,
+                limits=httpx.Limits(
+                    max_connections=provider.max_concurrency,
+                    max_keepalive_connections=provider.max_concurrency,
+                ),
+            )
+            self._http[provider.name] = client
+            self._semaphores[provider.name] = asyncio.Semaphore(provider.max_concurrency)
+        return client
+
+    async def complete(self, provider_name: str, messages: List[dict], **options) -> str:
+        """Completion text for `messages`, sharing any identical call already in flight"""
+        provider = self._providers.get(provider_name)
+        if provider is None:
+            raise LLMError(f"Unknown LLM provider: {provider_name}")
+        self._metrics["requests"] += 1
+        key = hashlib.sha256(
+            json.dumps([provider_name, messages, options], sort_keys=True).encode()
+        ).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._call(provider, messages, options))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self._metrics["coalesced"] += 1
+        # A cancelled caller must not cancel the call other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            self._metrics["failures"] += 1
+
+    async def _call(self, provider: LLMProvider, messages: List[dict], options: dict) -> str:
+        client = self._client_for(provider)
+        path, body = provider.build_request(messages, **options)
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            started = time.monotonic()
+            try:
+                # Hold a concurrency slot only while the request is on the wire, not during backoff
+                async with self._semaphores[provider.name]:
+                    self._metrics["provider_calls"] += 1
+                    response = await client.post(path, json=body)
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    self._latencies.append((time.monotonic() - started) * 1000)
+                    return provider.parse_response(response.json())
+                error = f"{provider.name} returned {response.status_code}"
+                retry_after = response.headers.get("retry-after")
+            except httpx.TransportError as e:
+                error = f"{provider.name} request failed: {type(e).__name__}"
+            except httpx.HTTPStatusError as e:
+                raise LLMError(f"{provider.name} returned {e.response.status_code}") from e
+            except (KeyError, IndexError, ValueError) as e:
+                raise LLMError(f"Unexpected response from {provider.name}: {str(e)}") from e
+
+            if attempt == self.max_retries:
+                raise LLMError(f"{error} after {attempt + 1} attempts")
+            self._metrics["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    async def stream(self, provider_name: str, messages: List[dict], **options) -> AsyncIterator[str]:
+        """Completion text deltas as the provider generates them.
+
+        Streams are not coalesced. A failure before the first delta is retried
+        like complete(); once text has been relayed it raises LLMError, since
+        the caller has already passed the partial output on.
+        """
+        provider = self._providers.get(provider_name)
+        if provider is None:
+            raise LLMError(f"Unknown LLM provider: {provider_name}")
+        self._metrics["requests"] += 1
+        self._metrics["streams"] += 1
+        client = self._client_for(provider)
+        path, body = provider.build_request(messages, stream=True, **options)
+        relayed = False
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            started = time.monotonic()
+            try:
+                async with self._semaphores[provider.name]:
+                    self._metrics["provider_calls"] += 1
+                    async with client.stream("POST", path, json=body) as response:
+                        if response.status_code not in RETRYABLE_STATUS:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                if not line.startswith("data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == "[DONE]":
+                                    break
+                                delta = provider.parse_stream_chunk(json.loads(data))
+                                if not delta:
+                                    continue
+                                if not relayed:
+                                    self._first_token_latencies.append((time.monotonic() - started) * 1000)
+                                    relayed = True
+                                yield delta
+                            self._latencies.append((time.monotonic() - started) * 1000)
+                            return
+                        error = f"{provider.name} returned {response.status_code}"
+                        retry_after = response.headers.get("retry-after")
+            except httpx.TransportError as e:
+                error = f"{provider.name} stream failed: {type(e).__name__}"
+            except httpx.HTTPStatusError as e:
+                self._metrics["failures"] += 1
+                raise LLMError(f"{provider.name} returned {e.response.status_code}") from e
+            except (KeyError, IndexError, ValueError) as e:
+                self._metrics["failures"] += 1
+                raise LLMError(f"Unexpected stream chunk from {provider.name}: {str(e)}") from e
+
+            if relayed or attempt == self.max_retries:
+                self._metrics["failures"] += 1
+                raise LLMError(f"{error} after {attempt + 1} attempts")
+            self._metrics["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_RETRY_MAX_SECONDS)
+            except ValueError:
+                pass
+        # Full jitter keeps retries from many callers from arriving in lockstep
+        return random.uniform(0, min(LLM_RETRY_MAX_SECONDS, LLM_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    async def close(self):
+        for client in self._http.values():
+            await client.aclose()
+        self._http.clear()
+        self._semaphores.clear()
+
+    def metrics(self) -> dict:
+        def percentiles(samples):
+            samples = sorted(samples)
+
+            def percentile(pct):
+                if not samples:
+                    return 0
+                return round(samples[min(len(samples) - 1, int(pct / 100 * len(samples)))], 1)
+
+            return {"p50": percentile(50), "p95": percentile(95), "p99": percentile(99)}
+
+        return {
+            "providers": list(self._providers),
+            "in_flight": len(self._inflight),
+            "latency_ms": percentiles(self._latencies),
+            "first_token_ms": percentiles(self._first_token_latencies),
+            **self._metrics,
+        }
+
+
+_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    global _client
+    if _client is None:
+        _client = LLMClient()
+        _client.register(OpenAICompatibleProvider("groq", GROQ_BASE_URL, GROQ_MODEL, api_key=GROQ_API_KEY))
+        _client.register(OpenAICompatibleProvider("stub", LLM_STUB_URL, "stub"))
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def get_llm_metrics():
+    metrics = _client.metrics() if _client is not None else {}
+    return {"provider": LLM_PROVIDER, **metrics}
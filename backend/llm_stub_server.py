@@ -0,0 +1,113 @@
+"""
+Local stand-in for an OpenAI-compatible LLM provider.
+
+Serves POST /v1/chat/completions with simulated latency and a configurable
+share of 429/503 responses, so LLMClient throughput, retries and tail
+latency can be measured without network access or API keys. Requests with
+"stream": true get the reply as OpenAI-style server-sent event chunks,
+paced by --token-ms.
+
+Usage: python -m llm_stub_server [--port 8090] [--latency-ms 500] [--jitter-ms 200] [--error-rate 0.05] [--token-ms 20]
+Point the backend at it with LLM_PROVIDER=stub (and LLM_STUB_URL if not on port 8090).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+settings = {"latency_ms": 500.0, "jitter_ms": 200.0, "error_rate": 0.05, "token_ms": 20.0}
+stats = {"requests": 0, "errors": 0}
+
+app = FastAPI(title="LLM stub provider")
+
+
+def _suggestions(messages):
+    try:
+        keywords = json.loads(messages[-1]["content"]).get("target_keywords") or ["construction"]
+    except (ValueError, KeyError, IndexError, AttributeError):
+        keywords = ["construction"]
+    keyword = keywords[0]
+    return {
+        "title_suggestions": [f"{keyword.title()} in Pune | ConstructPune"],
+        "description_suggestions": [f"Trusted {keyword} in Pune by ConstructPune's experienced team."],
+        "content_suggestions": [f"Add a short FAQ answering common questions about {keyword}."],
+    }
+
+
+def _suggestion_lines(messages):
+    """The streaming prompt asks for one `field: text` suggestion per line"""
+    prefixes = {"title_suggestions": "title", "description_suggestions": "description", "content_suggestions": "content"}
+    return "".join(
+        f"{prefixes[field]}: {text}\n"
+        for field, texts in _suggestions(messages).items()
+        for text in texts
+    )
+
+
+async def _stream_chunks(request_id, model, text):
+    for index, word in enumerate(text.split(" ")):
+        await asyncio.sleep(settings["token_ms"] / 1000)
+        chunk = {
+            "id": request_id,
+            "object": "chat.completion.chunk",
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": word if index == 0 else " " + word}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    done = {"id": request_id, "object": "chat.completion.chunk", "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(body: dict):
+    stats["requests"] += 1
+    delay = max(0.0, random.gauss(settings["latency_ms"], settings["jitter_ms"] / 2)) / 1000
+    await asyncio.sleep(delay)
+    if random.random() < settings["error_rate"]:
+        stats["errors"] += 1
+        status = random.choice([429, 503])
+        return JSONResponse({"error": {"message": "Simulated provider error"}}, status_code=status)
+    if body.get("stream"):
+        text = _suggestion_lines(body.get("messages", []))
+        return StreamingResponse(
+            _stream_chunks(f"stub-{stats['requests']}", body.get("model", "stub"), text),
+            media_type="text/event-stream"
+        )
+    return {
+        "id": f"stub-{stats['requests']}",
+        "object": "chat.completion",
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": json.dumps(_suggestions(body.get("messages", [])))},
+            "finish_reason": "stop",
+        }],
+    }
+
+
+@app.get("/stats")
+async def get_stats():
+    return {**settings, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub LLM provider")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=settings["latency_ms"])
+    parser.add_argument("--jitter-ms", type=float, default=settings["jitter_ms"])
+    parser.add_argument("--error-rate", type=float, default=settings["error_rate"])
+    parser.add_argument("--token-ms", type=float, default=settings["token_ms"])
+    args = parser.parse_args()
+    settings.update(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                    token_ms=args.token_ms)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,121 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import ALLOWED_ORIGINS, ALLOWED_METHODS, ALLOWED_HEADERS, ALLOW_CREDENTIALS
 from routes.auth_routes import router as auth_router
 from routes.calculator_routes import router as calculator_router
+from routes.analytics_routes import router as analytics_router
+from routes.maintenance_routes import router as maintenance_router
+from routes.api_key_routes import router as api_key_router
+from routes.seo_routes import router as seo_router
+from routes.sitemap_routes import router as sitemap_router
+from api_keys import ensure_api_key_indexes, start_api_key_tasks, stop_api_key_tasks, get_api_key_metrics
+from maintenance import mark_interrupted_operations, shutdown_operations
+from analytics import ensure_rollup_indexes
+from sessions import ensure_session_indexes, revoke_sessions
+from rate_limiter import ensure_rate_limit_indexes, get_login_throttle_metrics
+from archival import ensure_archive_indexes, archive_old_calculations, get_archive_status, get_calculation
 from service_pages_data import initialize_service_pages
 from database import (
+    connect_to_mongo,
+    close_mongo_connection,
     contacts_collection,
     projects_collection,
     service_pages_collection,
     seo_data_collection,
     users_collection,
     admins_collection,
-    calculations_collection
+    calculations_collection,
+    projects_catalog,
+    service_pages_catalog,
+    calculations_analytics
 )
-from models import ContactForm, Project, ServicePage, SEOData, SEOOptimizationRequest
-from auth import get_current_admin
-from seo_utils import mock_groq_seo_optimization, generate_seo_audit
-from fastapi import HTTPException, Depends
-from typing import List
+from migrations import upgrade_document
+from models import ContactForm, Project, ServicePage, SEOOptimizationRequest, UserStatusUpdate, TokenRevokeRequest
+from auth import get_current_admin, invalidate_principal, get_auth_cache_metrics, ensure_auth_indexes, revoke_access_token
+from token_revocation import (
+    ensure_revocation_indexes,
+    start_revocation_refresher,
+    stop_revocation_refresher,
+    get_revocation_metrics
+)
+from password_hasher import (
+    get_password_hash_metrics,
+    shutdown_password_hasher,
+    start_rehash_flusher,
+    stop_rehash_flusher
+)
+from seo_cache import optimize_content, ensure_seo_cache_indexes, get_seo_cache_metrics
+from sitemap import (
+    ensure_sitemap_indexes,
+    start_sitemap_refresher,
+    stop_sitemap_refresher,
+    notify_sitemap_change,
+    get_sitemap_metrics
+)
+from site_audit import (
+    ensure_site_audit_indexes,
+    get_or_audit_page,
+    start_site_audit_scheduler,
+    stop_site_audit_scheduler
+)
+from seo_optimizer import build_seo_data
+from llm_client import close_llm_client, get_llm_metrics
+from readability import get_readability_metrics
+from near_duplicates import index_page as index_duplicate_page
+from keyword_suggestions import index_document as index_keyword_document, get_keyword_index_metrics
+from link_graph import index_page as index_link_page, get_link_graph_metrics
+from page_indexes import (
+    ensure_page_index_indexes,
+    register_page_index,
+    start_page_index_refresher,
+    stop_page_index_refresher,
+    notify_page_change
+)
+from fastapi import HTTPException, Depends, BackgroundTasks, Query
+from typing import List, Optional
 from datetime import datetime
 
-app = FastAPI(title="ConstructPune API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the MongoDB pool on startup and close it on shutdown"""
+    await connect_to_mongo()
+    await ensure_rollup_indexes()
+    await ensure_archive_indexes()
+    await ensure_auth_indexes()
+    await ensure_session_indexes()
+    await ensure_rate_limit_indexes()
+    await ensure_api_key_indexes()
+    await ensure_revocation_indexes()
+    await ensure_seo_cache_indexes()
+    await ensure_site_audit_indexes()
+    await ensure_sitemap_indexes()
+    await ensure_page_index_indexes()
+    await start_revocation_refresher()
+    await start_api_key_tasks()
+    await mark_interrupted_operations()
+    start_rehash_flusher()
+    start_site_audit_scheduler()
+    # Initialize service pages on startup
+    await initialize_service_pages()
+    await start_sitemap_refresher()
+    register_page_index(index_duplicate_page)
+    register_page_index(index_keyword_document, kinds=("service_page", "project"))
+    register_page_index(index_link_page)
+    await start_page_index_refresher()
+    yield
+    await shutdown_operations()
+    stop_site_audit_scheduler()
+    stop_sitemap_refresher()
+    stop_page_index_refresher()
+    await stop_rehash_flusher()
+    await stop_api_key_tasks()
+    stop_revocation_refresher()
+    shutdown_password_hasher()
+    await close_llm_client()
+    await close_mongo_connection()
+
+app = FastAPI(title="ConstructPune API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -34,6 +129,11 @@ app.add_middleware(
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["authentication"])
 app.include_router(calculator_router, prefix="/api/calculator", tags=["calculator"])
+app.include_router(analytics_router, prefix="/api/admin/analytics", tags=["analytics"])
+app.include_router(maintenance_router, prefix="/api/admin/maintenance", tags=["maintenance"])
+app.include_router(api_key_router, prefix="/api/admin/api-keys", tags=["api-keys"])
+app.include_router(seo_router, prefix="/api/admin/seo", tags=["seo"])
+app.include_router(sitemap_router, tags=["sitemap"])
 
 # Basic routes
 @app.get("/api/")
@@ -55,7 +155,7 @@ async def get_projects():
     """Get all projects"""
     try:
         projects = []
-        async for project in projects_collection.find():
+        async for project in projects_catalog.find():
             project["_id"] = str(project["_id"])
             projects.append(project)
         return projects
@@ -68,32 +168,25 @@ async def create_project(project: Project):
     try:
         project_dict = project.model_dump()
         result = await projects_collection.insert_one(project_dict)
+        notify_page_change()
         return {"message": "Project created successfully", "id": str(result.inserted_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating project: {str(e)}")
 
 # SEO Management Routes
 @app.post("/api/admin/seo/optimize", response_model=dict)
-async def optimize_content_seo(request: SEOOptimizationRequest, current_admin: dict = Depends(get_current_admin)):
+async def optimize_content_seo(
+    request: SEOOptimizationRequest,
+    force: bool = Query(False, description="Bypass cached results for unchanged content"),
+    current_admin: dict = Depends(get_current_admin)
+):
     """Optimize content for SEO using Groq API"""
     try:
-        # Mock Groq API call
-        optimization_result = await mock_groq_seo_optimization(request.content, request.target_keywords)
+        # Provider call (simulated unless LLM_PROVIDER is set), skipped for unchanged content
+        optimization_result = await optimize_content(request.content, request.target_keywords, force)
         
         # Save SEO data to database
-        seo_data = SEOData(
-            page_path=request.page_path,
-            title=optimization_result["title_suggestions"][0],
-            description=optimization_result["description_suggestions"][0],
-            keywords=request.target_keywords,
-            meta_tags={
-                "title": optimization_result["title_suggestions"][0],
-                "description": optimization_result["description_suggestions"][0],
-                "keywords": ", ".join(request.target_keywords)
-            },
-            schema_markup=optimization_result["schema_markup"],
-            content_optimization=optimization_result
-        )
+        seo_data = build_seo_data(request, optimization_result)
         
         # Update or insert SEO data
         await seo_data_collection.update_one(
@@ -101,6 +194,7 @@ async def optimize_content_seo(request: SEOOptimizationRequest, current_admin: d
             {"$set": seo_data.model_dump()},
             upsert=True
         )
+        notify_sitemap_change()
         
         return optimization_result
         
@@ -108,10 +202,14 @@ async def optimize_content_seo(request: SEOOptimizationRequest, current_admin: d
         raise HTTPException(status_code=500, detail=f"Error optimizing SEO: {str(e)}")
 
 @app.get("/api/admin/seo/audit/{page_path:path}", response_model=dict)
-async def get_seo_audit(page_path: str, current_admin: dict = Depends(get_current_admin)):
+async def get_seo_audit(
+    page_path: str,
+    force: bool = Query(False, description="Re-audit the page instead of returning its latest stored audit"),
+    current_admin: dict = Depends(get_current_admin)
+):
     """Get SEO audit for a specific page"""
     try:
-        audit_result = await generate_seo_audit(page_path)
+        audit_result = await get_or_audit_page(page_path, force)
         return audit_result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating SEO audit: {str(e)}")
@@ -121,8 +219,10 @@ async def get_seo_audit(page_path: str, current_admin: dict = Depends(get_curren
 async def create_service_page(service: ServicePage, current_admin: dict = Depends(get_current_admin)):
     """Create a new service page"""
     try:
-        service_dict = service.model_dump()
+        service_dict = upgrade_document("service_pages", service.model_dump())
         result = await service_pages_collection.insert_one(service_dict)
+        notify_sitemap_change()
+        notify_page_change()
         return {"message": "Service page created successfully", "id": str(result.inserted_id)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating service page: {str(e)}")
@@ -133,6 +233,7 @@ async def get_all_service_pages(current_admin: dict = Depends(get_current_admin)
     try:
         services = []
         async for service in service_pages_collection.find():
+            service = upgrade_document("service_pages", service)
             service["_id"] = str(service["_id"])
             services.append(service)
         return services
@@ -144,7 +245,8 @@ async def get_public_service_pages():
     """Get all active service pages (public access)"""
     try:
         services = []
-        async for service in service_pages_collection.find({"is_active": True}):
+        async for service in service_pages_catalog.find({"is_active": True}):
+            service = upgrade_document("service_pages", service)
             service["_id"] = str(service["_id"])
             services.append(service)
         return services
@@ -155,9 +257,10 @@ async def get_public_service_pages():
 async def get_public_service_page(slug: str):
     """Get a specific service page (public access)"""
     try:
-        service = await service_pages_collection.find_one({"slug": slug, "is_active": True})
+        service = await service_pages_catalog.find_one({"slug": slug, "is_active": True})
         if not service:
             raise HTTPException(status_code=404, detail="Service page not found")
+        service = upgrade_document("service_pages", service)
         service["_id"] = str(service["_id"])
         return service
     except Exception as e:
@@ -172,7 +275,7 @@ async def get_dashboard_stats(current_admin: dict = Depends(get_current_admin)):
         total_users = await users_collection.count_documents({})
         total_contacts = await contacts_collection.count_documents({})
         total_projects = await projects_collection.count_documents({})
-        total_calculations = await calculations_collection.count_documents({})
+        total_calculations = await calculations_analytics.count_documents({})
         total_services = await service_pages_collection.count_documents({})
         
         # Get recent activity
@@ -183,6 +286,7 @@ async def get_dashboard_stats(current_admin: dict = Depends(get_current_admin)):
         
         recent_calculations = []
         async for calc in calculations_collection.find().sort("created_at", -1).limit(5):
+            calc = upgrade_document("calculations", calc)
             calc["_id"] = str(calc["_id"])
             recent_calculations.append(calc)
         
@@ -198,6 +302,34 @@ async def get_dashboard_stats(current_admin: dict = Depends(get_current_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard stats: {str(e)}")
 
+@app.get("/api/admin/metrics", response_model=dict)
+async def get_metrics(current_admin: dict = Depends(get_current_admin)):
+    """Get in-process runtime metrics for this instance"""
+    return {
+        "password_hashing": get_password_hash_metrics(),
+        "auth_cache": get_auth_cache_metrics(),
+        "login_throttle": get_login_throttle_metrics(),
+        "api_keys": get_api_key_metrics(),
+        "token_revocation": get_revocation_metrics(),
+        "llm": get_llm_metrics(),
+        "seo_cache": get_seo_cache_metrics(),
+        "sitemap": get_sitemap_metrics(),
+        "readability": get_readability_metrics(),
+        "keyword_index": get_keyword_index_metrics(),
+        "link_graph": get_link_graph_metrics()
+    }
+
+@app.post("/api/admin/tokens/revoke", response_model=dict)
+async def revoke_token_by_admin(request: TokenRevokeRequest, current_admin: dict = Depends(get_current_admin)):
+    """Revoke a leaked access token before it expires"""
+    try:
+        revoked = await revoke_access_token(request.token, "admin")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error revoking token: {str(e)}")
+    if not revoked:
+        raise HTTPException(status_code=400, detail="Token is invalid, expired or has no jti")
+    return {"message": "Token revoked successfully"}
+
 # User Management Routes
 @app.get("/api/admin/users", response_model=List[dict])
 async def get_all_users(current_admin: dict = Depends(get_current_admin)):
@@ -214,6 +346,24 @@ async def get_all_users(current_admin: dict = Depends(get_current_admin)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching users: {str(e)}")
 
+@app.put("/api/admin/users/{user_id}/status", response_model=dict)
+async def update_user_status(user_id: str, update: UserStatusUpdate, current_admin: dict = Depends(get_current_admin)):
+    """Activate or deactivate a user"""
+    try:
+        user = await users_collection.find_one_and_update(
+            {"id": user_id},
+            {"$set": {"is_active": update.is_active, "updated_at": datetime.now()}},
+            projection={"email": 1}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating user: {str(e)}")
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    invalidate_principal(user["email"], "user")
+    if not update.is_active:
+        await revoke_sessions(user["email"], "user")
+    return {"message": "User updated successfully", "is_active": update.is_active}
+
 @app.get("/api/admin/contacts", response_model=List[dict])
 async def get_all_contacts(current_admin: dict = Depends(get_current_admin)):
     """Get all contact form submissions"""
@@ -232,16 +382,42 @@ async def get_all_calculations(current_admin: dict = Depends(get_current_admin))
     try:
         calculations = []
         async for calc in calculations_collection.find():
+            calc = upgrade_document("calculations", calc)
             calc["_id"] = str(calc["_id"])
             calculations.append(calc)
         return calculations
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching calculations: {str(e)}")
 
-# Initialize service pages on startup
-@app.on_event("startup")
-async def startup_event():
-    await initialize_service_pages()
+@app.post("/api/admin/calculations/archive", response_model=dict)
+async def archive_calculations(
+    background_tasks: BackgroundTasks,
+    max_age_days: Optional[int] = Query(None, ge=1),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Archive old calculations to compressed files in the background"""
+    background_tasks.add_task(archive_old_calculations, max_age_days)
+    return {"message": "Calculation archival started"}
+
+@app.get("/api/admin/calculations/archive/status", response_model=dict)
+async def get_calculations_archive_status(current_admin: dict = Depends(get_current_admin)):
+    """Get progress of the calculation archival job"""
+    try:
+        return await get_archive_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching archive status: {str(e)}")
+
+@app.get("/api/admin/calculations/{project_id}", response_model=dict)
+async def get_calculation_detail(project_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Get a single calculation, including archived detail"""
+    try:
+        calculation = await get_calculation(project_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching calculation: {str(e)}")
+    if not calculation:
+        raise HTTPException(status_code=404, detail="Calculation not found")
+    calculation["_id"] = str(calculation["_id"])
+    return calculation
 
 if __name__ == "__main__":
     import uvicorn
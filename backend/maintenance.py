@@ -0,0 +1,278 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+from bson import json_util
+from pymongo import ASCENDING, UpdateOne
+from database import (
+    calculations_collection,
+    contacts_collection,
+    projects_collection,
+    maintenance_operations_collection,
+    get_replication_lag,
+)
+from analytics import rebuild_rollup_days
+from config import (
+    INSTANCE_ID,
+    MAINTENANCE_BATCH_SIZE,
+    MAINTENANCE_BATCH_DELAY_SECONDS,
+    MAINTENANCE_TARGET_LAG_SECONDS,
+    MAINTENANCE_MAX_LAG_SECONDS,
+)
+
+OPERATIONS = ("purge", "backfill_field", "recompute_totals")
+
+# Collections that maintenance operations may touch
+MAINTENANCE_COLLECTIONS = {
+    "calculations": calculations_collection,
+    "contacts": contacts_collection,
+    "projects": projects_collection,
+}
+
+# Operations running in this process, cancelled on shutdown
+_running: Dict[str, asyncio.Task] = {}
+
+
+async def _throttle(operation_id: str) -> float:
+    """Sleep between batches, longer as replication lag grows.
+
+    Above MAINTENANCE_MAX_LAG_SECONDS the operation pauses until the
+    secondaries catch up, or until it is cancelled.
+    """
+    lag = await get_replication_lag()
+    while lag > MAINTENANCE_MAX_LAG_SECONDS:
+        current = await maintenance_operations_collection.find_one_and_update(
+            {"_id": operation_id},
+            {"$set": {"replication_lag": lag, "throttled_at": datetime.now()}},
+            projection={"status": 1}
+        )
+        if current is None or current["status"] == "cancel_requested":
+            # The batch loop records the cancellation on its next pass
+            return lag
+        await asyncio.sleep(min(lag, MAINTENANCE_MAX_LAG_SECONDS))
+        lag = await get_replication_lag()
+    delay = MAINTENANCE_BATCH_DELAY_SECONDS * (1 + lag / MAINTENANCE_TARGET_LAG_SECONDS)
+    await asyncio.sleep(delay)
+    return lag
+
+
+async def _purge_batch(collection, ids, operation):
+    result = await collection.delete_many({"_id": {"$in": ids}})
+    return result.deleted_count
+
+
+async def _backfill_field_batch(collection, ids, operation):
+    result = await collection.update_many(
+        {"_id": {"$in": ids}, operation["field"]: {"$exists": False}},
+        {"$set": {operation["field"]: operation.get("value")}}
+    )
+    return result.modified_count
+
+
+async def _recompute_totals_batch(collection, ids, operation):
+    updates = []
+    async for calculation in collection.find({"_id": {"$in": ids}, "archived": {"$ne": True}}):
+        breakdown = calculation.get("breakdown", {})
+        total = (
+            breakdown.get("materials_subtotal", 0)
+            + breakdown.get("labor_subtotal", 0)
+            + breakdown.get("transportation_subtotal", 0)
+            + breakdown.get("additional_costs_subtotal", 0)
+            + breakdown.get("overhead_profit", 0)
+        )
+        area = breakdown.get("area") or 0
+        update = {"total_cost": round(total, 2)}
+        if area:
+            update["breakdown.cost_per_sqft"] = round(total / area, 2)
+        updates.append(UpdateOne({"_id": calculation["_id"]}, {"$set": update}))
+    if not updates:
+        return 0
+    result = await collection.bulk_write(updates, ordered=False)
+    return result.modified_count
+
+
+_BATCH_HANDLERS = {
+    "purge": _purge_batch,
+    "backfill_field": _backfill_field_batch,
+    "recompute_totals": _recompute_totals_batch,
+}
+
+
+async def _run(operation_id: str):
+    operation = await maintenance_operations_collection.find_one({"_id": operation_id})
+    collection = MAINTENANCE_COLLECTIONS[operation["collection"]]
+    handler = _BATCH_HANDLERS[operation["operation"]]
+    last_id = operation.get("last_id")
+    processed = operation.get("processed", 0)
+    affected = operation.get("affected", 0)
+
+    try:
+        while True:
+            current = await maintenance_operations_collection.find_one(
+                {"_id": operation_id}, {"status": 1}
+            )
+            if current["status"] == "cancel_requested":
+                await maintenance_operations_collection.update_one(
+                    {"_id": operation_id},
+                    {"$set": {"status": "cancelled", "finished_at": datetime.now()}}
+                )
+                return
+
+            query = json_util.loads(operation["filter"])
+            if last_id is not None:
+                # Keep any _id condition of the admin's filter alongside the resume position
+                query = {"$and": [query, {"_id": {"$gt": last_id}}]}
+            cursor = collection.find(query, {"_id": 1, "created_at": 1}).sort("_id", ASCENDING)
+            documents = await cursor.to_list(operation["batch_size"])
+            ids = [doc["_id"] for doc in documents]
+            if not ids:
+                break
+
+            affected += await handler(collection, ids, operation)
+            if operation["collection"] == "calculations":
+                # Keep the analytics rollups in line with deleted or rewritten calculations
+                await rebuild_rollup_days(doc["created_at"] for doc in documents if doc.get("created_at"))
+            processed += len(ids)
+            last_id = ids[-1]
+            lag = await _throttle(operation_id)
+            await maintenance_operations_collection.update_one(
+                {"_id": operation_id},
+                {"$set": {
+                    "last_id": last_id,
+                    "processed": processed,
+                    "affected": affected,
+                    "replication_lag": lag,
+                    "updated_at": datetime.now(),
+                }}
+            )
+
+        await maintenance_operations_collection.update_one(
+            {"_id": operation_id},
+            {"$set": {"status": "completed", "finished_at": datetime.now()}}
+        )
+    except asyncio.CancelledError:
+        await maintenance_operations_collection.update_one(
+            {"_id": operation_id},
+            {"$set": {"status": "interrupted", "updated_at": datetime.now()}}
+        )
+        raise
+    except Exception as e:
+        await maintenance_operations_collection.update_one(
+            {"_id": operation_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.now()}}
+        )
+    finally:
+        _running.pop(operation_id, None)
+
+
+def _start(operation_id: str):
+    _running[operation_id] = asyncio.create_task(_run(operation_id))
+
+
+async def start_operation(operation: str, collection: str, filter: dict,
+                          field: Optional[str] = None, value=None,
+                          batch_size: int = MAINTENANCE_BATCH_SIZE) -> dict:
+    """Record a maintenance operation and start it in the background.
+
+    `filter` is a MongoDB query; extended JSON values such as
+    {"$date": ...} or {"$oid": ...} are decoded before use.
+    """
+    filter = json_util.loads(json_util.dumps(filter))
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown maintenance operation: {operation}")
+    if collection not in MAINTENANCE_COLLECTIONS:
+        raise ValueError(f"Maintenance is not allowed on collection: {collection}")
+    if operation == "purge" and not filter:
+        raise ValueError("Purge requires a non-empty filter")
+    if operation == "backfill_field" and not field:
+        raise ValueError("backfill_field requires a field name")
+    if operation == "recompute_totals" and collection != "calculations":
+        raise ValueError("recompute_totals only applies to calculations")
+
+    estimated_total = await MAINTENANCE_COLLECTIONS[collection].count_documents(filter)
+    operation_doc = {
+        "_id": str(uuid.uuid4()),
+        "operation": operation,
+        "collection": collection,
+        # Stored as extended JSON: query operators are not valid field names
+        "filter": json_util.dumps(filter),
+        "field": field,
+        "value": value,
+        "batch_size": batch_size,
+        "status": "running",
+        "instance_id": INSTANCE_ID,
+        "estimated_total": estimated_total,
+        "processed": 0,
+        "affected": 0,
+        "last_id": None,
+        "created_at": datetime.now(),
+        "updated_at": datetime.now(),
+    }
+    await maintenance_operations_collection.insert_one(operation_doc)
+    _start(operation_doc["_id"])
+    return _serialize(operation_doc)
+
+
+async def resume_operation(operation_id: str) -> Optional[dict]:
+    """Continue an interrupted or cancelled operation from its last batch"""
+    result = await maintenance_operations_collection.find_one_and_update(
+        {"_id": operation_id, "status": {"$in": ["interrupted", "cancelled", "failed"]}},
+        {"$set": {"status": "running", "instance_id": INSTANCE_ID, "updated_at": datetime.now()},
+         "$unset": {"error": "", "finished_at": ""}},
+        return_document=True,
+    )
+    if result is None:
+        return None
+    _start(operation_id)
+    return _serialize(result)
+
+
+async def cancel_operation(operation_id: str) -> Optional[dict]:
+    """Ask a running operation to stop after its current batch"""
+    return _serialize(await maintenance_operations_collection.find_one_and_update(
+        {"_id": operation_id, "status": "running"},
+        {"$set": {"status": "cancel_requested", "updated_at": datetime.now()}},
+        return_document=True,
+    ))
+
+
+async def get_operation(operation_id: str) -> Optional[dict]:
+    """Get the progress of a maintenance operation"""
+    return _serialize(await maintenance_operations_collection.find_one({"_id": operation_id}))
+
+
+async def list_operations(limit: int = 50):
+    """List recent maintenance operations, newest first"""
+    operations = []
+    cursor = maintenance_operations_collection.find().sort("created_at", -1).limit(limit)
+    async for operation in cursor:
+        operations.append(_serialize(operation))
+    return operations
+
+
+async def mark_interrupted_operations():
+    """Flag operations this instance was running when it last stopped"""
+    await maintenance_operations_collection.update_many(
+        {"instance_id": INSTANCE_ID, "status": {"$in": ["running", "cancel_requested"]}},
+        {"$set": {"status": "interrupted", "updated_at": datetime.now()}}
+    )
+
+
+async def shutdown_operations():
+    """Stop in-process operations; their checkpoints allow a later resume"""
+    tasks = list(_running.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _serialize(operation: Optional[dict]) -> Optional[dict]:
+    if operation is None:
+        return None
+    operation = dict(operation)
+    operation["id"] = operation.pop("_id")
+    if operation.get("last_id") is not None:
+        operation["last_id"] = str(operation["last_id"])
+    total = operation.get("estimated_total") or 0
+    operation["progress"] = round(min(operation.get("processed", 0) / total, 1.0) * 100, 1) if total else 100.0
+    return operation
@@ -0,0 +1,158 @@
+"""Versioned, resumable document migrations.
+
+Each ``mNNNN_<name>.py`` module in this package declares the collection it
+migrates, the ``SCHEMA_VERSION`` it produces and an ``upgrade(document)``
+function returning the fields to set. The same ``upgrade`` functions are
+applied on read by :func:`upgrade_document`, so code keeps working while a
+collection holds both old and new shapes.
+
+Run with ``python -m migrations`` from the backend directory.
+"""
+
+import importlib
+import pkgutil
+import time
+from datetime import datetime
+from typing import List, Optional
+from pymongo import ASCENDING, UpdateOne
+from database import get_collection, migrations_collection
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Migration:
+    def __init__(self, module):
+        self.id = module.__name__.rsplit(".", 1)[-1]
+        self.description = (module.__doc__ or "").strip()
+        self.collection = module.COLLECTION
+        self.schema_version = module.SCHEMA_VERSION
+        self.upgrade = module.upgrade
+
+    @property
+    def pending_filter(self) -> dict:
+        # Matches documents below this version, including ones with no version yet
+        return {"schema_version": {"$not": {"$gte": self.schema_version}}}
+
+
+def load_migrations() -> List[Migration]:
+    """Import every migration script in filename order"""
+    migrations = []
+    for module_info in sorted(pkgutil.iter_modules(__path__), key=lambda m: m.name):
+        if module_info.name.startswith("m"):
+            migrations.append(Migration(importlib.import_module(f"{__name__}.{module_info.name}")))
+
+    latest = {}
+    for migration in migrations:
+        if migration.schema_version <= latest.get(migration.collection, 0):
+            raise ValueError(f"{migration.id}: schema versions must increase per collection")
+        latest[migration.collection] = migration.schema_version
+    return migrations
+
+
+MIGRATIONS = load_migrations()
+LATEST_SCHEMA_VERSIONS = {}
+for _migration in MIGRATIONS:
+    LATEST_SCHEMA_VERSIONS[_migration.collection] = _migration.schema_version
+
+
+def upgrade_document(collection: str, document: Optional[dict]) -> Optional[dict]:
+    """Bring a document read from `collection` up to the latest shape in memory"""
+    if document is None:
+        return None
+    version = document.get("schema_version", 0)
+    for migration in MIGRATIONS:
+        if migration.collection == collection and migration.schema_version > version:
+            document.update(migration.upgrade(document))
+            document["schema_version"] = migration.schema_version
+    return document
+
+
+async def _ledger_entry(migration: Migration) -> dict:
+    entry = await migrations_collection.find_one({"_id": migration.id})
+    return entry or {"_id": migration.id, "status": "pending", "processed": 0}
+
+
+async def apply_migration(migration: Migration, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Apply one migration with batched bulk writes, checkpointing after each batch"""
+    collection = get_collection(migration.collection)
+    entry = await _ledger_entry(migration)
+    last_id = entry.get("last_id")
+    processed = entry.get("processed", 0)
+    await migrations_collection.update_one(
+        {"_id": migration.id},
+        {"$set": {
+            "collection": migration.collection,
+            "schema_version": migration.schema_version,
+            "description": migration.description,
+            "status": "running",
+            "updated_at": datetime.now(),
+        },
+         "$setOnInsert": {"started_at": datetime.now()}},
+        upsert=True,
+    )
+
+    while True:
+        query = dict(migration.pending_filter)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = await collection.find(query).sort("_id", ASCENDING).to_list(batch_size)
+        if not batch:
+            break
+        operations = [
+            UpdateOne(
+                # Re-check the version so concurrent writers of the new shape win
+                {"_id": document["_id"], **migration.pending_filter},
+                {"$set": {**migration.upgrade(document), "schema_version": migration.schema_version}},
+            )
+            for document in batch
+        ]
+        await collection.bulk_write(operations, ordered=False)
+        processed += len(batch)
+        last_id = batch[-1]["_id"]
+        await migrations_collection.update_one(
+            {"_id": migration.id},
+            {"$set": {"last_id": last_id, "processed": processed, "updated_at": datetime.now()}},
+        )
+
+    await migrations_collection.update_one(
+        {"_id": migration.id},
+        {"$set": {"status": "completed", "completed_at": datetime.now(), "updated_at": datetime.now()}},
+    )
+    return {"id": migration.id, "processed": processed}
+
+
+async def estimate_migration(migration: Migration, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """Dry run: count pending documents and time one batch of reads and upgrades"""
+    collection = get_collection(migration.collection)
+    pending = await collection.count_documents(migration.pending_filter)
+
+    started = time.perf_counter()
+    sample = await collection.find(migration.pending_filter).sort("_id", ASCENDING).to_list(batch_size)
+    for document in sample:
+        migration.upgrade(dict(document))
+    elapsed = time.perf_counter() - started
+
+    # Writes are not issued in a dry run; a bulk update costs roughly as much as reading the batch
+    per_document = (elapsed * 2 / len(sample)) if sample else 0
+    return {
+        "id": migration.id,
+        "collection": migration.collection,
+        "schema_version": migration.schema_version,
+        "pending_documents": pending,
+        "batches": -(-pending // batch_size),
+        "estimated_seconds": round(pending * per_document, 2),
+    }
+
+
+async def run_migrations(dry_run: bool = False, batch_size: int = DEFAULT_BATCH_SIZE) -> List[dict]:
+    """Apply (or estimate) every migration not yet completed in the ledger"""
+    results = []
+    for migration in MIGRATIONS:
+        entry = await _ledger_entry(migration)
+        if entry["status"] == "completed":
+            continue
+        if dry_run:
+            results.append(await estimate_migration(migration, batch_size))
+        else:
+            results.append(await apply_migration(migration, batch_size))
+    return results
@@ -0,0 +1,30 @@
+import argparse
+import asyncio
+from database import connect_to_mongo, close_mongo_connection
+from migrations import run_migrations, DEFAULT_BATCH_SIZE
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Apply pending document migrations")
+    parser.add_argument("--dry-run", action="store_true", help="only report pending work and estimated duration")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        results = await run_migrations(dry_run=args.dry_run, batch_size=args.batch_size)
+    finally:
+        await close_mongo_connection()
+
+    if not results:
+        print("No pending migrations")
+    for result in results:
+        if args.dry_run:
+            print(f"{result['id']}: {result['pending_documents']} documents in {result['batches']} batches, "
+                  f"estimated {result['estimated_seconds']}s")
+        else:
+            print(f"{result['id']}: migrated {result['processed']} documents")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,14 @@
+"""Copy quality level, area and cost per sq ft to the top level of calculations"""
+
+COLLECTION = "calculations"
+SCHEMA_VERSION = 1
+
+
+def upgrade(document: dict) -> dict:
+    """Fields that bring a calculation to schema version 1"""
+    breakdown = document.get("breakdown") or {}
+    return {
+        "quality_level": document.get("quality_level", breakdown.get("quality_level", "standard")),
+        "area": document.get("area", breakdown.get("area")),
+        "cost_per_sqft": document.get("cost_per_sqft", breakdown.get("cost_per_sqft")),
+    }
@@ -0,0 +1,25 @@
+"""Give every service page created_at/updated_at timestamps and an is_active flag"""
+
+from datetime import datetime
+from bson import ObjectId
+
+COLLECTION = "service_pages"
+SCHEMA_VERSION = 1
+
+
+def _inserted_at(document: dict) -> datetime:
+    # Derived from the document so every read of a not-yet-migrated page agrees;
+    # local naive time, like the timestamps the routes write
+    if isinstance(document.get("_id"), ObjectId):
+        return document["_id"].generation_time.astimezone().replace(tzinfo=None)
+    return datetime(1970, 1, 1)
+
+
+def upgrade(document: dict) -> dict:
+    """Fields that bring a service page to schema version 1"""
+    created_at = document.get("created_at") or _inserted_at(document)
+    return {
+        "created_at": created_at,
+        "updated_at": document.get("updated_at") or created_at,
+        "is_active": document.get("is_active", True),
+    }
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Any
 from datetime import datetime
 import uuid
+from config import MAINTENANCE_BATCH_SIZE
 
 class ContactForm(BaseModel):
     name: str
@@ -70,6 +71,16 @@ class UserLogin(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class TokenRevokeRequest(BaseModel):
+    token: str
+
+class UserStatusUpdate(BaseModel):
+    is_active: bool
 
 class AdminUser(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -84,6 +95,10 @@ class AdminUserCreate(BaseModel):
     password: str
     name: str
 
+class APIKeyCreate(BaseModel):
+    partner: str
+    daily_quota: Optional[int] = Field(default=None, ge=1)
+
 class SEOData(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     page_path: str
@@ -101,6 +116,16 @@ class SEOOptimizationRequest(BaseModel):
     content: str
     target_keywords: List[str]
 
+class KeywordSuggestionRequest(BaseModel):
+    content: str
+    title: str = ""
+    limit: int = Field(15, ge=1, le=100)
+
+class SEOBulkOptimizationRequest(BaseModel):
+    requests: List[SEOOptimizationRequest] = []
+    all_service_pages: bool = False
+    force: bool = False
+
 class ServicePage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     slug: str
@@ -113,4 +138,11 @@ class ServicePage(BaseModel):
     seo_data: Optional[dict] = None
     is_active: bool = True
     created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class MaintenanceRequest(BaseModel):
+    collection: str = "calculations"
+    filter: dict = Field(default_factory=dict)
+    field: Optional[str] = None  # backfill_field only
+    value: Optional[Any] = None  # backfill_field only
+    batch_size: int = Field(default=MAINTENANCE_BATCH_SIZE, ge=1, le=10000)
\ No newline at end of file
@@ -0,0 +1,183 @@
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from keyword_analysis import tokenize
+from config import NEAR_DUPLICATE_THRESHOLD
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 128
+# 32 bands of 4 rows: pages with Jaccard similarity 0.5 share a bucket with probability ~0.9
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+MASK_64 = (1 << 64) - 1
+EMPTY_BIN = 1 << 64
+
+
+def shingles(text: str) -> set:
+    """32-bit hashes of the word n-grams in `text`"""
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode())
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(shingle_set: set) -> Tuple[int, ...]:
+    """One-permutation MinHash signature.
+
+    Each shingle is hashed once and kept as the minimum of one of
+    NUM_PERMUTATIONS bins, so signing is linear in the number of shingles
+    rather than shingles x permutations. Empty bins borrow the next
+    non-empty bin's value (rotation densification) to stay comparable.
+    """
+    bins = [EMPTY_BIN] * NUM_PERMUTATIONS
+    for shingle in shingle_set:
+        # splitmix64 finalizer: a fixed, well-mixed hash, stable across processes and restarts
+        value = shingle ^ (shingle >> 30)
+        value = (value * 0xBF58476D1CE4E5B9) & MASK_64
+        value ^= value >> 27
+        value = (value * 0x94D049BB133111EB) & MASK_64
+        value ^= value >> 31
+        index = value % NUM_PERMUTATIONS
+        value //= NUM_PERMUTATIONS
+        if value < bins[index]:
+            bins[index] = value
+    if not shingle_set:
+        raise ValueError("Cannot sign an empty shingle set")
+    signature = list(bins)
+    for index in range(NUM_PERMUTATIONS):
+        offset = 0
+        while bins[(index + offset) % NUM_PERMUTATIONS] == EMPTY_BIN:
+            offset += 1
+        # Offset keeps borrowed values distinct from the donor bin's own value
+        signature[index] = bins[(index + offset) % NUM_PERMUTATIONS] + offset * EMPTY_BIN
+    return tuple(signature)
+
+
+def estimated_similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: the share of MinHash positions that agree"""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERMUTATIONS
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of pages bucketed by LSH band, updated one page at a time"""
+
+    def __init__(self):
+        self.signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: Dict[Tuple[int, bytes], set] = defaultdict(set)
+        self._page_buckets: Dict[str, List[Tuple[int, bytes]]] = {}
+
+    def update(self, page_path: str, text: Optional[str]):
+        """Index or re-index a page; None, or text without any words, removes it"""
+        for bucket in self._page_buckets.pop(page_path, []):
+            members = self._buckets[bucket]
+            members.discard(page_path)
+            if not members:
+                del self._buckets[bucket]
+        self.signatures.pop(page_path, None)
+        if text is None:
+            return
+        shingle_set = shingles(text)
+        if not shingle_set:
+            # Empty signatures are all EMPTY_BIN and would match each other exactly
+            return
+
+        signature = minhash(shingle_set)
+        self.signatures[page_path] = signature
+        buckets = []
+        for band in range(LSH_BANDS):
+            rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+            bucket = (band, hashlib.blake2b(repr(rows).encode(), digest_size=8).digest())
+            self._buckets[bucket].add(page_path)
+            buckets.append(bucket)
+        self._page_buckets[page_path] = buckets
+
+    def similar_pairs(self, threshold: float) -> Dict[Tuple[str, str], float]:
+        """Pairs at or above `threshold`, checking only pages that share an LSH bucket"""
+        candidates = set()
+        for members in self._buckets.values():
+            if len(members) > 1:
+                ordered = sorted(members)
+                candidates.update(
+                    (ordered[i], ordered[j]) for i in range(len(ordered)) for j in range(i + 1, len(ordered))
+                )
+        pairs = {}
+        for first, second in candidates:
+            similarity = estimated_similarity(self.signatures[first], self.signatures[second])
+            if similarity >= threshold:
+                pairs[(first, second)] = similarity
+        return pairs
+
+    def similar_to(self, page_path: str, threshold: float) -> List[dict]:
+        signature = self.signatures.get(page_path)
+        if signature is None:
+            return []
+        candidates = set()
+        for bucket in self._page_buckets[page_path]:
+            candidates.update(self._buckets[bucket])
+        candidates.discard(page_path)
+        matches = []
+        for other in candidates:
+            similarity = estimated_similarity(signature, self.signatures[other])
+            if similarity >= threshold:
+                matches.append({"page_path": other, "similarity": round(similarity, 3)})
+        return sorted(matches, key=lambda match: -match["similarity"])
+
+    def clusters(self, threshold: float) -> List[dict]:
+        """Connected groups of near-duplicate pages, most similar first"""
+        pairs = self.similar_pairs(threshold)
+        parent = {}
+
+        def find(page):
+            parent.setdefault(page, page)
+            while parent[page] != page:
+                parent[page] = parent[parent[page]]
+                page = parent[page]
+            return page
+
+        for first, second in pairs:
+            parent[find(first)] = find(second)
+
+        groups = defaultdict(lambda: {"pages": set(), "pairs": []})
+        for (first, second), similarity in pairs.items():
+            group = groups[find(first)]
+            group["pages"].update((first, second))
+            group["pairs"].append({"pages": [first, second], "similarity": round(similarity, 3)})
+
+        clusters = []
+        for group in groups.values():
+            group["pairs"].sort(key=lambda pair: -pair["similarity"])
+            clusters.append({
+                "pages": sorted(group["pages"]),
+                "max_similarity": group["pairs"][0]["similarity"],
+                "min_similarity": group["pairs"][-1]["similarity"],
+                "pairs": group["pairs"],
+            })
+        return sorted(clusters, key=lambda cluster: -cluster["max_similarity"])
+
+
+_index = NearDuplicateIndex()
+
+
+def page_text(page: dict) -> str:
+    return " ".join(str(page.get(field) or "") for field in ("title", "description", "content"))
+
+
+def index_page(page_path: str, page: Optional[dict]):
+    """page_indexes handler"""
+    _index.update(page_path, page_text(page) if page is not None else None)
+
+
+def get_duplicate_clusters(threshold: float = NEAR_DUPLICATE_THRESHOLD) -> dict:
+    return {
+        "threshold": threshold,
+        "pages_indexed": len(_index.signatures),
+        "clusters": _index.clusters(threshold),
+    }
+
+
+def get_similar_pages(page_path: str, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> List[dict]:
+    return _index.similar_to(page_path, threshold)
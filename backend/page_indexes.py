@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import ASCENDING
+from database import service_pages_catalog, projects_catalog, projects_collection
+from config import PAGE_INDEX_REFRESH_SECONDS, PAGE_INDEX_REBUILD_HOURS
+from watermark_refresher import EPOCH, WatermarkRefresher, advance, changed_since
+
+
+def _project_document(project: dict) -> dict:
+    return {
+        "title": project.get("name"),
+        "description": project.get("description"),
+        "content": project.get("category"),
+    }
+
+
+# Collections mirrored into the in-memory indexes. Changes are detected through
+# a timestamp watermark; projects are insert-only, so created_at suffices.
+SOURCES = {
+    "service_page": {
+        "collection": service_pages_catalog,
+        "fields": {"slug": 1, "title": 1, "description": 1, "content": 1, "seo_data": 1, "is_active": 1, "updated_at": 1},
+        "full_query": {"is_active": True},
+        "watermark_field": "updated_at",
+        "path": lambda page: f"/services/{page['slug']}",
+        "active": lambda page: page.get("is_active", True),
+        "document": lambda page: page,
+    },
+    "project": {
+        "collection": projects_catalog,
+        "fields": {"id": 1, "name": 1, "description": 1, "category": 1, "created_at": 1},
+        "full_query": {},
+        "watermark_field": "created_at",
+        "path": lambda project: f"/projects/{project.get('id') or project['_id']}",
+        "active": lambda project: True,
+        "document": _project_document,
+    },
+}
+
+# (handler, kinds): handler(path, document) is kept up to date with documents of
+# those kinds; document is None once it is gone
+_handlers: List[Tuple[Callable[[str, Optional[dict]], None], tuple]] = []
+_indexed_paths: Dict[str, set] = {kind: set() for kind in SOURCES}
+_watermarks: Dict[str, Optional[datetime]] = {kind: None for kind in SOURCES}
+
+
+async def ensure_page_index_indexes():
+    # service_pages.updated_at is indexed for the sitemap refresher
+    await projects_collection.create_index([("created_at", ASCENDING)])
+
+
+def register_page_index(handler: Callable[[str, Optional[dict]], None], kinds: tuple = ("service_page",)):
+    _handlers.append((handler, kinds))
+
+
+def _dispatch(kind: str, path: str, document: Optional[dict]):
+    for handler, kinds in _handlers:
+        if kind not in kinds:
+            continue
+        try:
+            handler(path, document)
+        except Exception as e:
+            print(f"Error updating page index for {path}: {str(e)}")
+
+
+async def _apply(kind: str, query: dict) -> set:
+    source = SOURCES[kind]
+    seen = set()
+    async for doc in source["collection"].find(query, source["fields"]):
+        path = source["path"](doc)
+        _watermarks[kind] = advance(_watermarks[kind], doc.get(source["watermark_field"]))
+        if source["active"](doc):
+            seen.add(path)
+            _indexed_paths[kind].add(path)
+            _dispatch(kind, path, source["document"](doc))
+        elif path in _indexed_paths[kind]:
+            _indexed_paths[kind].discard(path)
+            _dispatch(kind, path, None)
+    return seen
+
+
+async def load_page_indexes():
+    """Index every active document, dropping ones that no longer exist or were hard-deleted"""
+    for kind, source in SOURCES.items():
+        _watermarks[kind] = EPOCH
+        seen = await _apply(kind, source["full_query"])
+        for path in _indexed_paths[kind] - seen:
+            _indexed_paths[kind].discard(path)
+            _dispatch(kind, path, None)
+
+
+async def refresh_page_indexes():
+    """Re-index only documents changed since the last refresh"""
+    if any(watermark is None for watermark in _watermarks.values()):
+        await load_page_indexes()
+        return
+    for kind, source in SOURCES.items():
+        await _apply(kind, changed_since(source["watermark_field"], _watermarks[kind]))
+
+
+_refresher = WatermarkRefresher(
+    "page indexes", load_page_indexes, refresh_page_indexes, PAGE_INDEX_REFRESH_SECONDS, PAGE_INDEX_REBUILD_HOURS
+)
+
+
+def notify_page_change():
+    """Ask the refresher to pick up a local write now instead of on its next poll"""
+    _refresher.notify()
+
+
+async def start_page_index_refresher():
+    await _refresher.start()
+
+
+def stop_page_index_refresher():
+    _refresher.stop()
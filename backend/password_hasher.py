@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from pymongo import UpdateOne
+from config import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+    BCRYPT_ROUNDS,
+    PASSWORD_REHASH_BATCH_SIZE,
+    PASSWORD_REHASH_FLUSH_SECONDS,
+)
+
+# Hashes whose cost differs from BCRYPT_ROUNDS are reported by needs_update
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt is CPU-bound (~100-300 ms per call), so it runs on its own small pool
+# instead of the event loop or the default executor shared with other work.
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+_metrics = {
+    "in_flight": 0,
+    "max_queue_depth": 0,
+    "completed": 0,
+    "failed": 0,
+    "rejected": 0,
+    "total_wait_seconds": 0.0,
+    "total_hash_seconds": 0.0,
+    "rehashed": 0,
+}
+
+# Pending (collection, _id, old_hash, new_hash) writes from transparent rehashing
+_rehash_queue: List[Tuple[object, object, str, str]] = []
+_rehash_task: Optional[asyncio.Task] = None
+
+
+def _timed(func, *args):
+    started_at = time.perf_counter()
+    result = func(*args)
+    return result, started_at, time.perf_counter()
+
+
+async def _run(func, *args):
+    """Run a password hashing call on the dedicated pool, rejecting when saturated"""
+    if _metrics["in_flight"] >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        _metrics["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    _metrics["in_flight"] += 1
+    queue_depth = max(0, _metrics["in_flight"] - PASSWORD_HASH_WORKERS)
+    _metrics["max_queue_depth"] = max(_metrics["max_queue_depth"], queue_depth)
+    try:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+        result, started_at, finished_at = await loop.run_in_executor(_executor, _timed, func, *args)
+        # Timings are recorded here, on the event loop, so no locking is needed
+        _metrics["total_wait_seconds"] += started_at - submitted_at
+        _metrics["total_hash_seconds"] += finished_at - started_at
+        _metrics["completed"] += 1
+        return result
+    except Exception:
+        # Failed calls have no timings, so they stay out of completed and its averages
+        _metrics["failed"] += 1
+        raise
+    finally:
+        _metrics["in_flight"] -= 1
+
+
+async def verify_password(plain_password, hashed_password):
+    return await _run(pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash(password):
+    return await _run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password, hashed_password):
+    """Verify a password, returning (valid, new_hash) when the stored cost is outdated"""
+    return await _run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def schedule_rehash(collection, document_id, old_hash: str, new_hash: str):
+    """Queue a hash upgrade; writes are flushed in batches by the rehash flusher"""
+    _rehash_queue.append((collection, document_id, old_hash, new_hash))
+    if len(_rehash_queue) >= PASSWORD_REHASH_BATCH_SIZE:
+        asyncio.get_running_loop().create_task(flush_rehashes())
+
+
+async def flush_rehashes():
+    """Write queued hash upgrades with one bulk_write per collection"""
+    if not _rehash_queue:
+        return
+    pending = _rehash_queue[:]
+    del _rehash_queue[:]
+    by_collection = {}
+    for collection, document_id, old_hash, new_hash in pending:
+        # Matching the old hash keeps a concurrent password change from being overwritten
+        by_collection.setdefault(collection.name, (collection, []))[1].append(UpdateOne(
+            {"_id": document_id, "hashed_password": old_hash},
+            {"$set": {"hashed_password": new_hash}},
+        ))
+    for collection, operations in by_collection.values():
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            _metrics["rehashed"] += result.modified_count
+        except Exception as e:
+            # Rehashing is opportunistic; the next login will queue it again
+            print(f"Error writing rehashed passwords: {str(e)}")
+
+
+async def _flush_periodically():
+    while True:
+        await asyncio.sleep(PASSWORD_REHASH_FLUSH_SECONDS)
+        await flush_rehashes()
+
+
+def start_rehash_flusher():
+    global _rehash_task
+    if _rehash_task is None:
+        _rehash_task = asyncio.get_running_loop().create_task(_flush_periodically())
+
+
+async def stop_rehash_flusher():
+    global _rehash_task
+    if _rehash_task is not None:
+        _rehash_task.cancel()
+        _rehash_task = None
+    await flush_rehashes()
+
+
+def get_password_hash_metrics():
+    """Current pool utilisation and cumulative timings"""
+    completed = _metrics["completed"]
+    return {
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_queue": PASSWORD_HASH_MAX_QUEUE,
+        "in_flight": _metrics["in_flight"],
+        "queue_depth": max(0, _metrics["in_flight"] - PASSWORD_HASH_WORKERS),
+        "max_queue_depth": _metrics["max_queue_depth"],
+        "completed": completed,
+        "failed": _metrics["failed"],
+        "rejected": _metrics["rejected"],
+        "avg_wait_ms": round(_metrics["total_wait_seconds"] / completed * 1000, 2) if completed else 0,
+        "avg_hash_ms": round(_metrics["total_hash_seconds"] / completed * 1000, 2) if completed else 0,
+        "rehashed": _metrics["rehashed"],
+        "rehash_pending": len(_rehash_queue),
+    }
+
+
+def shutdown_password_hasher():
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def measure_rounds(rounds: int, samples: int = 5) -> float:
+    """Median milliseconds to hash one password at the given bcrypt cost"""
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 5):
+    """Pick the highest bcrypt cost whose hash time stays within `target_ms`.
+
+    Each extra round doubles the cost, so measurement stops at the first
+    factor over target. Never returns less than `min_rounds`.
+    """
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure_rounds(rounds, samples)
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the bcrypt work factor for this host")
+    parser.add_argument("--target-ms", type=float, default=250, help="target hash latency in milliseconds")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5, help="hashes measured per work factor")
+    args = parser.parse_args()
+
+    chosen, timings = calibrate_rounds(args.target_ms, args.min_rounds, args.max_rounds, args.samples)
+    for rounds, elapsed in timings.items():
+        marker = " <- selected" if rounds == chosen else ""
+        print(f"rounds={rounds}: {elapsed:.1f}ms{marker}")
+    print(f"\nBCRYPT_ROUNDS={chosen}")
+    _executor.shutdown(wait=False)
@@ -0,0 +1,123 @@
+import math
+import time
+from datetime import datetime, timedelta
+from fastapi import HTTPException, Request, status
+from pymongo import ASCENDING, ReturnDocument
+from database import rate_limits_collection
+from lru_cache import LRUCache
+from config import (
+    LOGIN_THROTTLE_BACKEND,
+    LOGIN_IP_BURST,
+    LOGIN_IP_PER_MINUTE,
+    LOGIN_ACCOUNT_BURST,
+    LOGIN_ACCOUNT_PER_MINUTE,
+    LOGIN_THROTTLE_MAX_KEYS,
+    TRUSTED_PROXY_HOPS,
+)
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process; each app instance limits independently"""
+
+    def __init__(self, max_keys: int):
+        # Idle buckets are full again after capacity / rate, so evicting them is lossless
+        self._buckets = LRUCache(max_keys)
+
+    async def take(self, key: str, capacity: int, per_second: float) -> float:
+        """Consume one token, returning 0 if allowed or seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * per_second)
+        if tokens >= 1:
+            self._buckets.set(key, (tokens - 1, now))
+            return 0
+        self._buckets.set(key, (tokens, now))
+        return (1 - tokens) / per_second
+
+
+class MongoBucketStore:
+    """Token buckets shared by all app instances, refilled atomically in MongoDB"""
+
+    async def ensure_indexes(self):
+        await rate_limits_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+    async def take(self, key: str, capacity: int, per_second: float) -> float:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [capacity, {"$add": [{"$ifNull": ["$tokens", capacity]}, {"$multiply": [elapsed, per_second]}]}]}
+        bucket = await rate_limits_collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    "expires_at": now + timedelta(seconds=capacity / per_second),
+                }},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return 0
+        return (1 - bucket["tokens"]) / per_second
+
+
+_store = MongoBucketStore() if LOGIN_THROTTLE_BACKEND == "mongo" else MemoryBucketStore(LOGIN_THROTTLE_MAX_KEYS)
+
+_metrics = {
+    "allowed": 0,
+    "rejected_ip": 0,
+    "rejected_account": 0,
+}
+
+
+async def ensure_rate_limit_indexes():
+    if isinstance(_store, MongoBucketStore):
+        await _store.ensure_indexes()
+
+
+def client_ip(request: Request) -> str:
+    """Client address as seen by the outermost trusted proxy"""
+    if TRUSTED_PROXY_HOPS > 0:
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+
+async def check_login_rate(request: Request, username: str, kind: str):
+    """Reject a login attempt with 429 when its IP or account bucket is empty.
+
+    Called before the user lookup so throttled attempts never reach bcrypt.
+    """
+    retry_after = await _store.take(
+        f"login:ip:{client_ip(request)}", LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE / 60
+    )
+    scope = "ip"
+    if not retry_after:
+        retry_after = await _store.take(
+            f"login:{kind}:{username.strip().lower()}", LOGIN_ACCOUNT_BURST, LOGIN_ACCOUNT_PER_MINUTE / 60
+        )
+        scope = "account"
+    if retry_after:
+        _metrics[f"rejected_{scope}"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    _metrics["allowed"] += 1
+
+
+def get_login_throttle_metrics():
+    return {
+        "backend": LOGIN_THROTTLE_BACKEND,
+        "limits": {
+            "ip_burst": LOGIN_IP_BURST,
+            "ip_per_minute": LOGIN_IP_PER_MINUTE,
+            "account_burst": LOGIN_ACCOUNT_BURST,
+            "account_per_minute": LOGIN_ACCOUNT_PER_MINUTE,
+        },
+        **_metrics,
+    }
@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import html
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from lru_cache import LRUCache
+from database import service_pages_catalog
+from keyword_analysis import TOKEN_PATTERN
+from config import READABILITY_CACHE_SIZE
+
+# Bump when tokenization or scoring changes so cached scores are recomputed
+READABILITY_VERSION = 1
+
+# Block-level tags end a sentence even without punctuation (list items, headings)
+BLOCK_TAG_PATTERN = re.compile(r"</?(?:p|div|li|h[1-6]|br|tr|td|th|ul|ol|section|article|blockquote)\b[^>]*>", re.IGNORECASE)
+TAG_PATTERN = re.compile(r"<[^>]*>")
+SENTENCE_SPLIT_PATTERN = re.compile(r"[.!?]+(?=\s|$)|\n\s*\n")
+VOWEL_GROUP_PATTERN = re.compile(r"[aeiouy]+")
+SENTENCE_LENGTH_BUCKETS = ((1, 10), (11, 20), (21, 30), (31, None))
+LONG_SENTENCE_WORDS = 25
+
+_cache = LRUCache(READABILITY_CACHE_SIZE)
+
+
+@lru_cache(maxsize=100000)
+def count_syllables(word: str) -> int:
+    """Estimate syllables from vowel groups, discounting common silent endings"""
+    if not word.isalpha():
+        return 1 if any(ch.isalpha() for ch in word) or word.isdigit() else 0
+    count = len(VOWEL_GROUP_PATTERN.findall(word))
+    if count > 1:
+        if word.endswith("e") and not word.endswith(("le", "ee", "ye")):
+            count -= 1
+        elif word.endswith("ed") and not word.endswith(("ted", "ded")):
+            count -= 1
+        elif word.endswith("es") and not word.endswith(("ses", "xes", "zes", "ces", "ges", "ches", "shes")):
+            count -= 1
+    return max(1, count)
+
+
+def split_sentences(content: str) -> List[List[str]]:
+    """Word tokens of each sentence in HTML or plain-text content"""
+    text = html.unescape(TAG_PATTERN.sub(" ", BLOCK_TAG_PATTERN.sub("\n\n", content))).lower()
+    sentences = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        words = TOKEN_PATTERN.findall(sentence)
+        if words:
+            sentences.append(words)
+    return sentences
+
+
+def _percentile(ordered: List[int], pct: float) -> int:
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def _round(value: float) -> float:
+    # Adding 0.0 turns a rounded -0.0 into 0.0
+    return round(value, 1) + 0.0
+
+
+def _score(sentences: List[List[str]], syllables: Dict[str, int]) -> dict:
+    sentence_lengths = sorted(len(words) for words in sentences)
+    word_count = sum(sentence_lengths)
+    sentence_count = len(sentence_lengths)
+    if not word_count:
+        return {
+            "flesch_reading_ease": 0, "flesch_kincaid_grade": 0, "sentences": 0, "words": 0, "syllables": 0,
+            "avg_words_per_sentence": 0, "avg_syllables_per_word": 0,
+            "sentence_length": {}, "word_syllables": {}, "avg_word_length": 0, "complex_word_ratio": 0,
+            "long_sentences": 0,
+        }
+
+    syllable_counts = Counter()
+    word_lengths = Counter()
+    for words in sentences:
+        for word in words:
+            syllable_counts[syllables[word]] += 1
+            word_lengths[len(word)] += 1
+    syllable_total = sum(count * n for count, n in syllable_counts.items())
+    words_per_sentence = word_count / sentence_count
+    syllables_per_word = syllable_total / word_count
+
+    buckets = {}
+    for low, high in SENTENCE_LENGTH_BUCKETS:
+        label = f"{low}-{high}" if high else f"{low}+"
+        buckets[label] = sum(1 for length in sentence_lengths if length >= low and (high is None or length <= high))
+
+    return {
+        "flesch_reading_ease": _round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word),
+        "flesch_kincaid_grade": _round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59),
+        "sentences": sentence_count,
+        "words": word_count,
+        "syllables": syllable_total,
+        "avg_words_per_sentence": round(words_per_sentence, 1),
+        "avg_syllables_per_word": round(syllables_per_word, 2),
+        "sentence_length": {
+            "p50": _percentile(sentence_lengths, 50),
+            "p90": _percentile(sentence_lengths, 90),
+            "max": sentence_lengths[-1],
+            "buckets": buckets,
+        },
+        "word_syllables": {
+            "1": syllable_counts[1],
+            "2": syllable_counts[2],
+            "3+": sum(n for count, n in syllable_counts.items() if count >= 3),
+        },
+        "avg_word_length": round(sum(length * n for length, n in word_lengths.items()) / word_count, 2),
+        "complex_word_ratio": round(sum(n for count, n in syllable_counts.items() if count >= 3) / word_count, 3),
+        "long_sentences": sum(1 for length in sentence_lengths if length > LONG_SENTENCE_WORDS),
+    }
+
+
+def _cache_key(content: str) -> Tuple[int, str]:
+    return READABILITY_VERSION, hashlib.sha256(content.encode()).hexdigest()
+
+
+def score_readability(content: str) -> dict:
+    """Readability metrics for one page, cached by content hash"""
+    key = _cache_key(content)
+    result = _cache.get(key)
+    if result is None:
+        sentences = split_sentences(content)
+        result = _score(sentences, {word: count_syllables(word) for words in sentences for word in words})
+        _cache.set(key, result)
+    return result
+
+
+def score_corpus(pages: Dict[str, str]) -> Dict[str, dict]:
+    """Readability for many pages in one batched pass.
+
+    Cached pages are returned as-is; the rest are split once, and syllables
+    are estimated once per distinct word across all of them.
+    """
+    results = {}
+    pending = {}
+    for page_id, content in pages.items():
+        key = _cache_key(content)
+        cached = _cache.get(key)
+        if cached is not None:
+            results[page_id] = cached
+        else:
+            pending[page_id] = (key, split_sentences(content))
+
+    vocabulary = {word for _, sentences in pending.values() for words in sentences for word in words}
+    syllables = {word: count_syllables(word) for word in vocabulary}
+    for page_id, (key, sentences) in pending.items():
+        results[page_id] = _score(sentences, syllables)
+        _cache.set(key, results[page_id])
+    return results
+
+
+async def score_service_pages() -> dict:
+    """Readability of every active service page plus corpus-wide averages"""
+    pages = {}
+    async for page in service_pages_catalog.find({"is_active": True}, {"slug": 1, "content": 1}):
+        pages[f"/services/{page['slug']}"] = page.get("content") or ""
+    results = await asyncio.to_thread(score_corpus, pages)
+
+    total_words = sum(result["words"] for result in results.values())
+    total_sentences = sum(result["sentences"] for result in results.values())
+    total_syllables = sum(result["syllables"] for result in results.values())
+    corpus = {"pages": len(results), "words": total_words}
+    if total_words and total_sentences:
+        corpus["flesch_reading_ease"] = _round(
+            206.835 - 1.015 * total_words / total_sentences - 84.6 * total_syllables / total_words
+        )
+        corpus["flesch_kincaid_grade"] = _round(
+            0.39 * total_words / total_sentences + 11.8 * total_syllables / total_words - 15.59
+        )
+    return {
+        "corpus": corpus,
+        # Hardest to read first
+        "pages": sorted(
+            ({"page_path": page_path, **result} for page_path, result in results.items()),
+            key=lambda page: page["flesch_reading_ease"]
+        ),
+    }
+
+
+def reading_ease_score(metrics: dict) -> int:
+    """Flesch reading ease clamped to the 0-100 scale used in SEO results"""
+    return int(round(min(100, max(0, metrics["flesch_reading_ease"]))))
+
+
+def get_readability_metrics():
+    return {"cache": _cache.stats(), "syllable_cache": count_syllables.cache_info()._asdict()}
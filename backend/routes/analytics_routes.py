@@ -0,0 +1,50 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from typing import List, Optional
+from auth import get_current_admin
+from analytics import (
+    get_calculation_trends,
+    get_location_summary,
+    backfill_rollups,
+    get_backfill_status
+)
+
+router = APIRouter()
+
+@router.get("/calculations/trends", response_model=List[dict])
+async def get_trends(
+    days: int = Query(30, ge=1, le=3650),
+    location: Optional[str] = None,
+    quality_level: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Get daily estimate volume and average cost per sq ft"""
+    try:
+        return await get_calculation_trends(days, location, quality_level)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching calculation trends: {str(e)}")
+
+@router.get("/calculations/locations", response_model=List[dict])
+async def get_locations_summary(
+    days: int = Query(30, ge=1, le=3650),
+    quality_level: Optional[str] = None,
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Get estimate totals per location and quality level"""
+    try:
+        return await get_location_summary(days, quality_level)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching location summary: {str(e)}")
+
+@router.post("/calculations/rollups/backfill", response_model=dict)
+async def start_rollup_backfill(background_tasks: BackgroundTasks, current_admin: dict = Depends(get_current_admin)):
+    """Rebuild daily rollups from raw calculations in the background"""
+    background_tasks.add_task(backfill_rollups)
+    return {"message": "Rollup backfill started"}
+
+@router.get("/calculations/rollups/status", response_model=dict)
+async def get_rollup_backfill_status(current_admin: dict = Depends(get_current_admin)):
+    """Get progress of the rollup backfill"""
+    try:
+        return await get_backfill_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching backfill status: {str(e)}")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List
+from models import APIKeyCreate
+from auth import get_current_admin
+from api_keys import create_api_key, revoke_api_key, list_api_keys
+
+router = APIRouter()
+
+@router.post("", response_model=dict)
+async def create_partner_api_key(request: APIKeyCreate, current_admin: dict = Depends(get_current_admin)):
+    """Create a partner API key; the key is only shown in this response"""
+    try:
+        return await create_api_key(request.partner, request.daily_quota)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating API key: {str(e)}")
+
+@router.get("", response_model=List[dict])
+async def get_partner_api_keys(current_admin: dict = Depends(get_current_admin)):
+    """List partner API keys with today's usage"""
+    try:
+        return await list_api_keys()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching API keys: {str(e)}")
+
+@router.delete("/{key_id}", response_model=dict)
+async def revoke_partner_api_key(key_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Revoke a partner API key"""
+    if not await revoke_api_key(key_id):
+        raise HTTPException(status_code=404, detail="Active API key not found")
+    return {"message": "API key revoked successfully"}
@@ -1,32 +1,45 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from typing import Optional
 from datetime import timedelta, datetime
 import uuid
-from models import UserCreate, UserLogin, Token, AdminUserCreate
+from pymongo.errors import DuplicateKeyError
+from models import UserCreate, UserLogin, Token, AdminUserCreate, RefreshTokenRequest
 from database import users_collection, admins_collection
 from auth import (
-    verify_password, 
+    verify_and_update_password,
+    schedule_rehash,
     get_password_hash, 
     create_access_token, 
     get_current_user, 
-    get_current_admin
+    get_current_admin,
+    oauth2_scheme_optional,
+    revoke_access_token
 )
+from sessions import create_session, rotate_session, revoke_session
+from rate_limiter import check_login_rate
 from config import ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter()
 
+async def _issue_tokens(email: str, kind: str, refresh_token: str = None):
+    """Create an access token, plus a new session unless one was just rotated"""
+    token_data = {"sub": email}
+    if kind == "admin":
+        token_data["type"] = "admin"
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(data=token_data, expires_delta=access_token_expires)
+    if refresh_token is None:
+        refresh_token = await create_session(email, kind)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 # User Authentication Routes
 @router.post("/register", response_model=dict)
 async def register(user: UserCreate):
     """Register a new user"""
     try:
-        # Check if user already exists
-        existing_user = await users_collection.find_one({"email": user.email})
-        if existing_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Hash password and create user
-        hashed_password = get_password_hash(user.password)
+        # Hash password and create user; the unique email index rejects duplicates
+        hashed_password = await get_password_hash(user.password)
         user_dict = {
             "id": str(uuid.uuid4()),
             "email": user.email,
@@ -40,30 +53,67 @@ async def register(user: UserCreate):
         result = await users_collection.insert_one(user_dict)
         return {"message": "User registered successfully", "id": str(result.inserted_id)}
         
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error registering user: {str(e)}")
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Login user"""
     try:
+        await check_login_rate(request, form_data.username, "user")
         user = await users_collection.find_one({"email": form_data.username})
-        if not user or not verify_password(form_data.password, user["hashed_password"]):
+        valid, new_hash = (await verify_and_update_password(form_data.password, user["hashed_password"])
+                           if user else (False, None))
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if new_hash:
+            schedule_rehash(users_collection, user["_id"], user["hashed_password"], new_hash)
         
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": user["email"]}, expires_delta=access_token_expires
-        )
-        return {"access_token": access_token, "token_type": "bearer"}
+        return await _issue_tokens(user["email"], "user")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error logging in: {str(e)}")
 
+@router.post("/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshTokenRequest):
+    """Exchange a refresh token for a new access token and refresh token"""
+    try:
+        rotated = await rotate_session(request.refresh_token)
+        if rotated is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        session, new_refresh_token = rotated
+        return await _issue_tokens(session["email"], session["kind"], new_refresh_token)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error refreshing token: {str(e)}")
+
+@router.post("/logout", response_model=dict)
+async def logout(request: RefreshTokenRequest, token: Optional[str] = Depends(oauth2_scheme_optional)):
+    """Revoke a refresh token and the access token it was sent with"""
+    try:
+        await revoke_session(request.refresh_token)
+        if token:
+            await revoke_access_token(token, "logout")
+        return {"message": "Logged out successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging out: {str(e)}")
+
 @router.get("/me", response_model=dict)
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current user info"""
@@ -75,13 +125,8 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 async def register_admin(admin: AdminUserCreate):
     """Register a new admin user"""
     try:
-        # Check if admin already exists
-        existing_admin = await admins_collection.find_one({"email": admin.email})
-        if existing_admin:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Hash password and create admin
-        hashed_password = get_password_hash(admin.password)
+        # Hash password and create admin; the unique email index rejects duplicates
+        hashed_password = await get_password_hash(admin.password)
         admin_dict = {
             "id": str(uuid.uuid4()),
             "email": admin.email,
@@ -95,27 +140,34 @@ async def register_admin(admin: AdminUserCreate):
         result = await admins_collection.insert_one(admin_dict)
         return {"message": "Admin registered successfully", "id": str(result.inserted_id)}
         
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error registering admin: {str(e)}")
 
 @router.post("/admin/login", response_model=Token)
-async def login_admin(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login_admin(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
     """Login admin user"""
     try:
+        await check_login_rate(request, form_data.username, "admin")
         admin = await admins_collection.find_one({"email": form_data.username})
-        if not admin or not verify_password(form_data.password, admin["hashed_password"]):
+        valid, new_hash = (await verify_and_update_password(form_data.password, admin["hashed_password"])
+                           if admin else (False, None))
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if new_hash:
+            schedule_rehash(admins_collection, admin["_id"], admin["hashed_password"], new_hash)
         
-        access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = create_access_token(
-            data={"sub": admin["email"], "type": "admin"}, expires_delta=access_token_expires
-        )
-        return {"access_token": access_token, "token_type": "bearer"}
+        return await _issue_tokens(admin["email"], "admin")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error logging in admin: {str(e)}")
 
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
 from models import CalculatorRequest, CalculatorResult
 from database import calculations_collection
+from analytics import record_calculation
+from migrations import upgrade_document
+from api_keys import get_optional_partner
 from cost_calculator import (
     scrape_material_prices,
     calculate_granular_material_quantities,
@@ -13,7 +16,7 @@ from cost_calculator import (
 router = APIRouter()
 
 @router.post("/estimate", response_model=CalculatorResult)
-async def calculate_construction_cost(request: CalculatorRequest):
+async def calculate_construction_cost(request: CalculatorRequest, partner: Optional[dict] = Depends(get_optional_partner)):
     """Enhanced construction cost calculation with comprehensive cost breakdown"""
     try:
         # Import the optimization function
@@ -165,9 +168,17 @@ async def calculate_construction_cost(request: CalculatorRequest):
         )
         
         # Save calculation to database
-        result_dict = result.model_dump()
+        result_dict = upgrade_document("calculations", result.model_dump())
+        if partner:
+            result_dict["partner_key_id"] = partner["key_id"]
         await calculations_collection.insert_one(result_dict)
         
+        # Update the daily analytics rollup; a failure here must not lose the estimate
+        try:
+            await record_calculation(result_dict)
+        except Exception as e:
+            print(f"Error updating calculation rollup: {str(e)}")
+        
         return result
         
     except Exception as e:
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List
+from models import MaintenanceRequest
+from auth import get_current_admin
+from maintenance import (
+    start_operation,
+    resume_operation,
+    cancel_operation,
+    get_operation,
+    list_operations
+)
+
+router = APIRouter()
+
+@router.get("", response_model=List[dict])
+async def get_maintenance_operations(current_admin: dict = Depends(get_current_admin)):
+    """List recent maintenance operations"""
+    try:
+        return await list_operations()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching maintenance operations: {str(e)}")
+
+@router.post("/purge", response_model=dict)
+async def purge_documents(request: MaintenanceRequest, current_admin: dict = Depends(get_current_admin)):
+    """Delete matching documents in throttled batches"""
+    return await _start("purge", request)
+
+@router.post("/backfill-field", response_model=dict)
+async def backfill_field(request: MaintenanceRequest, current_admin: dict = Depends(get_current_admin)):
+    """Set a field on matching documents that don't have it yet"""
+    return await _start("backfill_field", request)
+
+@router.post("/recompute-totals", response_model=dict)
+async def recompute_totals(request: MaintenanceRequest, current_admin: dict = Depends(get_current_admin)):
+    """Recompute calculation totals from their stored subtotals"""
+    return await _start("recompute_totals", request)
+
+@router.get("/{operation_id}", response_model=dict)
+async def get_maintenance_operation(operation_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Get progress of a maintenance operation"""
+    operation = await get_operation(operation_id)
+    if operation is None:
+        raise HTTPException(status_code=404, detail="Maintenance operation not found")
+    return operation
+
+@router.post("/{operation_id}/cancel", response_model=dict)
+async def cancel_maintenance_operation(operation_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Stop a running maintenance operation after its current batch"""
+    operation = await cancel_operation(operation_id)
+    if operation is None:
+        raise HTTPException(status_code=404, detail="No running maintenance operation with this id")
+    return operation
+
+@router.post("/{operation_id}/resume", response_model=dict)
+async def resume_maintenance_operation(operation_id: str, current_admin: dict = Depends(get_current_admin)):
+    """Resume a stopped maintenance operation from its last checkpoint"""
+    operation = await resume_operation(operation_id)
+    if operation is None:
+        raise HTTPException(status_code=404, detail="No resumable maintenance operation with this id")
+    return operation
+
+async def _start(operation: str, request: MaintenanceRequest):
+    try:
+        return await start_operation(
+            operation,
+            request.collection,
+            request.filter,
+            field=request.field,
+            value=request.value,
+            batch_size=request.batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error starting maintenance operation: {str(e)}")
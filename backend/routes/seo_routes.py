@@ -0,0 +1,152 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from models import SEOOptimizationRequest, SEOBulkOptimizationRequest, KeywordSuggestionRequest
+from auth import get_current_admin
+from seo_optimizer import bulk_optimize, stream_optimize, service_page_requests
+from site_audit import run_site_audit, get_site_audit_status, list_site_audits
+from readability import score_service_pages
+from near_duplicates import get_duplicate_clusters, get_similar_pages
+from keyword_suggestions import suggest_keywords, suggest_keywords_for_content, get_cannibalization_report
+from link_graph import get_link_report, get_page_links
+from config import NEAR_DUPLICATE_THRESHOLD
+
+router = APIRouter()
+
+@router.post("/optimize/bulk")
+async def bulk_optimize_content_seo(request: SEOBulkOptimizationRequest, current_admin: dict = Depends(get_current_admin)):
+    """Optimize many pages concurrently, streaming progress as NDJSON"""
+    try:
+        requests = list(request.requests)
+        if request.all_service_pages:
+            requests.extend(await service_page_requests())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading service pages: {str(e)}")
+    if not requests:
+        raise HTTPException(status_code=400, detail="No pages to optimize")
+    return StreamingResponse(bulk_optimize(requests, request.force), media_type="application/x-ndjson")
+
+@router.post("/optimize/stream")
+async def stream_optimize_content_seo(
+    request: SEOOptimizationRequest,
+    force: bool = Query(False, description="Bypass cached results for unchanged content"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Optimize content for SEO, relaying suggestions as server-sent events while they are generated"""
+    return StreamingResponse(
+        stream_optimize(request, force),
+        media_type="text/event-stream",
+        # Keep nginx from buffering the stream until the provider has finished
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/audits/run", response_model=dict)
+async def start_site_audit(
+    background_tasks: BackgroundTasks,
+    force: bool = Query(False, description="Re-audit every page, not just changed ones"),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Start a site-wide audit of changed pages in the background"""
+    background_tasks.add_task(run_site_audit, force)
+    return {"message": "SEO site audit started"}
+
+@router.get("/audits/status", response_model=dict)
+async def get_site_audit_progress(current_admin: dict = Depends(get_current_admin)):
+    """Get progress of the latest site audit run"""
+    try:
+        return await get_site_audit_status()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching site audit status: {str(e)}")
+
+@router.get("/audits", response_model=List[dict])
+async def get_site_audits(
+    limit: int = Query(100, ge=1, le=1000),
+    max_score: Optional[int] = Query(None, ge=0, le=100),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """List the latest stored audits, lowest scores first"""
+    try:
+        return await list_site_audits(limit, max_score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching site audits: {str(e)}")
+
+@router.get("/readability", response_model=dict)
+async def get_service_page_readability(current_admin: dict = Depends(get_current_admin)):
+    """Score readability of all service pages in one batched pass"""
+    try:
+        return await score_service_pages()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error scoring readability: {str(e)}")
+
+@router.get("/duplicates", response_model=dict)
+async def get_near_duplicate_clusters(
+    threshold: float = Query(NEAR_DUPLICATE_THRESHOLD, ge=0.1, le=1.0),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """List clusters of near-duplicate service pages"""
+    try:
+        return get_duplicate_clusters(threshold)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding duplicate pages: {str(e)}")
+
+@router.get("/duplicates/similar/{page_path:path}", response_model=List[dict])
+async def get_pages_similar_to(
+    page_path: str,
+    threshold: float = Query(NEAR_DUPLICATE_THRESHOLD, ge=0.1, le=1.0),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """List pages similar to one service page"""
+    try:
+        return get_similar_pages("/" + page_path.strip("/"), threshold)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar pages: {str(e)}")
+
+@router.get("/keywords/suggest/{page_path:path}", response_model=dict)
+async def get_keyword_suggestions(
+    page_path: str,
+    limit: int = Query(15, ge=1, le=100),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """Suggest distinguishing keywords for a service page and flag cannibalization"""
+    suggestions = suggest_keywords("/" + page_path.strip("/"), limit)
+    if suggestions is None:
+        raise HTTPException(status_code=404, detail="Page not indexed")
+    return suggestions
+
+@router.post("/keywords/suggest", response_model=dict)
+async def suggest_keywords_for_draft(request: KeywordSuggestionRequest, current_admin: dict = Depends(get_current_admin)):
+    """Suggest keywords for unsaved content against the indexed corpus"""
+    try:
+        return suggest_keywords_for_content(request.content, request.title, request.limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error suggesting keywords: {str(e)}")
+
+@router.get("/keywords/cannibalization", response_model=List[dict])
+async def get_keyword_cannibalization(
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """List terms that several service pages compete for"""
+    try:
+        return get_cannibalization_report(limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building cannibalization report: {str(e)}")
+
+@router.get("/links", response_model=dict)
+async def get_internal_links(
+    suggestions_per_page: int = Query(3, ge=0, le=20),
+    current_admin: dict = Depends(get_current_admin)
+):
+    """PageRank, orphaned and under-linked service pages, with internal link suggestions"""
+    try:
+        return get_link_report(suggestions_per_page)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error building link report: {str(e)}")
+
+@router.get("/links/{page_path:path}", response_model=dict)
+async def get_internal_links_for_page(page_path: str, current_admin: dict = Depends(get_current_admin)):
+    """Inbound and outbound internal links of one service page"""
+    links = get_page_links("/" + page_path.strip("/"))
+    if links is None:
+        raise HTTPException(status_code=404, detail="Page not indexed")
+    return links
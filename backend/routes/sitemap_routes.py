@@ -0,0 +1,44 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, HTTPException, Request, Response
+from sitemap import get_sitemap_document
+
+router = APIRouter()
+
+
+def _cached_response(request: Request, name: str) -> Response:
+    document = get_sitemap_document(name)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    headers = {
+        "ETag": document.etag,
+        "Last-Modified": format_datetime(document.last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "public, max-age=300",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if document.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+    elif request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"]).replace(tzinfo=None)
+            if document.last_modified <= since:
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+    return Response(content=document.body, media_type=document.media_type, headers=headers)
+
+@router.get("/sitemap.xml", include_in_schema=False)
+async def get_sitemap(request: Request):
+    """Sitemap, or the sitemap index once it is sharded"""
+    return _cached_response(request, "sitemap.xml")
+
+@router.get("/sitemap-{shard:int}.xml", include_in_schema=False)
+async def get_sitemap_shard(shard: int, request: Request):
+    """One shard of a sharded sitemap"""
+    return _cached_response(request, f"sitemap-{shard}.xml")
+
+@router.get("/robots.txt", include_in_schema=False)
+async def get_robots_txt(request: Request):
+    """Robots rules pointing crawlers at the sitemap"""
+    return _cached_response(request, "robots.txt")
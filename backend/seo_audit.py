@@ -0,0 +1,224 @@
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+from keyword_analysis import TOKEN_PATTERN, analyze_keywords
+from database import service_pages_catalog, seo_data_collection
+
+# Bump when audit output changes so cached audits are recomputed
+AUDIT_VERSION = 3
+
+TITLE_LENGTH_RANGE = (30, 60)
+DESCRIPTION_LENGTH_RANGE = (120, 160)
+KEYWORD_DENSITY_RANGE = (0.5, 3.0)
+PARSE_CHUNK_SIZE = 64 * 1024
+SITE_HOSTS = {"constructpune.com", "www.constructpune.com", "constructpune.in", "www.constructpune.in"}
+SKIPPED_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+
+class AuditParser(HTMLParser):
+    """Collects headings, images, links and word tokens while HTML is fed in chunks"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.headings = {f"h{level}": 0 for level in range(1, 7)}
+        self.heading_levels: List[int] = []
+        self.images = 0
+        self.images_missing_alt = 0
+        self.internal_links = 0
+        self.external_links = 0
+        self.nofollow_links = 0
+        self.tokens: List[str] = []
+        self._skip_depth = 0
+        self._pending = ""
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+            return
+        self._flush_text()
+        if tag in self.headings:
+            self.headings[tag] += 1
+            self.heading_levels.append(int(tag[1]))
+        elif tag == "img":
+            attributes = dict(attrs)
+            self.images += 1
+            # alt="" marks a decorative image; only a missing attribute counts
+            if attributes.get("alt") is None:
+                self.images_missing_alt += 1
+        elif tag == "a":
+            attributes = dict(attrs)
+            href = (attributes.get("href") or "").strip()
+            if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+                return
+            host = urlparse(href).netloc.lower()
+            if host and host not in SITE_HOSTS:
+                self.external_links += 1
+            else:
+                self.internal_links += 1
+            if "nofollow" in (attributes.get("rel") or "").lower().split():
+                self.nofollow_links += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in SKIPPED_TEXT_TAGS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        else:
+            self._flush_text()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            # Text between tags can arrive split across chunks; tokenize it once it is complete
+            self._pending += data
+
+    def _flush_text(self):
+        if self._pending:
+            self.tokens.extend(TOKEN_PATTERN.findall(self._pending.lower()))
+            self._pending = ""
+
+    def close(self):
+        super().close()
+        self._flush_text()
+
+
+def parse_content(content: str) -> AuditParser:
+    parser = AuditParser()
+    for start in range(0, len(content), PARSE_CHUNK_SIZE):
+        parser.feed(content[start:start + PARSE_CHUNK_SIZE])
+    parser.close()
+    return parser
+
+
+def _length_check(label: str, text: str, length_range: Tuple[int, int]) -> dict:
+    length = len(text)
+    low, high = length_range
+    if not length:
+        return {"exists": False, "length": 0, "status": "error", "suggestion": f"Add a meta {label}"}
+    if length < low:
+        return {"exists": True, "length": length, "status": "warning",
+                "suggestion": f"Meta {label} is short; aim for {low}-{high} characters"}
+    if length > high:
+        return {"exists": True, "length": length, "status": "warning",
+                "suggestion": f"Meta {label} may be truncated; keep it under {high} characters"}
+    return {"exists": True, "length": length, "status": "good", "suggestion": f"Meta {label} length is optimal"}
+
+
+def _headings_check(parser: AuditParser) -> dict:
+    check = {f"{tag}_count": count for tag, count in parser.headings.items() if tag in ("h1", "h2", "h3")}
+    skipped = any(later - earlier > 1 for earlier, later in zip(parser.heading_levels, parser.heading_levels[1:]))
+    if parser.headings["h1"] > 1:
+        status, suggestion = "warning", "Use a single H1 heading per page"
+    elif not parser.heading_levels:
+        status, suggestion = "error", "Add headings to structure the content"
+    elif skipped:
+        status, suggestion = "warning", "Heading levels skip a level; nest headings in order"
+    else:
+        status, suggestion = "good", "Heading structure is well organized"
+    check.update(skipped_levels=skipped, status=status, suggestion=suggestion)
+    return check
+
+
+def _keywords_check(parser: AuditParser, keywords: List[str]) -> dict:
+    if not keywords:
+        return {"density": 0, "keywords": {}, "status": "warning", "suggestion": "Set target keywords for this page"}
+    analysis = analyze_keywords("", keywords, tokens=parser.tokens)["keywords"]
+    for result in analysis.values():
+        result.pop("positions")
+    low, high = KEYWORD_DENSITY_RANGE
+    # The first keyword is the page's primary keyword
+    density = analysis[keywords[0]]["density"]
+    if density < low:
+        status, suggestion = "warning", f"Use '{keywords[0]}' more often in the content"
+    elif density > high:
+        status, suggestion = "warning", f"'{keywords[0]}' appears too often; reduce keyword stuffing"
+    else:
+        status, suggestion = "good", "Keyword density is within optimal range"
+    return {"density": density, "keywords": analysis, "status": status, "suggestion": suggestion}
+
+
+def audit_content(page_path: str, content: str, seo_data: Optional[dict]) -> dict:
+    """Audit page HTML and its SEO metadata in one parse of the content"""
+    seo_data = seo_data or {}
+    parser = parse_content(content or "")
+
+    title_check = _length_check("title", (seo_data.get("title") or "").strip(), TITLE_LENGTH_RANGE)
+    description_check = _length_check("description", (seo_data.get("description") or "").strip(), DESCRIPTION_LENGTH_RANGE)
+    keywords_check = _keywords_check(parser, seo_data.get("keywords") or [])
+    headings_check = _headings_check(parser)
+
+    images_check = {
+        "total_images": parser.images,
+        "alt_text_missing": parser.images_missing_alt,
+        "alt_coverage": round(1 - parser.images_missing_alt / parser.images, 3) if parser.images else 1.0,
+        "status": "warning" if parser.images_missing_alt else "good",
+        "suggestion": f"Add alt text to {parser.images_missing_alt} images" if parser.images_missing_alt else "All images have alt text",
+    }
+    links_check = {
+        "internal_links": parser.internal_links,
+        "external_links": parser.external_links,
+        "nofollow_links": parser.nofollow_links,
+        "status": "good" if parser.internal_links else "warning",
+        "suggestion": "Internal linking is present" if parser.internal_links else "Add internal links to related pages",
+    }
+    content_check = {
+        "word_count": len(parser.tokens),
+        "status": "good" if len(parser.tokens) >= 300 else "warning",
+        "suggestion": "Content length is sufficient" if len(parser.tokens) >= 300 else "Expand the content to at least 300 words",
+    }
+
+    checks = [title_check, description_check, keywords_check, headings_check, images_check, links_check, content_check]
+    penalties = {"good": 0, "warning": 8, "error": 15}
+    return {
+        "page_path": page_path,
+        "content_found": bool(content),
+        "title_check": title_check,
+        "description_check": description_check,
+        "keywords_check": keywords_check,
+        "headings_check": headings_check,
+        "images_check": images_check,
+        "links_check": links_check,
+        "content_check": content_check,
+        "seo_score": max(0, 100 - sum(penalties[check["status"]] for check in checks)),
+        "recommendations": [check["suggestion"] for check in checks if check["status"] != "good"],
+    }
+
+
+# Fields read for auditing, shared by the on-demand audit and the site-wide job
+SERVICE_PAGE_AUDIT_PROJECTION = {"_id": 0, "slug": 1, "content": 1, "seo_data": 1, "updated_at": 1}
+SEO_ENTRY_AUDIT_PROJECTION = {"_id": 0, "page_path": 1, "title": 1, "description": 1, "keywords": 1, "updated_at": 1}
+
+
+def audit_inputs(page: Optional[dict], seo_entry: Optional[dict]) -> Tuple[str, Optional[dict], Optional[datetime]]:
+    """Stored HTML, SEO metadata and last update time from an active service page and its seo_data entry.
+
+    The page's own seo_data wins over the entry, which is the only source
+    for paths without a service page. The update time is the later of the two.
+    """
+    content, seo_data = "", None
+    timestamps = []
+    if page is not None:
+        content, seo_data = page.get("content") or "", page.get("seo_data")
+        timestamps.append(page.get("updated_at"))
+    if seo_entry is not None:
+        if seo_data is None:
+            seo_data = {field: seo_entry.get(field) for field in ("title", "description", "keywords") if field in seo_entry}
+        timestamps.append(seo_entry.get("updated_at"))
+    timestamps = [timestamp for timestamp in timestamps if timestamp is not None]
+    return content, seo_data, max(timestamps) if timestamps else None
+
+
+async def load_audit_inputs(page_path: str) -> Tuple[str, Optional[dict], Optional[datetime]]:
+    """audit_inputs for one page path"""
+    page = None
+    path = page_path.strip("/")
+    if path.startswith("services/"):
+        page = await service_pages_catalog.find_one(
+            {"slug": path.split("/", 1)[1], "is_active": True}, SERVICE_PAGE_AUDIT_PROJECTION
+        )
+    seo_entry = await seo_data_collection.find_one(
+        {"page_path": {"$in": [path, f"/{path}"]}}, SEO_ENTRY_AUDIT_PROJECTION
+    )
+    return audit_inputs(page, seo_entry)
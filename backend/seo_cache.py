@@ -0,0 +1,125 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from pymongo import ASCENDING
+from database import seo_cache_collection
+from lru_cache import LRUCache
+from keyword_analysis import ANALYZER_VERSION
+from seo_utils import seo_optimization, stream_seo_optimization, OPTIMIZATION_VERSION
+from seo_audit import audit_content, AUDIT_VERSION
+from config import LLM_PROVIDER, SEO_CACHE_SIZE, SEO_CACHE_TTL_DAYS
+
+# Results by content hash; the seo_cache collection backs it across restarts and instances
+_memory = LRUCache(SEO_CACHE_SIZE)
+
+_metrics = {
+    "memory_hits": 0,
+    "database_hits": 0,
+    "misses": 0,
+    "bypassed": 0,
+}
+
+
+async def ensure_seo_cache_indexes():
+    await seo_cache_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+
+def content_key(kind: str, **parts) -> str:
+    """Stable hash of everything a cached result depends on"""
+    payload = json.dumps({"kind": kind, "analyzer_version": ANALYZER_VERSION, **parts}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def lookup(key: str) -> Optional[dict]:
+    """Cached result for `key` from memory or the seo_cache collection"""
+    result = _memory.get(key)
+    if result is not None:
+        _metrics["memory_hits"] += 1
+        return result
+    cached = await seo_cache_collection.find_one({"_id": key}, {"result": 1})
+    if cached is not None:
+        _metrics["database_hits"] += 1
+        _memory.set(key, cached["result"])
+        return cached["result"]
+    _metrics["misses"] += 1
+    return None
+
+
+async def store(key: str, kind: str, result: dict):
+    now = datetime.utcnow()
+    await seo_cache_collection.replace_one(
+        {"_id": key},
+        {"kind": kind, "result": result, "created_at": now, "expires_at": now + timedelta(days=SEO_CACHE_TTL_DAYS)},
+        upsert=True
+    )
+    _memory.set(key, result)
+
+
+async def cached_result(key: str, kind: str, compute: Callable[[], Awaitable[dict]], force: bool = False) -> dict:
+    """Return the cached result for `key`, computing and storing it on a miss.
+
+    `force` skips both cache layers and overwrites them with a fresh result.
+    """
+    if force:
+        _metrics["bypassed"] += 1
+    else:
+        result = await lookup(key)
+        if result is not None:
+            return result
+
+    result = await compute()
+    await store(key, kind, result)
+    return result
+
+
+def optimize_key(content: str, target_keywords: List[str]) -> str:
+    return content_key(
+        "optimize",
+        version=OPTIMIZATION_VERSION,
+        provider=LLM_PROVIDER,
+        content=content,
+        keywords=target_keywords
+    )
+
+
+async def optimize_content(content: str, target_keywords: List[str], force: bool = False) -> dict:
+    """seo_optimization, cached by content, keywords and provider"""
+    key = optimize_key(content, target_keywords)
+    return await cached_result(key, "optimize", lambda: seo_optimization(content, target_keywords), force)
+
+
+async def stream_optimize_content(content: str, target_keywords: List[str],
+                                  force: bool = False) -> AsyncIterator[Tuple[str, dict]]:
+    """stream_seo_optimization sharing optimize_content's cache.
+
+    A cached result is yielded as the only event; a fresh one is stored
+    once the provider stream has finished.
+    """
+    key = optimize_key(content, target_keywords)
+    if force:
+        _metrics["bypassed"] += 1
+    else:
+        result = await lookup(key)
+        if result is not None:
+            yield "result", result
+            return
+
+    async for event, data in stream_seo_optimization(content, target_keywords):
+        if event == "result":
+            await store(key, "optimize", data)
+        yield event, data
+
+
+async def audit_page(page_path: str, content: str, seo_data: Optional[dict], force: bool = False) -> dict:
+    """audit_content, cached by the page's content and SEO data"""
+    key = content_key("audit", version=AUDIT_VERSION, page_path=page_path, content=content, seo_data=seo_data)
+
+    async def compute():
+        return audit_content(page_path, content, seo_data)
+
+    return await cached_result(key, "audit", compute, force)
+
+
+def get_seo_cache_metrics():
+    return {"memory": _memory.stats(), **_metrics}
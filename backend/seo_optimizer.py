@@ -0,0 +1,159 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, List
+from pymongo import UpdateOne
+from database import seo_data_collection, service_pages_catalog
+from models import SEOData, SEOOptimizationRequest
+from seo_cache import optimize_content, stream_optimize_content
+from sitemap import notify_sitemap_change
+from config import SEO_BULK_CONCURRENCY, SEO_BULK_WRITE_SIZE, SEO_PROVIDER_TIMEOUT_SECONDS
+
+
+def build_seo_data(request: SEOOptimizationRequest, optimization_result: dict) -> SEOData:
+    """SEOData document for an optimization result"""
+    return SEOData(
+        page_path=request.page_path,
+        title=optimization_result["title_suggestions"][0],
+        description=optimization_result["description_suggestions"][0],
+        keywords=request.target_keywords,
+        meta_tags={
+            "title": optimization_result["title_suggestions"][0],
+            "description": optimization_result["description_suggestions"][0],
+            "keywords": ", ".join(request.target_keywords)
+        },
+        schema_markup=optimization_result["schema_markup"],
+        content_optimization=optimization_result
+    )
+
+
+def seo_upsert(seo_data: SEOData) -> UpdateOne:
+    return UpdateOne(
+        {"page_path": seo_data.page_path},
+        {"$set": seo_data.model_dump()},
+        upsert=True
+    )
+
+
+async def service_page_requests() -> List[SEOOptimizationRequest]:
+    """One optimization request per active service page, using its stored keywords"""
+    requests = []
+    async for page in service_pages_catalog.find(
+        {"is_active": True}, {"slug": 1, "content": 1, "seo_data.keywords": 1}
+    ):
+        requests.append(SEOOptimizationRequest(
+            page_path=f"/services/{page['slug']}",
+            content=page.get("content", ""),
+            target_keywords=(page.get("seo_data") or {}).get("keywords", [])
+        ))
+    return requests
+
+
+async def _optimize(semaphore: asyncio.Semaphore, request: SEOOptimizationRequest, force: bool):
+    async with semaphore:
+        try:
+            result = await asyncio.wait_for(
+                optimize_content(request.content, request.target_keywords, force),
+                SEO_PROVIDER_TIMEOUT_SECONDS
+            )
+            return request, result, None
+        except asyncio.TimeoutError:
+            return request, None, f"Provider timed out after {SEO_PROVIDER_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            return request, None, str(e)
+
+
+async def _save(operations: List[UpdateOne]) -> int:
+    result = await seo_data_collection.bulk_write(operations, ordered=False)
+    notify_sitemap_change()
+    return result.upserted_count + result.modified_count
+
+
+async def bulk_optimize(requests: List[SEOOptimizationRequest], force: bool = False) -> AsyncIterator[str]:
+    """Optimize pages concurrently, yielding NDJSON progress lines.
+
+    Provider calls run at most SEO_BULK_CONCURRENCY at a time, each under
+    its own timeout; unchanged pages are served from the SEO cache unless
+    `force` is set. Successful results are saved with a bulk_write every
+    SEO_BULK_WRITE_SIZE pages, and whatever is pending is still saved if
+    the admin disconnects mid-stream.
+    """
+    total = len(requests)
+    started_at = datetime.now()
+    yield json.dumps({"event": "started", "total": total}) + "\n"
+
+    semaphore = asyncio.Semaphore(SEO_BULK_CONCURRENCY)
+    tasks = [asyncio.create_task(_optimize(semaphore, request, force)) for request in requests]
+    pending: List[UpdateOne] = []
+    succeeded = 0
+    failed = 0
+    saved = 0
+    try:
+        for completed, task in enumerate(asyncio.as_completed(tasks), start=1):
+            request, result, error = await task
+            if error is None:
+                pending.append(seo_upsert(build_seo_data(request, result)))
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps({
+                "event": "page",
+                "page_path": request.page_path,
+                "status": "ok" if error is None else "failed",
+                "error": error,
+                "completed": completed,
+                "total": total
+            }) + "\n"
+            if len(pending) >= SEO_BULK_WRITE_SIZE or (completed == total and pending):
+                operations, pending = pending, []
+                try:
+                    saved += await _save(operations)
+                except Exception as e:
+                    yield json.dumps({"event": "error", "detail": f"Error saving SEO data: {str(e)}"}) + "\n"
+    finally:
+        # The admin may disconnect mid-stream; don't leave provider calls running
+        for task in tasks:
+            task.cancel()
+        # ...but keep the results already paid for
+        if pending:
+            try:
+                await asyncio.shield(_save(pending))
+            except Exception as e:
+                print(f"Error saving SEO data after bulk optimization stopped: {str(e)}")
+
+    yield json.dumps({
+        "event": "completed",
+        "total": total,
+        "succeeded": succeeded,
+        "failed": failed,
+        "saved": saved,
+        "duration_seconds": round((datetime.now() - started_at).total_seconds(), 2)
+    }) + "\n"
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_optimize(request: SEOOptimizationRequest, force: bool = False) -> AsyncIterator[str]:
+    """Optimize one page, yielding server-sent events as suggestions arrive.
+
+    Events are `analysis` (keyword and readability results, available at
+    once), `suggestion` for each provider suggestion, then `result` once the
+    final SEOData has been saved, or `error`. Nothing is saved if the admin
+    disconnects before the provider has finished.
+    """
+    try:
+        async for event, data in stream_optimize_content(request.content, request.target_keywords, force):
+            if event == "result":
+                seo_data = build_seo_data(request, data)
+                await seo_data_collection.update_one(
+                    {"page_path": request.page_path},
+                    {"$set": seo_data.model_dump()},
+                    upsert=True
+                )
+                notify_sitemap_change()
+            yield sse_event(event, data)
+    except Exception as e:
+        print(f"Streaming SEO optimization failed for {request.page_path}: {e}")
+        yield sse_event("error", {"detail": f"Error optimizing SEO: {str(e)}"})
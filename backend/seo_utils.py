@@ -1,22 +1,43 @@
 import asyncio
-from typing import List
+import json
+from typing import AsyncIterator, Dict, List, Tuple
+from keyword_analysis import analyze_keywords
+from readability import score_readability, reading_ease_score
+from llm_client import get_llm_client, LLMError
+from config import LLM_PROVIDER
+
+# Bump when optimization output changes so cached results are recomputed
+OPTIMIZATION_VERSION = 2
+
+SEO_SYSTEM_PROMPT = (
+    "You are an SEO assistant for ConstructPune, a construction services company in Pune. "
+    "Reply with a JSON object containing the string arrays title_suggestions, "
+    "description_suggestions and content_suggestions."
+)
+
+SEO_STREAM_PROMPT = (
+    "You are an SEO assistant for ConstructPune, a construction services company in Pune. "
+    "Reply with one suggestion per line, each starting with 'title:', 'description:' or 'content:'."
+)
+
+# Line prefixes of streamed suggestions and the result fields they fill
+STREAM_FIELDS = {
+    "title": "title_suggestions",
+    "description": "description_suggestions",
+    "content": "content_suggestions",
+}
 
 async def mock_groq_seo_optimization(content: str, target_keywords: List[str]):
     """Mock Groq API for SEO optimization"""
     # Simulate API processing time
     await asyncio.sleep(0.5)
-    
+    return local_seo_optimization(content, target_keywords)
+
+def local_seo_optimization(content: str, target_keywords: List[str]):
+    """Keyword analysis and template suggestions computed without a provider call"""
     # Mock SEO analysis and suggestions
-    word_count = len(content.split())
-    keyword_density = {}
-    
-    for keyword in target_keywords:
-        count = content.lower().count(keyword.lower())
-        density = (count / word_count) * 100 if word_count > 0 else 0
-        keyword_density[keyword] = {
-            "count": count,
-            "density": round(density, 2)
-        }
+    keyword_density = analyze_keywords(content, target_keywords)["keywords"]
+    readability = score_readability(content)
     
     # Mock content optimization suggestions
     suggestions = []
@@ -59,53 +80,107 @@ async def mock_groq_seo_optimization(content: str, target_keywords: List[str]):
         "title_suggestions": title_suggestions,
         "description_suggestions": description_suggestions,
         "schema_markup": schema_markup,
-        "readability_score": 85,  # Mock score
+        "readability_score": reading_ease_score(readability),
+        "readability": readability,
         "seo_score": 78  # Mock score
     }
 
-async def generate_seo_audit(page_path: str):
-    """Generate SEO audit for a page"""
-    await asyncio.sleep(0.3)
-    
-    # Mock SEO audit data
-    return {
-        "page_path": page_path,
-        "title_check": {
-            "exists": True,
-            "length": 65,
-            "status": "good",
-            "suggestion": "Title length is optimal"
-        },
-        "description_check": {
-            "exists": True,
-            "length": 158,
-            "status": "good",
-            "suggestion": "Meta description length is optimal"
-        },
-        "keywords_check": {
-            "density": 2.5,
-            "status": "good",
-            "suggestion": "Keyword density is within optimal range"
-        },
-        "headings_check": {
-            "h1_count": 1,
-            "h2_count": 3,
-            "h3_count": 5,
-            "status": "good",
-            "suggestion": "Heading structure is well organized"
-        },
-        "images_check": {
-            "total_images": 8,
-            "alt_text_missing": 2,
-            "status": "warning",
-            "suggestion": "Add alt text to 2 images"
-        },
-        "performance_score": 92,
-        "seo_score": 85,
-        "recommendations": [
-            "Add alt text to all images",
-            "Optimize image file sizes",
-            "Add internal links to related pages",
-            "Include FAQ section for better user engagement"
+async def llm_seo_optimization(content: str, target_keywords: List[str]):
+    """SEO optimization with title, description and content suggestions from the configured LLM provider"""
+    result = local_seo_optimization(content, target_keywords)
+    messages = [
+        {"role": "system", "content": SEO_SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps({"target_keywords": target_keywords, "content": content})}
+    ]
+    reply = await get_llm_client().complete(
+        LLM_PROVIDER, messages, temperature=0.2, response_format={"type": "json_object"}
+    )
+    try:
+        suggestions = json.loads(reply)
+    except ValueError as e:
+        raise LLMError(f"Provider reply is not JSON: {str(e)}") from e
+    if not isinstance(suggestions, dict):
+        raise LLMError(f"Provider reply is not a JSON object: {type(suggestions).__name__}")
+    return merge_suggestions(result, suggestions)
+
+def _suggestion_list(suggestions: dict, field: str) -> List[str]:
+    """Non-empty strings of one suggestion field; anything but a list of strings is a bad reply"""
+    value = suggestions.get(field)
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise LLMError(f"Provider reply field {field} is not a list of strings")
+    return [item.strip() for item in value if item.strip()]
+
+def merge_suggestions(result: dict, suggestions: Dict[str, List[str]]) -> dict:
+    """Provider titles and descriptions replace the templates; content suggestions are added"""
+    for field in ("title_suggestions", "description_suggestions"):
+        values = _suggestion_list(suggestions, field)
+        if values:
+            result[field] = values
+    result["content_suggestions"] = result["content_suggestions"] + _suggestion_list(suggestions, "content_suggestions")
+    result["schema_markup"]["description"] = result["description_suggestions"][0]
+    return result
+
+def parse_suggestion_line(line: str):
+    """(field, text) for a streamed `title: ...` line, or None"""
+    prefix, _, text = line.partition(":")
+    field = STREAM_FIELDS.get(prefix.strip().strip("-* ").lower())
+    text = text.strip()
+    if field is None or not text:
+        return None
+    return field, text
+
+async def stream_seo_optimization(content: str, target_keywords: List[str]) -> AsyncIterator[Tuple[str, dict]]:
+    """seo_optimization, relaying provider suggestions as they are generated.
+
+    Yields ("analysis", result without provider suggestions) straight away,
+    ("suggestion", {"field", "text"}) for each suggestion as soon as its line
+    is complete, and finally ("result", merged result), which matches what
+    seo_optimization returns for the same provider.
+    """
+    result = local_seo_optimization(content, target_keywords)
+    yield "analysis", {**result, "title_suggestions": [], "description_suggestions": []}
+
+    suggestions: Dict[str, List[str]] = {}
+    if LLM_PROVIDER == "mock":
+        templates = [
+            (field, text)
+            for field in ("title_suggestions", "description_suggestions")
+            for text in result[field]
         ]
-    }
\ No newline at end of file
+        for field, text in templates:
+            # Spread the mock's simulated processing time over its suggestions
+            await asyncio.sleep(0.5 / len(templates))
+            yield "suggestion", {"field": field, "text": text}
+        yield "result", result
+        return
+
+    messages = [
+        {"role": "system", "content": SEO_STREAM_PROMPT},
+        {"role": "user", "content": json.dumps({"target_keywords": target_keywords, "content": content})}
+    ]
+    async for line in _lines(get_llm_client().stream(LLM_PROVIDER, messages, temperature=0.2)):
+        parsed = parse_suggestion_line(line)
+        if parsed:
+            field, text = parsed
+            suggestions.setdefault(field, []).append(text)
+            yield "suggestion", {"field": field, "text": text}
+    yield "result", merge_suggestions(result, suggestions)
+
+async def _lines(deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Complete lines from a stream of text deltas"""
+    buffer = ""
+    async for delta in deltas:
+        buffer += delta
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+async def seo_optimization(content: str, target_keywords: List[str]):
+    """Optimize content with the provider selected by LLM_PROVIDER"""
+    if LLM_PROVIDER == "mock":
+        return await mock_groq_seo_optimization(content, target_keywords)
+    return await llm_seo_optimization(content, target_keywords)
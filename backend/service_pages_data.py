@@ -1,5 +1,6 @@
 from datetime import datetime
 from database import service_pages_collection
+from migrations import upgrade_document
 
 # Service pages data to be initialized
 SERVICE_PAGES_DATA = [
@@ -79,7 +80,7 @@ async def initialize_service_pages():
         for service_data in SERVICE_PAGES_DATA:
             service_data["created_at"] = datetime.now()
             service_data["updated_at"] = datetime.now()
-            await service_pages_collection.insert_one(service_data)
+            await service_pages_collection.insert_one(upgrade_document("service_pages", service_data))
         print(f"Initialized {len(SERVICE_PAGES_DATA)} service pages")
     else:
         print(f"Service pages already exist ({existing_count} found)")
\ No newline at end of file
@@ -0,0 +1,84 @@
+import hashlib
+import hmac
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from pymongo import ASCENDING
+from database import sessions_collection
+from config import REFRESH_TOKEN_EXPIRE_DAYS, REFRESH_TOKEN_SECRET
+
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are high-entropy random strings, so a keyed fast hash is enough"""
+    return hmac.new(REFRESH_TOKEN_SECRET.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+async def ensure_session_indexes():
+    """Create the token lookup index and let MongoDB expire old sessions"""
+    await sessions_collection.create_index([("token_hash", ASCENDING)], unique=True)
+    await sessions_collection.create_index([("email", ASCENDING), ("kind", ASCENDING)])
+    await sessions_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+
+async def create_session(email: str, kind: str, family_id: Optional[str] = None) -> str:
+    """Store a new session and return its opaque refresh token"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    await sessions_collection.insert_one({
+        "token_hash": hash_refresh_token(token),
+        "family_id": family_id or str(uuid.uuid4()),
+        "email": email,
+        "kind": kind,
+        "revoked": False,
+        "created_at": now,
+        "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    })
+    return token
+
+
+async def rotate_session(token: str) -> Optional[tuple]:
+    """Exchange a refresh token for a new one, returning (session, new_token).
+
+    The old token is revoked atomically. Presenting an already-rotated token
+    means it leaked, so every session descended from the same login is revoked.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.utcnow()
+    session = await sessions_collection.find_one_and_update(
+        {"token_hash": token_hash, "revoked": False, "expires_at": {"$gt": now}},
+        {"$set": {"revoked": True, "revoked_at": now, "revoked_reason": "rotated"}},
+    )
+    if session is None:
+        reused = await sessions_collection.find_one(
+            {"token_hash": token_hash, "revoked_reason": "rotated"}, {"family_id": 1}
+        )
+        if reused is not None:
+            await sessions_collection.update_many(
+                {"family_id": reused["family_id"], "revoked": False},
+                {"$set": {"revoked": True, "revoked_at": now, "revoked_reason": "reuse_detected"}},
+            )
+        return None
+    new_token = await create_session(session["email"], session["kind"], session["family_id"])
+    return session, new_token
+
+
+async def revoke_session(token: str) -> bool:
+    """Revoke a single refresh token (logout)"""
+    result = await sessions_collection.update_one(
+        {"token_hash": hash_refresh_token(token), "revoked": False},
+        {"$set": {"revoked": True, "revoked_at": datetime.utcnow(), "revoked_reason": "logout"}},
+    )
+    return result.modified_count == 1
+
+
+async def revoke_sessions(email: str, kind: Optional[str] = None) -> int:
+    """Revoke every open session of a principal"""
+    query = {"email": email, "revoked": False}
+    if kind:
+        query["kind"] = kind
+    result = await sessions_collection.update_many(
+        query,
+        {"$set": {"revoked": True, "revoked_at": datetime.utcnow(), "revoked_reason": "revoked"}},
+    )
+    return result.modified_count
@@ -0,0 +1,288 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pymongo import ASCENDING, DESCENDING, ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from database import (
+    job_checkpoints_collection,
+    seo_audits_collection,
+    seo_data_collection,
+    service_pages_catalog,
+)
+from seo_audit import (
+    audit_content,
+    audit_inputs,
+    load_audit_inputs,
+    AUDIT_VERSION,
+    SERVICE_PAGE_AUDIT_PROJECTION,
+    SEO_ENTRY_AUDIT_PROJECTION,
+)
+from seo_cache import content_key, audit_page
+from config import (
+    INSTANCE_ID,
+    SEO_AUDIT_SCHEDULE_ENABLED,
+    SEO_AUDIT_HOUR_UTC,
+    SEO_AUDIT_BATCH_SIZE,
+    SEO_AUDIT_WORKERS,
+)
+
+SITE_AUDIT_JOB_ID = "seo_site_audit"
+# A run that has not reported progress for this long is assumed dead and may be taken over
+SITE_AUDIT_LEASE = timedelta(hours=1)
+
+_scheduler_task: Optional[asyncio.Task] = None
+
+
+def normalize_page_path(page_path: str) -> str:
+    return "/" + page_path.strip("/")
+
+
+def audit_hash(page_path: str, content: str, seo_data: Optional[dict]) -> str:
+    """Same key as the audit result cache, so a version bump re-audits every page"""
+    return content_key("audit", version=AUDIT_VERSION, page_path=page_path, content=content, seo_data=seo_data)
+
+
+async def ensure_site_audit_indexes():
+    # Latest-audit lookups go through the page_path _id; these serve the admin listing
+    await seo_audits_collection.create_index([("audited_at", DESCENDING)])
+    await seo_audits_collection.create_index([("seo_score", ASCENDING)])
+
+
+def has_audit_inputs(content: str, seo_data: Optional[dict]) -> bool:
+    """Whether there is anything to audit; audits of nothing are not stored"""
+    return bool(content) or seo_data is not None
+
+
+async def _site_pages():
+    """Every auditable page: active service pages, then SEO entries for other paths.
+
+    Inputs are combined by audit_inputs, as for an on-demand audit, so both
+    produce the same audit_hash for a page.
+    """
+    seo_entries = {}
+    async for entry in seo_data_collection.find({}, SEO_ENTRY_AUDIT_PROJECTION):
+        seo_entries[normalize_page_path(entry["page_path"])] = entry
+    async for page in service_pages_catalog.find({"is_active": True}, SERVICE_PAGE_AUDIT_PROJECTION):
+        page_path = f"/services/{page['slug']}"
+        yield (page_path, *audit_inputs(page, seo_entries.pop(page_path, None)))
+    for page_path, entry in seo_entries.items():
+        yield (page_path, *audit_inputs(None, entry))
+
+
+def _audit_batch(pages: List[tuple]) -> List[dict]:
+    """Audit a batch in a worker process"""
+    return [audit_content(page_path, content, seo_data) for page_path, content, seo_data in pages]
+
+
+def audit_document(page_path: str, content_hash: str, source_updated_at, audit: dict) -> dict:
+    return {
+        "page_path": page_path,
+        "content_hash": content_hash,
+        "source_updated_at": source_updated_at,
+        "audit_version": AUDIT_VERSION,
+        "seo_score": audit["seo_score"],
+        "audit": audit,
+        "audited_at": datetime.now(),
+    }
+
+
+async def _claim_run(force: bool) -> bool:
+    """Mark the job running unless another instance holds a live lease"""
+    now = datetime.now()
+    try:
+        await job_checkpoints_collection.update_one(
+            {"_id": SITE_AUDIT_JOB_ID, "$or": [
+                {"status": {"$ne": "running"}},
+                {"heartbeat_at": {"$lt": now - SITE_AUDIT_LEASE}},
+            ]},
+            {"$set": {
+                "status": "running",
+                "force": force,
+                "instance_id": INSTANCE_ID,
+                "started_at": now,
+                "heartbeat_at": now,
+                "finished_at": None,
+                "error": None,
+                "scanned": 0,
+                "audited": 0,
+                "unchanged": 0,
+                "pruned": 0,
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def run_site_audit(force: bool = False):
+    """Audit every page whose content, SEO data or updated_at changed since its last audit.
+
+    Changed pages are audited in batches of SEO_AUDIT_BATCH_SIZE across
+    SEO_AUDIT_WORKERS processes, and each batch is stored with one bulk_write.
+    Stored audits of pages no longer found are deleted once every page has
+    been scanned. `force` re-audits every page.
+    """
+    if not await _claim_run(force):
+        print("SEO site audit already running on another instance")
+        return
+
+    loop = asyncio.get_running_loop()
+    # spawn: forked children would inherit the event loop and MongoDB client threads
+    executor = ProcessPoolExecutor(SEO_AUDIT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    progress = {"scanned": 0, "audited": 0, "unchanged": 0, "pruned": 0}
+    pending = set()
+
+    async def audit_and_store(batch: List[tuple]):
+        audits = await loop.run_in_executor(
+            executor, _audit_batch, [(page_path, content, seo_data) for page_path, content, seo_data, _, _ in batch]
+        )
+        await seo_audits_collection.bulk_write([
+            ReplaceOne({"_id": page_path}, audit_document(page_path, content_hash, updated_at, audit), upsert=True)
+            for (page_path, _, _, updated_at, content_hash), audit in zip(batch, audits)
+        ], ordered=False)
+        progress["audited"] += len(batch)
+        await job_checkpoints_collection.update_one(
+            {"_id": SITE_AUDIT_JOB_ID},
+            {"$set": {**progress, "heartbeat_at": datetime.now()}}
+        )
+
+    try:
+        # One read of the previous audits' fingerprints instead of a lookup per page
+        previous = {
+            doc["_id"]: doc async for doc in seo_audits_collection.find(
+                {}, {"content_hash": 1, "source_updated_at": 1}
+            )
+        }
+        batch = []
+        seen = set()
+        async for page_path, content, seo_data, updated_at in _site_pages():
+            if not has_audit_inputs(content, seo_data):
+                continue
+            seen.add(page_path)
+            progress["scanned"] += 1
+            content_hash = audit_hash(page_path, content, seo_data)
+            last = previous.get(page_path)
+            if (not force and last is not None and last.get("content_hash") == content_hash
+                    and last.get("source_updated_at") == updated_at):
+                progress["unchanged"] += 1
+                continue
+            batch.append((page_path, content, seo_data, updated_at, content_hash))
+            if len(batch) >= SEO_AUDIT_BATCH_SIZE:
+                pending.add(asyncio.ensure_future(audit_and_store(batch)))
+                batch = []
+                if len(pending) >= SEO_AUDIT_WORKERS:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    await asyncio.gather(*done)
+        if batch:
+            pending.add(asyncio.ensure_future(audit_and_store(batch)))
+        if pending:
+            await asyncio.gather(*pending)
+
+        # Audits of deactivated, deleted or never-existing pages
+        stale = [page_path for page_path in previous if page_path not in seen]
+        if stale:
+            result = await seo_audits_collection.delete_many({"_id": {"$in": stale}})
+            progress["pruned"] = result.deleted_count
+
+        await job_checkpoints_collection.update_one(
+            {"_id": SITE_AUDIT_JOB_ID},
+            {"$set": {**progress, "status": "completed", "finished_at": datetime.now()}}
+        )
+        print(f"SEO site audit completed: {progress}")
+    except Exception as e:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await job_checkpoints_collection.update_one(
+            {"_id": SITE_AUDIT_JOB_ID},
+            {"$set": {**progress, "status": "failed", "error": str(e), "finished_at": datetime.now()}}
+        )
+        print(f"Error running SEO site audit: {str(e)}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def get_site_audit_status():
+    """Get the checkpoint of the last site audit run"""
+    checkpoint = await job_checkpoints_collection.find_one({"_id": SITE_AUDIT_JOB_ID})
+    if checkpoint is None:
+        return {"status": "never_run"}
+    checkpoint.pop("_id")
+    return checkpoint
+
+
+async def get_latest_audit(page_path: str) -> Optional[dict]:
+    """Stored audit for a page, read by primary key"""
+    stored = await seo_audits_collection.find_one({"_id": normalize_page_path(page_path)}, {"audit": 1, "audited_at": 1})
+    if stored is None:
+        return None
+    return {**stored["audit"], "audited_at": stored["audited_at"]}
+
+
+async def get_or_audit_page(page_path: str, force: bool = False) -> dict:
+    """Latest stored audit, auditing and storing the page when it has none or `force` is set.
+
+    Paths with neither content nor SEO data are audited but not stored.
+    """
+    page_path = normalize_page_path(page_path)
+    if not force:
+        latest = await get_latest_audit(page_path)
+        if latest is not None:
+            return latest
+    content, seo_data, updated_at = await load_audit_inputs(page_path)
+    audit = await audit_page(page_path, content, seo_data, force)
+    if not has_audit_inputs(content, seo_data):
+        # Nothing stored for this path; keep it out of the audit listing
+        return {**audit, "audited_at": datetime.now()}
+    document = audit_document(page_path, audit_hash(page_path, content, seo_data), updated_at, audit)
+    await seo_audits_collection.replace_one({"_id": page_path}, document, upsert=True)
+    return {**audit, "audited_at": document["audited_at"]}
+
+
+async def list_site_audits(limit: int = 100, max_score: Optional[int] = None):
+    """Latest audits, lowest scores first"""
+    query = {"seo_score": {"$lte": max_score}} if max_score is not None else {}
+    audits = []
+    async for doc in seo_audits_collection.find(
+        query, {"page_path": 1, "seo_score": 1, "audited_at": 1, "audit.recommendations": 1}
+    ).sort("seo_score", ASCENDING).limit(limit):
+        audits.append({
+            "page_path": doc["page_path"],
+            "seo_score": doc["seo_score"],
+            "audited_at": doc["audited_at"],
+            "recommendations": doc["audit"]["recommendations"],
+        })
+    return audits
+
+
+def _seconds_until_next_run() -> float:
+    now = datetime.utcnow()
+    next_run = now.replace(hour=SEO_AUDIT_HOUR_UTC, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def _run_nightly():
+    while True:
+        await asyncio.sleep(_seconds_until_next_run())
+        try:
+            await run_site_audit()
+        except Exception as e:
+            print(f"Error in nightly SEO site audit: {str(e)}")
+
+
+def start_site_audit_scheduler():
+    global _scheduler_task
+    if SEO_AUDIT_SCHEDULE_ENABLED and _scheduler_task is None:
+        _scheduler_task = asyncio.get_running_loop().create_task(_run_nightly())
+
+
+def stop_site_audit_scheduler():
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        _scheduler_task = None
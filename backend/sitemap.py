@@ -0,0 +1,234 @@
+import hashlib
+import math
+import zlib
+from datetime import datetime
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+from pymongo import ASCENDING
+from database import seo_data_collection, service_pages_catalog, service_pages_collection
+from config import SITE_URL, SITEMAP_MAX_URLS, SITEMAP_REFRESH_SECONDS, SITEMAP_REBUILD_HOURS
+from watermark_refresher import EPOCH, WatermarkRefresher, advance, changed_since
+
+# Public routes of the frontend: path -> (changefreq, priority)
+STATIC_PAGES = {
+    "/": ("weekly", "1.0"),
+    "/services": ("monthly", "0.8"),
+    "/gallery": ("weekly", "0.7"),
+    "/about": ("monthly", "0.6"),
+    "/contact": ("monthly", "0.7"),
+    "/calculator": ("weekly", "0.9"),
+}
+SERVICE_PAGE_FREQUENCY = ("monthly", "0.8")
+
+ROBOTS_TXT = f"""# https://www.robotstxt.org/robotstxt.html
+User-agent: *
+Allow: /
+
+# Sitemap
+Sitemap: {SITE_URL}/sitemap.xml
+
+# Disallow admin paths
+Disallow: /admin/
+Disallow: /api/
+"""
+
+
+class CachedDocument:
+    """Rendered bytes with the validators served alongside them"""
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.last_modified = datetime.utcnow().replace(microsecond=0)
+
+
+# page path -> {"lastmod", "changefreq", "priority"}
+_entries: Dict[str, dict] = {}
+# page path -> lastmod of its SEO data, kept apart so a page's lastmod is the later of the two
+_seo_updates: Dict[str, datetime] = {}
+_shards: Dict[int, CachedDocument] = {}
+_dirty_shards: set = set()
+_shard_count = 1
+_documents: Dict[str, CachedDocument] = {"robots.txt": CachedDocument(ROBOTS_TXT.encode(), "text/plain")}
+_watermarks = {"service_pages": None, "seo_data": None}
+_last_rebuild: Optional[datetime] = None
+
+
+def _shard_for(page_path: str) -> int:
+    # A stable hash keeps a page in the same shard as others are added or removed
+    return zlib.crc32(page_path.encode()) % _shard_count
+
+
+def _target_shard_count(url_count: int) -> int:
+    # Fill shards to about half of the protocol limit so hash skew never overflows one
+    return max(1, math.ceil(url_count / (SITEMAP_MAX_URLS // 2))) if url_count > SITEMAP_MAX_URLS else 1
+
+
+def _set_entry(page_path: str, lastmod: Optional[datetime]):
+    if page_path in STATIC_PAGES:
+        changefreq, priority = STATIC_PAGES[page_path]
+    else:
+        changefreq, priority = SERVICE_PAGE_FREQUENCY
+    seo_lastmod = _seo_updates.get(page_path)
+    if lastmod is None or (seo_lastmod is not None and seo_lastmod > lastmod):
+        lastmod = seo_lastmod
+    _entries[page_path] = {"lastmod": lastmod, "changefreq": changefreq, "priority": priority}
+    _dirty_shards.add(_shard_for(page_path))
+
+
+def _remove_entry(page_path: str):
+    if _entries.pop(page_path, None) is not None:
+        _dirty_shards.add(_shard_for(page_path))
+
+
+def _render_urlset(paths) -> bytes:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page_path in sorted(paths):
+        entry = _entries[page_path]
+        lines.append("  <url>")
+        lines.append(f"    <loc>{escape(SITE_URL + page_path)}</loc>")
+        if entry["lastmod"] is not None:
+            lines.append(f"    <lastmod>{entry['lastmod'].strftime('%Y-%m-%d')}</lastmod>")
+        lines.append(f"    <changefreq>{entry['changefreq']}</changefreq>")
+        lines.append(f"    <priority>{entry['priority']}</priority>")
+        lines.append("  </url>")
+    lines.append("</urlset>")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _render_index() -> bytes:
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for shard in range(_shard_count):
+        lines.append("  <sitemap>")
+        lines.append(f"    <loc>{escape(SITE_URL)}/sitemap-{shard + 1}.xml</loc>")
+        lines.append(f"    <lastmod>{_shards[shard].last_modified.strftime('%Y-%m-%d')}</lastmod>")
+        lines.append("  </sitemap>")
+    lines.append("</sitemapindex>")
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _publish(name: str, body: bytes, media_type: str = "application/xml") -> CachedDocument:
+    """Replace a cached document, keeping its validators when the bytes are unchanged"""
+    current = _documents.get(name)
+    if current is None or current.body != body:
+        current = CachedDocument(body, media_type)
+        _documents[name] = current
+    return current
+
+
+def _render():
+    """Re-render dirty shards, and the index or single sitemap above them"""
+    global _shard_count
+    shard_count = _target_shard_count(len(_entries))
+    if shard_count != _shard_count:
+        _shard_count = shard_count
+        _shards.clear()
+        _dirty_shards.clear()
+        _dirty_shards.update(range(shard_count))
+        for name in [name for name in _documents if name.startswith("sitemap-")]:
+            del _documents[name]
+    if not _dirty_shards:
+        return
+
+    if _shard_count == 1:
+        _shards[0] = _publish("sitemap.xml", _render_urlset(_entries))
+    else:
+        members = {shard: [] for shard in _dirty_shards}
+        for page_path in _entries:
+            shard = _shard_for(page_path)
+            if shard in members:
+                members[shard].append(page_path)
+        for shard, paths in members.items():
+            _shards[shard] = _publish(f"sitemap-{shard + 1}.xml", _render_urlset(paths))
+        _publish("sitemap.xml", _render_index())
+    _dirty_shards.clear()
+
+
+async def ensure_sitemap_indexes():
+    await service_pages_collection.create_index([("updated_at", ASCENDING)])
+    await seo_data_collection.create_index([("updated_at", ASCENDING)])
+
+
+async def _apply_changes(full: bool):
+    """Fold service page and SEO data changes since the last watermarks into the entries"""
+    service_query = {} if full else changed_since("updated_at", _watermarks["service_pages"])
+    async for page in service_pages_catalog.find(service_query, {"slug": 1, "is_active": 1, "updated_at": 1}):
+        page_path = f"/services/{page['slug']}"
+        updated_at = page.get("updated_at")
+        _watermarks["service_pages"] = advance(_watermarks["service_pages"], updated_at)
+        if page.get("is_active", True):
+            _set_entry(page_path, updated_at)
+        else:
+            _remove_entry(page_path)
+
+    seo_query = {} if full else changed_since("updated_at", _watermarks["seo_data"])
+    async for entry in seo_data_collection.find(seo_query, {"_id": 0, "page_path": 1, "updated_at": 1}):
+        updated_at = entry.get("updated_at")
+        if updated_at is None:
+            continue
+        _watermarks["seo_data"] = advance(_watermarks["seo_data"], updated_at)
+        page_path = "/" + entry["page_path"].strip("/")
+        if page_path in _seo_updates and _seo_updates[page_path] >= updated_at:
+            continue
+        _seo_updates[page_path] = updated_at
+        # SEO data only refreshes lastmod of pages that exist; arbitrary page_paths are not listed
+        if page_path in _entries:
+            _set_entry(page_path, _entries[page_path]["lastmod"])
+
+
+async def rebuild_sitemap():
+    """Regenerate every entry from the collections; catches hard-deleted pages"""
+    global _last_rebuild
+    _entries.clear()
+    _seo_updates.clear()
+    _watermarks.update(service_pages=None, seo_data=None)
+    for page_path in STATIC_PAGES:
+        _set_entry(page_path, None)
+    await _apply_changes(full=True)
+    # Empty collections still get a watermark so later refreshes stay incremental
+    for collection, watermark in _watermarks.items():
+        if watermark is None:
+            _watermarks[collection] = EPOCH
+    _dirty_shards.update(range(_shard_count))
+    _render()
+    _last_rebuild = datetime.now()
+
+
+async def refresh_sitemap():
+    """Apply only the service pages and SEO data updated since the last refresh"""
+    if _last_rebuild is None:
+        await rebuild_sitemap()
+        return
+    await _apply_changes(full=False)
+    _render()
+
+
+_refresher = WatermarkRefresher("sitemap", rebuild_sitemap, refresh_sitemap, SITEMAP_REFRESH_SECONDS, SITEMAP_REBUILD_HOURS)
+
+
+def notify_sitemap_change():
+    """Ask the refresher to pick up a local write now instead of on its next poll"""
+    _refresher.notify()
+
+
+async def start_sitemap_refresher():
+    await _refresher.start()
+
+
+def stop_sitemap_refresher():
+    _refresher.stop()
+
+
+def get_sitemap_document(name: str) -> Optional[CachedDocument]:
+    """Cached sitemap.xml, sitemap-N.xml or robots.txt"""
+    return _documents.get(name)
+
+
+def get_sitemap_metrics():
+    return {
+        "urls": len(_entries),
+        "shards": _shard_count,
+        "last_rebuild": _last_rebuild,
+        "watermarks": dict(_watermarks),
+    }
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+from pymongo import ASCENDING
+from database import revoked_tokens_collection
+from bloom_filter import BloomFilter
+from lru_cache import LRUCache
+from config import REVOCATION_REFRESH_SECONDS, REVOCATION_BLOOM_ERROR_RATE
+
+# Revoked jtis of this worker, rebuilt from MongoDB every REVOCATION_REFRESH_SECONDS.
+# A miss is authoritative for everything revoked before the last refresh.
+_bloom = BloomFilter(1024, REVOCATION_BLOOM_ERROR_RATE)
+# Database answers for probable hits, so a false positive costs one lookup
+_confirmed = LRUCache(10000, ttl=REVOCATION_REFRESH_SECONDS)
+_refresh_task: Optional[asyncio.Task] = None
+# jtis revoked on this worker while a rebuild is reading MongoDB; its snapshot may miss them
+_revoked_during_rebuild: Optional[set] = None
+
+_metrics = {
+    "checks": 0,
+    "bloom_negatives": 0,
+    "database_lookups": 0,
+    "revoked_hits": 0,
+    "refreshes": 0,
+}
+
+
+async def ensure_revocation_indexes():
+    """Expire revocation records once the token itself would have expired"""
+    await revoked_tokens_collection.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+
+
+async def refresh_revocations():
+    """Rebuild the Bloom filter from the unexpired revocation records"""
+    global _bloom, _revoked_during_rebuild
+    _revoked_during_rebuild = set()
+    try:
+        jtis = [doc["_id"] async for doc in revoked_tokens_collection.find(
+            {"expires_at": {"$gt": datetime.utcnow()}}, {"_id": 1}
+        )]
+        # Size for growth so the error rate holds until the next rebuild
+        bloom = BloomFilter(max(1024, len(jtis) * 2), REVOCATION_BLOOM_ERROR_RATE)
+        for jti in jtis:
+            bloom.add(jti)
+        for jti in _revoked_during_rebuild:
+            bloom.add(jti)
+        _bloom = bloom
+        _confirmed.clear()
+        for jti in _revoked_during_rebuild:
+            _confirmed.set(jti, True)
+        _metrics["refreshes"] += 1
+    finally:
+        _revoked_during_rebuild = None
+
+
+async def _refresh_periodically():
+    while True:
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+        try:
+            await refresh_revocations()
+        except Exception as e:
+            print(f"Error refreshing token revocations: {str(e)}")
+
+
+async def start_revocation_refresher():
+    global _refresh_task
+    await refresh_revocations()
+    if _refresh_task is None:
+        _refresh_task = asyncio.get_running_loop().create_task(_refresh_periodically())
+
+
+def stop_revocation_refresher():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        _refresh_task = None
+
+
+async def revoke_token(jti: str, expires_at: datetime, reason: str = "revoked"):
+    """Record a revoked access token until its natural expiry"""
+    await revoked_tokens_collection.update_one(
+        {"_id": jti},
+        {"$set": {"expires_at": expires_at, "revoked_at": datetime.utcnow(), "reason": reason}},
+        upsert=True,
+    )
+    # Visible on this worker immediately; other workers see it after their next refresh
+    _bloom.add(jti)
+    _confirmed.set(jti, True)
+    if _revoked_during_rebuild is not None:
+        _revoked_during_rebuild.add(jti)
+
+
+async def is_token_revoked(jti: str) -> bool:
+    """Memory probe for the common case; only probable hits query MongoDB"""
+    _metrics["checks"] += 1
+    if not _bloom.might_contain(jti):
+        _metrics["bloom_negatives"] += 1
+        return False
+    revoked = _confirmed.get(jti)
+    if revoked is None:
+        _metrics["database_lookups"] += 1
+        revoked = await revoked_tokens_collection.find_one({"_id": jti}, {"_id": 1}) is not None
+        _confirmed.set(jti, revoked)
+    if revoked:
+        _metrics["revoked_hits"] += 1
+    return revoked
+
+
+def get_revocation_metrics():
+    return {
+        "bloom_items": _bloom.count,
+        "bloom_bits": _bloom.size,
+        **_metrics,
+    }
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def changed_since(field: str, watermark: Optional[datetime]) -> dict:
+    """Query for documents whose `field` moved past the watermark; everything when there is none"""
+    return {} if watermark is None else {field: {"$gt": watermark}}
+
+
+def advance(watermark: Optional[datetime], changed_at: Optional[datetime]) -> Optional[datetime]:
+    if changed_at is not None and (watermark is None or changed_at > watermark):
+        return changed_at
+    return watermark
+
+
+class WatermarkRefresher:
+    """Background task keeping an in-memory view in step with its collections.
+
+    `refresh` applies only documents changed past the view's watermarks and
+    runs every `refresh_seconds`, or sooner after notify(). Watermarks never
+    see hard deletes, so `rebuild` reloads everything on start and again
+    every `rebuild_hours`.
+    """
+
+    def __init__(self, name: str, rebuild: Callable[[], Awaitable[None]], refresh: Callable[[], Awaitable[None]],
+                 refresh_seconds: float, rebuild_hours: float):
+        self.name = name
+        self.rebuild = rebuild
+        self.refresh = refresh
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_hours = rebuild_hours
+        self.last_rebuild: Optional[datetime] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        """Pick up a local write now instead of on the next poll"""
+        if self._changed is not None:
+            self._changed.set()
+
+    async def _rebuild(self):
+        await self.rebuild()
+        self.last_rebuild = datetime.now()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.refresh_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                if self.last_rebuild is None or (datetime.now() - self.last_rebuild).total_seconds() > self.rebuild_hours * 3600:
+                    await self._rebuild()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                print(f"Error refreshing {self.name}: {str(e)}")
+
+    async def start(self):
+        self._changed = asyncio.Event()
+        await self._rebuild()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
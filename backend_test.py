@@ -452,7 +452,7 @@ class TestConstructPuneAPI(unittest.TestCase):
         }
         
         response = requests.post(
-            f"{API_BASE_URL}/admin/auth/register", 
+            f"{API_BASE_URL}/auth/admin/register", 
             json=payload
         )
         print(f"Response status: {response.status_code}")
@@ -475,7 +475,7 @@ class TestConstructPuneAPI(unittest.TestCase):
             # Test duplicate registration (should fail)
             print("\n--- Testing duplicate admin registration ---")
             response = requests.post(
-                f"{API_BASE_URL}/admin/auth/register", 
+                f"{API_BASE_URL}/auth/admin/register", 
                 json=payload
             )
             print(f"Response status: {response.status_code}")
@@ -506,7 +506,7 @@ class TestConstructPuneAPI(unittest.TestCase):
         }
         
         response = requests.post(
-            f"{API_BASE_URL}/admin/auth/login", 
+            f"{API_BASE_URL}/auth/admin/login", 
             data=login_data  # Note: login endpoint expects form data, not JSON
         )
         print(f"Response status: {response.status_code}")
@@ -537,7 +537,7 @@ class TestConstructPuneAPI(unittest.TestCase):
         }
         
         response = requests.post(
-            f"{API_BASE_URL}/admin/auth/login", 
+            f"{API_BASE_URL}/auth/admin/login", 
             data=invalid_login
         )
         print(f"Response status: {response.status_code}")
@@ -564,7 +564,7 @@ class TestConstructPuneAPI(unittest.TestCase):
         }
         
         response = requests.get(
-            f"{API_BASE_URL}/admin/auth/me", 
+            f"{API_BASE_URL}/auth/admin/me", 
             headers=headers
         )
         print(f"Response status: {response.status_code}")
@@ -591,7 +591,7 @@ class TestConstructPuneAPI(unittest.TestCase):
         }
         
         response = requests.get(
-            f"{API_BASE_URL}/admin/auth/me", 
+            f"{API_BASE_URL}/auth/admin/me", 
             headers=invalid_headers
         )
         print(f"Response status: {response.status_code}")
@@ -1506,5 +1506,636 @@ class TestConstructPuneAPI(unittest.TestCase):
         print("\n--- Enhanced calculator estimate test completed successfully ---")
 
 
+    def test_23_calculation_analytics(self):
+        """Test calculation analytics rollup endpoints"""
+        print("\n=== Testing Calculation Analytics Endpoints ===")
+        
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+        
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        # Create an estimate so today's bucket exists
+        payload = {
+            "project_type": "residential",
+            "area": 1000,
+            "location": "Pune",
+            "materials": ["cement", "steel"],
+            "labor_types": ["mason"],
+            "quality_level": "premium"
+        }
+        response = requests.post(f"{API_BASE_URL}/calculator/estimate", json=payload)
+        self.assertEqual(response.status_code, 200)
+        
+        response = requests.get(
+            f"{API_BASE_URL}/admin/analytics/calculations/trends",
+            params={"days": 7, "location": "Pune", "quality_level": "premium"},
+            headers=headers
+        )
+        print(f"Response status: {response.status_code}")
+        try:
+            print(f"Response body: {json.dumps(response.json(), indent=2)}")
+        except:
+            print(f"Response text: {response.text}")
+        
+        self.assertEqual(response.status_code, 200)
+        
+        trends = response.json()
+        self.assertIsInstance(trends, list)
+        self.assertGreater(len(trends), 0)
+        for point in trends:
+            self.assertEqual(point["location"], "Pune")
+            self.assertEqual(point["quality_level"], "premium")
+            self.assertIn("day", point)
+            self.assertIn("count", point)
+            self.assertIn("average_cost_per_sqft", point)
+        
+        response = requests.get(
+            f"{API_BASE_URL}/admin/analytics/calculations/locations",
+            headers=headers
+        )
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        
+        # Test without authentication
+        print("\n--- Testing without authentication ---")
+        response = requests.get(f"{API_BASE_URL}/admin/analytics/calculations/trends")
+        print(f"Response status: {response.status_code}")
+        self.assertIn(response.status_code, [401, 500])
+
+    def test_24_refresh_token(self):
+        """Test refresh token rotation, reuse detection and logout"""
+        print("\n=== Testing Refresh Token Endpoints ===")
+        
+        unique_id = str(uuid.uuid4())[:8]
+        user_payload = {
+            "email": f"refresh.test.{unique_id}@example.com",
+            "password": "SecurePassword123!",
+            "name": "Refresh Test User"
+        }
+        requests.post(f"{API_BASE_URL}/auth/register", json=user_payload)
+        
+        response = requests.post(
+            f"{API_BASE_URL}/auth/login",
+            data={"username": user_payload["email"], "password": user_payload["password"]}
+        )
+        print(f"Login response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        first_refresh_token = response.json()["refresh_token"]
+        self.assertTrue(first_refresh_token)
+        
+        # Exchange the refresh token for a new pair
+        response = requests.post(
+            f"{API_BASE_URL}/auth/refresh",
+            json={"refresh_token": first_refresh_token}
+        )
+        print(f"Refresh response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        tokens = response.json()
+        self.assertIn("access_token", tokens)
+        self.assertNotEqual(tokens["refresh_token"], first_refresh_token)
+        
+        # The new access token works
+        response = requests.get(
+            f"{API_BASE_URL}/auth/me",
+            headers={"Authorization": f"Bearer {tokens['access_token']}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["email"], user_payload["email"])
+        self.assertNotIn("hashed_password", response.json())
+        
+        # Reusing the rotated token fails and revokes the whole session family
+        response = requests.post(
+            f"{API_BASE_URL}/auth/refresh",
+            json={"refresh_token": first_refresh_token}
+        )
+        print(f"Reused token response status: {response.status_code}")
+        self.assertEqual(response.status_code, 401)
+        
+        response = requests.post(
+            f"{API_BASE_URL}/auth/refresh",
+            json={"refresh_token": tokens["refresh_token"]}
+        )
+        self.assertEqual(response.status_code, 401)
+        
+        # Logout revokes a fresh session
+        response = requests.post(
+            f"{API_BASE_URL}/auth/login",
+            data={"username": user_payload["email"], "password": user_payload["password"]}
+        )
+        refresh_token = response.json()["refresh_token"]
+        response = requests.post(f"{API_BASE_URL}/auth/logout", json={"refresh_token": refresh_token})
+        self.assertEqual(response.status_code, 200)
+        response = requests.post(f"{API_BASE_URL}/auth/refresh", json={"refresh_token": refresh_token})
+        self.assertEqual(response.status_code, 401)
+
+    def test_25_concurrent_registration(self):
+        """Test that concurrent registrations with the same email create one account"""
+        print("\n=== Testing Concurrent Registration ===")
+        from concurrent.futures import ThreadPoolExecutor
+        
+        unique_id = str(uuid.uuid4())[:8]
+        user_payload = {
+            "email": f"concurrent.test.{unique_id}@example.com",
+            "password": "SecurePassword123!",
+            "name": "Concurrent Test User"
+        }
+        
+        def register(_):
+            return requests.post(f"{API_BASE_URL}/auth/register", json=user_payload).status_code
+        
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            statuses = list(executor.map(register, range(20)))
+        print(f"Response statuses: {statuses}")
+        
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(statuses.count(400), len(statuses) - 1)
+        
+        # Same for admin registration
+        admin_payload = {
+            "email": f"concurrent.admin.{unique_id}@example.com",
+            "password": "AdminPassword123!",
+            "name": "Concurrent Test Admin"
+        }
+        
+        def register_admin(_):
+            return requests.post(f"{API_BASE_URL}/auth/admin/register", json=admin_payload).status_code
+        
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            statuses = list(executor.map(register_admin, range(20)))
+        print(f"Admin response statuses: {statuses}")
+        
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(statuses.count(400), len(statuses) - 1)
+
+    def test_26_seo_bulk_optimization(self):
+        """Test bulk SEO optimization streams progress for every page"""
+        print("\n=== Testing Bulk SEO Optimization Endpoint ===")
+        
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+        
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        payload = {
+            "requests": [
+                {
+                    "page_path": f"/services/bulk-test-{i}",
+                    "content": "Professional painting services in Pune with interior painting and exterior painting.",
+                    "target_keywords": ["painting services", "interior painting"]
+                }
+                for i in range(5)
+            ]
+        }
+        
+        response = requests.post(
+            f"{API_BASE_URL}/admin/seo/optimize/bulk",
+            json=payload,
+            headers=headers,
+            stream=True
+        )
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        
+        events = [json.loads(line) for line in response.iter_lines() if line]
+        print(f"Events: {json.dumps(events, indent=2)}")
+        
+        self.assertEqual(events[0]["event"], "started")
+        self.assertEqual(events[0]["total"], 5)
+        pages = [event for event in events if event["event"] == "page"]
+        self.assertEqual(len(pages), 5)
+        self.assertEqual(events[-1]["event"], "completed")
+        self.assertEqual(events[-1]["succeeded"], 5)
+        self.assertEqual(events[-1]["saved"], 5)
+
+    def test_27_seo_optimization_cache(self):
+        """Test that re-optimizing unchanged content is served from the cache"""
+        print("\n=== Testing SEO Optimization Cache ===")
+        import time
+        
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+        
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        payload = {
+            "page_path": f"/services/cache-test-{uuid.uuid4().hex[:8]}",
+            "content": f"Interior painting services in Pune. Cache test {uuid.uuid4()}",
+            "target_keywords": ["interior painting"]
+        }
+        
+        timings = []
+        results = []
+        for params in ({}, {}, {"force": "true"}):
+            started = time.perf_counter()
+            response = requests.post(f"{API_BASE_URL}/admin/seo/optimize", json=payload, params=params, headers=headers)
+            timings.append(time.perf_counter() - started)
+            print(f"Response status: {response.status_code} in {timings[-1]:.3f}s (params={params})")
+            self.assertEqual(response.status_code, 200)
+            results.append(response.json())
+        
+        # The first and forced runs pay the provider latency; the repeat does not
+        self.assertEqual(results[0], results[1])
+        self.assertLess(timings[1], timings[0])
+        self.assertLess(timings[1], timings[2])
+
+    def test_28_seo_site_audit(self):
+        """Test the incremental site audit job and stored audit lookups"""
+        print("\n=== Testing SEO Site Audit ===")
+        import time
+        
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+        
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+        
+        response = requests.post(f"{API_BASE_URL}/admin/seo/audits/run", headers=headers)
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        
+        status = {}
+        for _ in range(30):
+            status = requests.get(f"{API_BASE_URL}/admin/seo/audits/status", headers=headers).json()
+            if status.get("status") in ("completed", "failed"):
+                break
+            time.sleep(1)
+        print(f"Audit status: {status}")
+        self.assertEqual(status["status"], "completed")
+        self.assertGreaterEqual(status["scanned"], 1)
+        
+        response = requests.get(f"{API_BASE_URL}/admin/seo/audit/services/painting-services", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        audit = response.json()
+        self.assertIn("audited_at", audit)
+        self.assertIn("headings_check", audit)
+        
+        response = requests.get(f"{API_BASE_URL}/admin/seo/audits", params={"limit": 10}, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(any(item["page_path"] == "/services/painting-services" for item in response.json()))
+
+    def test_29_seo_optimization_stream(self):
+        """Test that streamed SEO optimization relays suggestions and saves the result once"""
+        print("\n=== Testing Streaming SEO Optimization Endpoint ===")
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        page_path = f"/services/stream-test-{uuid.uuid4().hex[:8]}"
+        payload = {
+            "page_path": page_path,
+            "content": "Professional interior painting services in Pune for homes and offices.",
+            "target_keywords": ["interior painting"]
+        }
+
+        response = requests.post(
+            f"{API_BASE_URL}/admin/seo/optimize/stream",
+            params={"force": True},
+            json=payload,
+            headers=headers,
+            stream=True
+        )
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+
+        events = []
+        for block in response.text.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        print(f"Events: {[event for event, _ in events]}")
+
+        self.assertEqual(events[0][0], "analysis")
+        self.assertTrue(any(event == "suggestion" for event, _ in events))
+        self.assertEqual(events[-1][0], "result")
+        result = events[-1][1]
+
+        # The streamed result is cached, so unchanged content comes back as a single result event
+        response = requests.post(f"{API_BASE_URL}/admin/seo/optimize/stream", json=payload, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        blocks = response.text.strip().split("\n\n")
+        self.assertEqual(len(blocks), 1)
+        self.assertTrue(blocks[0].startswith("event: result"))
+        self.assertEqual(json.loads(blocks[0].split("data: ", 1)[1])["title_suggestions"], result["title_suggestions"])
+
+    def test_30_maintenance_purge_id_filter(self):
+        """Test that a batched purge keeps the _id conditions of its filter"""
+        print("\n=== Testing Maintenance Purge With _id Filter ===")
+        import time
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        marker = f"purge-test-{uuid.uuid4().hex[:8]}"
+        contact_ids = []
+        for i in range(5):
+            response = requests.post(f"{API_BASE_URL}/contact", json={
+                "name": f"{marker}-{i}",
+                "email": f"{marker}-{i}@example.com",
+                "phone": "9876543210",
+                "message": "Maintenance purge test"
+            })
+            self.assertEqual(response.status_code, 200)
+            contact_ids.append(response.json()["id"])
+
+        # Three purged contacts with batch_size 2 span two batches
+        payload = {
+            "collection": "contacts",
+            "filter": {"_id": {"$in": [{"$oid": contact_id} for contact_id in contact_ids[:3]]}},
+            "batch_size": 2
+        }
+        response = requests.post(f"{API_BASE_URL}/admin/maintenance/purge", json=payload, headers=headers)
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        operation_id = response.json()["id"]
+
+        operation = {}
+        for _ in range(30):
+            operation = requests.get(f"{API_BASE_URL}/admin/maintenance/{operation_id}", headers=headers).json()
+            if operation.get("status") in ("completed", "failed"):
+                break
+            time.sleep(1)
+        print(f"Operation: {operation}")
+        self.assertEqual(operation["status"], "completed")
+        self.assertEqual(operation["affected"], 3)
+
+        response = requests.get(f"{API_BASE_URL}/admin/contacts", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        remaining = {contact["_id"] for contact in response.json() if contact["name"].startswith(marker)}
+        self.assertEqual(remaining, set(contact_ids[3:]))
+
+    def test_31_sitemap(self):
+        """Test the cached sitemap.xml and robots.txt with conditional requests"""
+        print("\n=== Testing Sitemap And Robots ===")
+        import time
+
+        for path in ("/sitemap.xml", "/robots.txt"):
+            response = requests.get(f"{BACKEND_URL}{path}")
+            print(f"{path} status: {response.status_code}")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("ETag", response.headers)
+            self.assertIn("Last-Modified", response.headers)
+
+            response = requests.get(f"{BACKEND_URL}{path}", headers={"If-None-Match": response.headers["ETag"]})
+            self.assertEqual(response.status_code, 304)
+
+        response = requests.get(f"{BACKEND_URL}/robots.txt")
+        self.assertIn("Sitemap:", response.text)
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        slug = f"sitemap-test-{uuid.uuid4().hex[:8]}"
+        new_service = {
+            "slug": slug,
+            "title": "Sitemap Test Service",
+            "description": "Service page created by the sitemap test",
+            "content": "<div>Sitemap test content</div>",
+            "features": [],
+            "pricing_info": {},
+            "images": []
+        }
+        response = requests.post(f"{API_BASE_URL}/admin/services", json=new_service, headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        # Creating a page triggers a sitemap refresh without waiting for the next poll
+        found = False
+        for _ in range(15):
+            if f"/services/{slug}</loc>" in requests.get(f"{BACKEND_URL}/sitemap.xml").text:
+                found = True
+                break
+            time.sleep(1)
+        print(f"New page in sitemap: {found}")
+        self.assertTrue(found)
+
+    def test_32_near_duplicate_pages(self):
+        """Test that a templated copy of a service page is reported as a near-duplicate"""
+        print("\n=== Testing Near-Duplicate Service Pages ===")
+        import time
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        response = requests.get(f"{API_BASE_URL}/services/painting-services")
+        self.assertEqual(response.status_code, 200)
+        original = response.json()
+
+        # Same template with the city swapped, as a copied location page would be
+        slug = f"painting-services-copy-{uuid.uuid4().hex[:8]}"
+        copy = {
+            "slug": slug,
+            "title": original["title"].replace("Pune", "Pimpri"),
+            "description": original["description"].replace("Pune", "Pimpri"),
+            "content": original["content"].replace("Pune", "Pimpri"),
+            "features": original.get("features", []),
+            "pricing_info": original.get("pricing_info", {}),
+            "images": original.get("images", [])
+        }
+        response = requests.post(f"{API_BASE_URL}/admin/services", json=copy, headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        pair = {"/services/painting-services", f"/services/{slug}"}
+        found = False
+        for _ in range(15):
+            response = requests.get(f"{API_BASE_URL}/admin/seo/duplicates", headers=headers)
+            self.assertEqual(response.status_code, 200)
+            clusters = response.json()["clusters"]
+            if any(pair <= set(cluster["pages"]) for cluster in clusters):
+                found = True
+                break
+            time.sleep(1)
+        print(f"Duplicate clusters: {json.dumps(clusters, indent=2)}")
+        self.assertTrue(found)
+
+        response = requests.get(f"{API_BASE_URL}/admin/seo/duplicates/similar/services/{slug}", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/services/painting-services", [match["page_path"] for match in response.json()])
+
+    def test_33_internal_link_graph(self):
+        """Test PageRank, orphan detection and link suggestions for service pages"""
+        print("\n=== Testing Internal Link Graph ===")
+        import time
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        suffix = uuid.uuid4().hex[:8]
+        source_slug = f"link-source-{suffix}"
+        target_slug = f"link-target-{suffix}"
+        pages = [
+            # A relative href resolves against /services/, so this links to the target page
+            (source_slug, f'<p>Waterproofing terraces and bathrooms in Pune. See <a href="{target_slug}">terrace waterproofing</a>.</p>'),
+            (target_slug, "<p>Terrace waterproofing and bathroom waterproofing services in Pune.</p>"),
+        ]
+        for slug, content in pages:
+            response = requests.post(f"{API_BASE_URL}/admin/services", json={
+                "slug": slug,
+                "title": f"Waterproofing {slug}",
+                "description": "Waterproofing services in Pune",
+                "content": content,
+                "features": [],
+                "pricing_info": {},
+                "images": []
+            }, headers=headers)
+            self.assertEqual(response.status_code, 200)
+
+        source, target = f"/services/{source_slug}", f"/services/{target_slug}"
+        report = {}
+        for _ in range(15):
+            response = requests.get(f"{API_BASE_URL}/admin/seo/links", headers=headers)
+            self.assertEqual(response.status_code, 200)
+            report = response.json()
+            if {source, target} <= {page["page_path"] for page in report["pages"]}:
+                break
+            time.sleep(1)
+
+        pages = {page["page_path"]: page for page in report["pages"]}
+        print(f"Link graph pages: {json.dumps([pages.get(source), pages.get(target)], indent=2)}")
+        self.assertEqual(pages[target]["in_links"], 1)
+        self.assertGreater(pages[target]["pagerank"], pages[source]["pagerank"])
+        self.assertAlmostEqual(sum(page["pagerank"] for page in report["pages"]), 1.0, places=2)
+        self.assertIn(source, report["orphans"])
+        self.assertNotIn(target, report["orphans"])
+        for suggestion in report["suggestions"]:
+            self.assertIn("source", suggestion)
+            self.assertIn("anchor_text", suggestion)
+            self.assertGreater(suggestion["similarity"], 0)
+        self.assertTrue(any(suggestion["target"] == source for suggestion in report["suggestions"]))
+
+        response = requests.get(f"{API_BASE_URL}/admin/seo/links/services/{target_slug}", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["linked_from"], [source])
+
+    def test_34_service_page_readability(self):
+        """Test readability metrics for the service-page corpus"""
+        print("\n=== Testing Service Page Readability ===")
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        response = requests.get(f"{API_BASE_URL}/admin/seo/readability", headers=headers)
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        print(f"Corpus: {data['corpus']}")
+
+        self.assertGreaterEqual(data["corpus"]["pages"], 1)
+        self.assertGreater(data["corpus"]["words"], 0)
+        self.assertIn("flesch_reading_ease", data["corpus"])
+        self.assertIn("flesch_kincaid_grade", data["corpus"])
+
+        pages = {page["page_path"]: page for page in data["pages"]}
+        painting = pages["/services/painting-services"]
+        self.assertGreater(painting["words"], 50)
+        self.assertGreater(painting["sentences"], 1)
+        self.assertGreaterEqual(painting["syllables"], painting["words"])
+        self.assertGreater(painting["avg_words_per_sentence"], 1)
+        self.assertNotEqual(painting["flesch_reading_ease"], 0)
+        self.assertEqual(sum(painting["sentence_length"]["buckets"].values()), painting["sentences"])
+
+        # Hardest to read first
+        scores = [page["flesch_reading_ease"] for page in data["pages"]]
+        self.assertEqual(scores, sorted(scores))
+
+    def test_35_keyword_suggestions(self):
+        """Test TF-IDF keyword suggestions for a service page and for draft content"""
+        print("\n=== Testing Keyword Suggestions ===")
+
+        # Check if we have an admin token from login test
+        if not hasattr(self, 'admin_token'):
+            print("No admin token available. Running admin login test first.")
+            self.test_14_admin_login()
+
+        headers = {
+            "Authorization": f"Bearer {self.admin_token}"
+        }
+
+        response = requests.get(
+            f"{API_BASE_URL}/admin/seo/keywords/suggest/services/painting-services",
+            params={"limit": 10},
+            headers=headers
+        )
+        print(f"Response status: {response.status_code}")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        print(f"Suggestions: {json.dumps(data, indent=2)}")
+
+        self.assertEqual(data["page_path"], "/services/painting-services")
+        self.assertIsInstance(data["target_keywords"], list)
+        self.assertIsInstance(data["cannibalization"], list)
+        self.assertTrue(0 < len(data["terms"]) <= 10)
+        self.assertTrue(0 < len(data["phrases"]) <= 10)
+        scores = [term["score"] for term in data["terms"]]
+        self.assertGreater(scores[0], 0)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(" " not in term["term"] for term in data["terms"]))
+        self.assertTrue(all(" " in phrase["term"] for phrase in data["phrases"]))
+        # The page's own subject should rank among its distinguishing terms
+        self.assertTrue(any("paint" in term["term"] for term in data["terms"] + data["phrases"]))
+
+        response = requests.get(f"{API_BASE_URL}/admin/seo/keywords/suggest/services/not-a-page", headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+        response = requests.post(f"{API_BASE_URL}/admin/seo/keywords/suggest", json={
+            "title": "Terrace Garden Landscaping",
+            "content": "<p>Terrace garden landscaping in Pune with drip irrigation and planters.</p>",
+            "limit": 5
+        }, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        draft = response.json()
+        self.assertTrue(0 < len(draft["terms"]) <= 5)
+        self.assertTrue(all("already_targeted_by" in term for term in draft["terms"]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
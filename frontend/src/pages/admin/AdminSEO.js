@@ -13,7 +13,7 @@ import {
 
 const AdminSEO = () => {
   const navigate = useNavigate();
-  const { isAuthenticated, API_BASE_URL } = useAdmin();
+  const { isAuthenticated, token, API_BASE_URL } = useAdmin();
   const [activeTab, setActiveTab] = useState('optimize');
   const [loading, setLoading] = useState(false);
   const [seoData, setSeoData] = useState([]);
@@ -54,15 +54,50 @@ const AdminSEO = () => {
     e.preventDefault();
     try {
       setLoading(true);
+      setOptimizationResult(null);
       const keywords = optimizeForm.target_keywords.split(',').map(k => k.trim()).filter(k => k);
       
-      const response = await axios.post(`${API_BASE_URL}/api/admin/seo/optimize`, {
-        page_path: optimizeForm.page_path,
-        content: optimizeForm.content,
-        target_keywords: keywords,
+      // Suggestions are relayed as server-sent events while the provider generates them
+      const response = await fetch(`${API_BASE_URL}/api/admin/seo/optimize/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...(token && { Authorization: `Bearer ${token}` }),
+        },
+        body: JSON.stringify({
+          page_path: optimizeForm.page_path,
+          content: optimizeForm.content,
+          target_keywords: keywords,
+        }),
       });
-      
-      setOptimizationResult(response.data);
+      if (!response.ok) {
+        throw new Error(`Optimization failed with status ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+          if (event === 'analysis' || event === 'result') {
+            setOptimizationResult(data);
+          } else if (event === 'suggestion') {
+            setOptimizationResult((current) => current && {
+              ...current,
+              [data.field]: [...current[data.field], data.text],
+            });
+          } else if (event === 'error') {
+            throw new Error(data.detail);
+          }
+        }
+      }
     } catch (error) {
       console.error('Error optimizing content:', error);
       alert('Error optimizing content. Please try again.');
@@ -315,9 +350,9 @@ const AdminSEO = () => {
                         </div>
                       </div>
                       <div className="bg-gray-50 p-4 rounded-lg">
-                        <h5 className="font-medium text-gray-900 mb-2">Performance Score</h5>
-                        <div className={`text-3xl font-bold ${getScoreColor(auditResult.performance_score)}`}>
-                          {auditResult.performance_score}/100
+                        <h5 className="font-medium text-gray-900 mb-2">Word Count</h5>
+                        <div className="text-3xl font-bold text-gray-900">
+                          {auditResult.content_check.word_count}
                         </div>
                       </div>
                     </div>
@@ -0,0 +1,89 @@
+"""
+Throughput and tail-latency benchmark for the pooled LLM client.
+
+Sends --requests SEO-style completion requests through LLMClient to the
+local stub provider (python -m llm_stub_server in backend/), --concurrency
+at a time. A --duplicate-rate share of requests repeat an earlier payload
+so in-flight coalescing shows up in the numbers.
+
+Usage: python llm_benchmark.py [--requests 500] [--concurrency 100] [--duplicate-rate 0.2]
+
+Start the stub first, e.g. cd backend && python -m llm_stub_server --latency-ms 300 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from llm_client import LLMClient, LLMError, OpenAICompatibleProvider  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(f"{label}: n={len(samples)} "
+          f"p50={percentile(samples, 50):.1f}ms "
+          f"p95={percentile(samples, 95):.1f}ms "
+          f"p99={percentile(samples, 99):.1f}ms "
+          f"max={max(samples):.1f}ms "
+          f"mean={statistics.mean(samples):.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8090/v1", help="stub provider base URL")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100, help="concurrent callers")
+    parser.add_argument("--provider-concurrency", type=int, default=16, help="connection and request cap for the provider")
+    parser.add_argument("--duplicate-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    client = LLMClient()
+    client.register(OpenAICompatibleProvider("stub", args.url, "stub", max_concurrency=args.provider_concurrency))
+
+    payloads = []
+    for i in range(args.requests):
+        if payloads and random.random() < args.duplicate_rate:
+            payloads.append(random.choice(payloads[-args.concurrency:]))
+        else:
+            payloads.append({"target_keywords": [f"keyword {i}"], "content": f"Benchmark page {i}"})
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(payload):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.complete("stub", [{"role": "user", "content": json.dumps(payload)}])
+                latencies.append((time.perf_counter() - started) * 1000)
+            except LLMError:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads))
+    elapsed = time.perf_counter() - started
+    await client.close()
+
+    report("completion latency", latencies)
+    metrics = client.metrics()
+    print(f"{args.requests} requests in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s), "
+          f"{failures} failed, {metrics['provider_calls']} provider calls, "
+          f"{metrics['coalesced']} coalesced, {metrics['retries']} retries")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())